@@ -0,0 +1,198 @@
+import io
+import time
+import logging
+import cProfile
+import pstats
+import functools
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+# Registro (logging) donde dejo el resumen de cada corrida medida
+logger = logging.getLogger("leyenfriamiento.instrumentacion")
+
+# Medición activa en este contexto (None = instrumentación apagada)
+_ACTIVA = ContextVar("medicion_activa", default=None)
+
+# Contexto vacío reutilizable: con la instrumentación apagada, etapa() no crea nada
+_NADA = nullcontext()
+
+
+# 1. MEDICIÓN DE UNA CORRIDA
+
+class Medicion:
+    """
+    Yo acumulo los tiempos por etapa, los contadores y (si me lo piden) la
+    memoria pico de una corrida. Las etapas pueden anidarse: el tiempo de una
+    etapa incluye el de las que corren dentro de ella.
+    """
+
+    def __init__(self, memoria=False):
+        self.memoria = memoria
+        self.etapas = {}
+        self.contadores = {}
+        self.pico_mb = None
+        self._pila = []
+        self._inicio = time.perf_counter()
+        self.segundos = None
+
+    def _actualizar_picos(self):
+        # Paso el pico actual a todas las etapas abiertas antes de reiniciarlo
+        _, pico = tracemalloc.get_traced_memory()
+        for abierta in self._pila:
+            abierta["pico"] = max(abierta["pico"], pico)
+        self.pico_mb = max(self.pico_mb or 0.0, pico / 2 ** 20)
+        return pico
+
+    @contextmanager
+    def etapa(self, nombre):
+        registro = self.etapas.setdefault(nombre, {"segundos": 0.0, "llamadas": 0})
+        abierta = None
+        if self.memoria:
+            self._actualizar_picos()
+            base, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            abierta = {"base": base, "pico": base}
+            self._pila.append(abierta)
+
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            registro["segundos"] += time.perf_counter() - inicio
+            registro["llamadas"] += 1
+            if abierta is not None:
+                self._actualizar_picos()
+                self._pila.pop()
+                pico_etapa = (abierta["pico"] - abierta["base"]) / 2 ** 20
+                registro["pico_mb"] = max(registro.get("pico_mb", 0.0), pico_etapa)
+
+    def contar(self, nombre, cantidad=1):
+        self.contadores[nombre] = self.contadores.get(nombre, 0) + cantidad
+
+    def resumen(self):
+        """
+        Yo devuelvo la medición como un dict simple (se puede pasar a JSON)
+        """
+        datos = {
+            "segundos_totales": self.segundos if self.segundos is not None
+            else time.perf_counter() - self._inicio,
+            "etapas": {nombre: dict(valores) for nombre, valores in self.etapas.items()},
+            "contadores": dict(self.contadores),
+        }
+        if self.pico_mb is not None:
+            datos["memoria_pico_mb"] = self.pico_mb
+        return datos
+
+
+
+# 2. FUNCIONES PARA INSTRUMENTAR EL CÓDIGO
+
+def activa():
+    # Devuelvo la medición activa (o None si la instrumentación está apagada)
+    return _ACTIVA.get()
+
+
+def etapa(nombre):
+    """
+    Yo mido el bloque `with etapa("nombre"):` si hay una medición activa.
+    Si no la hay, devuelvo un contexto vacío y el costo es casi nulo.
+    """
+    medicion = _ACTIVA.get()
+    if medicion is None:
+        return _NADA
+    return medicion.etapa(nombre)
+
+
+def contar(nombre, cantidad=1):
+    # Sumo al contador solo si hay una medición activa
+    medicion = _ACTIVA.get()
+    if medicion is not None:
+        medicion.contar(nombre, cantidad)
+
+
+def instrumentado(nombre=None):
+    """
+    Decorador: yo mido cada llamada a la función como una etapa con su nombre
+    """
+    def decorador(funcion):
+        etiqueta = nombre or funcion.__name__
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            medicion = _ACTIVA.get()
+            if medicion is None:
+                return funcion(*args, **kwargs)
+            with medicion.etapa(etiqueta):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+
+# 3. ACTIVAR LA MEDICIÓN PARA UNA CORRIDA
+
+@contextmanager
+def medir(memoria=False, perfil=None, titulo="corrida"):
+    """
+    Yo activo la instrumentación dentro del bloque `with medir() as medicion:`.
+
+    - memoria=True: también mido la memoria pico con tracemalloc (más lento).
+    - perfil="archivo.prof": además corro cProfile y guardo sus estadísticas
+      en ese archivo (se pueden ver con `python -m pstats archivo.prof`).
+
+    Al salir dejo el resumen en el registro (logging) con nivel INFO.
+    """
+    # Si ya hay una medición activa (por ejemplo, escenarios anidados) la reutilizo
+    existente = _ACTIVA.get()
+    if existente is not None:
+        yield existente
+        return
+
+    medicion = Medicion(memoria=memoria)
+    iniciado_aqui = memoria and not tracemalloc.is_tracing()
+    if iniciado_aqui:
+        tracemalloc.start()
+    if memoria:
+        tracemalloc.reset_peak()
+
+    perfilador = cProfile.Profile() if perfil else None
+    token = _ACTIVA.set(medicion)
+    if perfilador is not None:
+        perfilador.enable()
+    try:
+        yield medicion
+    finally:
+        if perfilador is not None:
+            perfilador.disable()
+        _ACTIVA.reset(token)
+        medicion.segundos = time.perf_counter() - medicion._inicio
+        if memoria:
+            medicion._actualizar_picos()
+        if iniciado_aqui:
+            tracemalloc.stop()
+
+        if perfilador is not None:
+            perfilador.dump_stats(perfil)
+            texto = io.StringIO()
+            pstats.Stats(perfilador, stream=texto).sort_stats("cumulative").print_stats(15)
+            logger.info("Perfil de %s guardado en %s\n%s", titulo, perfil, texto.getvalue())
+
+        logger.info("Instrumentación de %s: %s", titulo, formatear(medicion.resumen()))
+
+
+def formatear(resumen):
+    """
+    Yo convierto un resumen de medición en un texto corto de una línea por etapa
+    """
+    lineas = [f"total {1000 * resumen['segundos_totales']:.2f} ms"]
+    for nombre, valores in resumen["etapas"].items():
+        linea = f"  {nombre}: {1000 * valores['segundos']:.2f} ms ({valores['llamadas']} llamadas)"
+        if "pico_mb" in valores:
+            linea += f", pico {valores['pico_mb']:.2f} MB"
+        lineas.append(linea)
+    for nombre, valor in resumen["contadores"].items():
+        lineas.append(f"  #{nombre}: {valor}")
+    if "memoria_pico_mb" in resumen:
+        lineas.append(f"  memoria pico: {resumen['memoria_pico_mb']:.2f} MB")
+    return "\n".join(lineas)
@@ -1,4 +1,5 @@
 import os
+import sys
 from dotenv import load_dotenv
 
 # Aquí cargo las variables de entorno desde el archivo .env para poder usarlas en el programa
@@ -10,14 +11,63 @@ interfaz = os.getenv("TIPO_INTERFAZ", "streamlit")
 # Aquí obtengo el número de puerto desde las variables de entorno (si no hay, uso el 8501)
 puerto = os.getenv("PUERTO", "8501")
 
-# En esta condición verifico si debo ejecutar la aplicación con la interfaz de Streamlit
-if interfaz == "streamlit":
-    # Si la interfaz es Streamlit, muestro un mensaje indicando en qué puerto se ejecutará
-    print(f" Ejecutando interfaz Streamlit en el puerto {puerto}...")
+# Puerto del servidor de métricas en formato Prometheus (vacío = no se exponen)
+puerto_metricas = os.getenv("PUERTO_METRICAS", "")
+
+# Dirección del servidor de métricas: solo esta máquina salvo que se pida otra (p. ej. 0.0.0.0)
+host_metricas = os.getenv("HOST_METRICAS", "127.0.0.1")
+
+# Dirección de la API: igual que las métricas, solo esta máquina salvo que se pida 0.0.0.0
+host_api = os.getenv("HOST_API", "127.0.0.1")
+
+# Solo arranco algo si este archivo es el programa principal: los procesos de cálculo
+# (lotes y API) vuelven a importar este archivo en algunos sistemas y no deben relanzar nada
+if __name__ == "__main__":
+
+    # En esta condición verifico si debo ejecutar la aplicación con la interfaz de Streamlit
+    if interfaz == "streamlit":
+        # Si la interfaz es Streamlit, muestro un mensaje indicando en qué puerto se ejecutará
+        print(f" Ejecutando interfaz Streamlit en el puerto {puerto}...")
     
-    # Aquí lanzo el servidor de Streamlit en el puerto y dirección especificados
-    os.system(f"streamlit run app/visualizacion/interfaz.py --server.port={puerto} --server.address=0.0.0.0")
+        # Aquí lanzo el servidor de Streamlit en el puerto y dirección especificados
+        os.system(f"streamlit run app/visualizacion/interfaz.py --server.port={puerto} --server.address=0.0.0.0")
+
+    # Si la interfaz es "api", levanto el servicio HTTP JSON para que otros programas pidan simulaciones
+    elif interfaz == "api":
+        try:
+            from servicio.api import ejecutar_servidor
+            from metricas import iniciar_servidor_metricas
+        except Exception:
+            from app.servicio.api import ejecutar_servidor
+            from app.metricas import iniciar_servidor_metricas
+
+        # Las métricas (latencias, errores, cachés) quedan en http://<host>:PUERTO_METRICAS/metrics
+        if puerto_metricas:
+            iniciar_servidor_metricas(int(puerto_metricas), host=host_metricas)
+            print(f" Métricas en http://{host_metricas}:{puerto_metricas}/metrics")
+
+        # Procesos del pool de cálculo (vacío = todos los núcleos) y tamaño de la caché de resultados
+        trabajadores = os.getenv("API_TRABAJADORES") or None
+        ejecutar_servidor(
+            host=host_api,
+            puerto=int(puerto),
+            trabajadores=int(trabajadores) if trabajadores else None,
+            max_cache=int(os.getenv("API_CACHE_MAX", "256"))
+        )
+
+    # Si no es ninguna de las anteriores, ejecuto el programa en modo terminal (sin interfaz gráfica)
+    else:
+        print("Ejecutando en modo terminal (sin interfaz gráfica)")
+
+        # Aquí corro los subcomandos de la terminal (por ejemplo: python app/main.py lote trabajos.json)
+        try:
+            from terminal import main as main_terminal
+            from metricas import iniciar_servidor_metricas
+        except Exception:
+            from app.terminal import main as main_terminal
+            from app.metricas import iniciar_servidor_metricas
 
-# Si la interfaz no es Streamlit, ejecuto el programa en modo terminal (sin interfaz gráfica)
-else:
-    print("Ejecutando en modo terminal (sin interfaz gráfica)")
\ No newline at end of file
+        # En corridas largas (lotes, cola de trabajos) también se pueden consultar las métricas
+        if puerto_metricas:
+            iniciar_servidor_metricas(int(puerto_metricas), host=host_metricas)
+        sys.exit(main_terminal(sys.argv[1:]))
\ No newline at end of file
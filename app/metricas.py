@@ -0,0 +1,338 @@
+import time
+import bisect
+import functools
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Prefijo de todas las métricas que expongo
+PREFIJO = "leyenfriamiento"
+
+# Límites (segundos) de las cubetas de los histogramas de latencia
+CUBETAS_LATENCIA = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+# 1. REGISTRO DE MÉTRICAS (CONTADORES E HISTOGRAMAS)
+
+class RegistroMetricas:
+    """
+    Yo guardo contadores e histogramas en memoria y los escribo en el formato
+    de texto de Prometheus. Registrar un valor cuesta un candado y una búsqueda
+    binaria, así que se puede hacer en cada solicitud sin notarse.
+
+    También acepto "colectores": funciones que llamo solo al exponer, para
+    métricas que ya lleva otro objeto (por ejemplo la caché de ajustes).
+    """
+
+    def __init__(self):
+        self._candado = threading.Lock()
+        self._familias = {}
+        self._colectores = []
+
+    def _serie(self, nombre, tipo, ayuda, etiquetas, inicial):
+        familia = self._familias.get(nombre)
+        if familia is None:
+            familia = self._familias[nombre] = {"tipo": tipo, "ayuda": ayuda, "series": {}}
+        clave = tuple(sorted(etiquetas.items()))
+        serie = familia["series"].get(clave)
+        if serie is None:
+            serie = familia["series"][clave] = inicial()
+        return serie
+
+    def incrementar(self, nombre, etiquetas=None, cantidad=1, ayuda=""):
+        with self._candado:
+            serie = self._serie(nombre, "counter", ayuda, etiquetas or {}, lambda: [0.0])
+            serie[0] += cantidad
+
+    def observar(self, nombre, valor, etiquetas=None, ayuda="", cubetas=CUBETAS_LATENCIA):
+        with self._candado:
+            serie = self._serie(
+                nombre, "histogram", ayuda, etiquetas or {},
+                lambda: {"cubetas": cubetas, "conteos": [0] * (len(cubetas) + 1), "suma": 0.0, "total": 0}
+            )
+            serie["conteos"][bisect.bisect_left(serie["cubetas"], valor)] += 1
+            serie["suma"] += valor
+            serie["total"] += 1
+
+    def agregar_colector(self, colector):
+        """
+        Yo registro una función que devuelve una lista de
+        (nombre, tipo, ayuda, etiquetas, valor) cada vez que se exponen las métricas.
+        """
+        with self._candado:
+            self._colectores.append(colector)
+
+    def quitar_colector(self, colector):
+        with self._candado:
+            if colector in self._colectores:
+                self._colectores.remove(colector)
+
+    def total(self, nombre):
+        # Yo sumo todas las series de un contador (0 si todavía no existe)
+        with self._candado:
+            familia = self._familias.get(nombre)
+            return sum(serie[0] for serie in familia["series"].values()) if familia else 0.0
+
+    # -- pasar métricas entre procesos --
+    def extraer(self):
+        """
+        Yo devuelvo lo acumulado desde la última extracción y lo pongo en cero.
+        Sirve para que un proceso del pool mande sus métricas al principal.
+        """
+        with self._candado:
+            familias, self._familias = self._familias, {}
+        return familias
+
+    def combinar(self, familias):
+        # Yo sumo a este registro lo extraído de otro proceso
+        with self._candado:
+            for nombre, familia in familias.items():
+                for clave, valor in familia["series"].items():
+                    etiquetas = dict(clave)
+                    if familia["tipo"] == "counter":
+                        self._serie(nombre, "counter", familia["ayuda"], etiquetas, lambda: [0.0])[0] += valor[0]
+                    else:
+                        serie = self._serie(
+                            nombre, "histogram", familia["ayuda"], etiquetas,
+                            lambda: {"cubetas": valor["cubetas"], "conteos": [0] * len(valor["conteos"]),
+                                     "suma": 0.0, "total": 0}
+                        )
+                        for i, n in enumerate(valor["conteos"]):
+                            serie["conteos"][i] += n
+                        serie["suma"] += valor["suma"]
+                        serie["total"] += valor["total"]
+
+    # -- exposición --
+    def exponer(self):
+        """
+        Yo escribo todas las métricas en el formato de texto de Prometheus
+        """
+        lineas = []
+        with self._candado:
+            familias = {
+                nombre: {"tipo": f["tipo"], "ayuda": f["ayuda"],
+                         "series": {c: (dict(v, conteos=list(v["conteos"])) if isinstance(v, dict) else list(v))
+                                    for c, v in f["series"].items()}}
+                for nombre, f in self._familias.items()
+            }
+            colectores = list(self._colectores)
+
+        for nombre, familia in sorted(familias.items()):
+            completo = f"{PREFIJO}_{nombre}"
+            lineas.append(f"# HELP {completo} {familia['ayuda']}")
+            lineas.append(f"# TYPE {completo} {familia['tipo']}")
+            for clave, valor in sorted(familia["series"].items()):
+                etiquetas = dict(clave)
+                if familia["tipo"] == "counter":
+                    lineas.append(f"{completo}{_etiquetas(etiquetas)} {_numero(valor[0])}")
+                    continue
+                acumulado = 0
+                for limite, n in zip(list(valor["cubetas"]) + ["+Inf"], valor["conteos"]):
+                    acumulado += n
+                    le = limite if limite == "+Inf" else _numero(limite)
+                    lineas.append(f"{completo}_bucket{_etiquetas(dict(etiquetas, le=le))} {acumulado}")
+                lineas.append(f"{completo}_sum{_etiquetas(etiquetas)} {_numero(valor['suma'])}")
+                lineas.append(f"{completo}_count{_etiquetas(etiquetas)} {valor['total']}")
+
+        # Métricas de los colectores, agrupadas por nombre
+        agrupadas = {}
+        for colector in colectores:
+            try:
+                for nombre, tipo, ayuda, etiquetas, valor in colector():
+                    agrupadas.setdefault(nombre, (tipo, ayuda, []))[2].append((etiquetas, valor))
+            except Exception:
+                # Un colector que falla no debe tumbar la exposición del resto
+                continue
+        for nombre, (tipo, ayuda, series) in sorted(agrupadas.items()):
+            completo = f"{PREFIJO}_{nombre}"
+            lineas.append(f"# HELP {completo} {ayuda}")
+            lineas.append(f"# TYPE {completo} {tipo}")
+            for etiquetas, valor in series:
+                lineas.append(f"{completo}{_etiquetas(etiquetas or {})} {_numero(valor)}")
+
+        return "\n".join(lineas) + "\n"
+
+
+def _numero(valor):
+    return repr(float(valor)) if not float(valor).is_integer() else str(int(valor))
+
+
+def _etiquetas(etiquetas):
+    if not etiquetas:
+        return ""
+    partes = []
+    for nombre, valor in sorted(etiquetas.items()):
+        texto = str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        partes.append(f'{nombre}="{texto}"')
+    return "{" + ",".join(partes) + "}"
+
+
+
+# 2. REGISTRO GLOBAL Y ATAJOS
+
+REGISTRO = RegistroMetricas()
+
+
+def registrar_operacion(operacion, segundos, ok=True):
+    """
+    Yo anoto una operación terminada (simulación, carga de datos, ajuste):
+    su duración en el histograma y un conteo según haya salido bien o con error.
+    """
+    REGISTRO.observar("duracion_segundos", segundos, {"operacion": operacion},
+                      ayuda="Duración de cada operación en segundos")
+    REGISTRO.incrementar("operaciones_total", {"operacion": operacion, "resultado": "ok" if ok else "error"},
+                         ayuda="Operaciones terminadas, por resultado")
+
+
+@contextmanager
+def cronometro(operacion):
+    """
+    Yo mido el bloque `with cronometro("operacion"):` como una operación.
+    Si el bloque lanza una excepción, la cuento como error y la dejo pasar.
+    """
+    inicio = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        registrar_operacion(operacion, time.perf_counter() - inicio, ok=False)
+        raise
+    registrar_operacion(operacion, time.perf_counter() - inicio)
+
+
+def descartar_heredadas():
+    """
+    Initializer de los pools de procesos: con fork el proceso hereda las
+    métricas del principal y yo las descarto para no contarlas dos veces.
+    """
+    REGISTRO.extraer()
+
+
+def con_metricas(funcion, *argumentos):
+    """
+    Yo corro funcion(*argumentos) en un proceso del pool y devuelvo, junto al
+    resultado, las métricas que juntó ese proceso (simulación, carga de datos,
+    ajustes y sus cachés) para que el principal las sume con REGISTRO.combinar.
+    """
+    return funcion(*argumentos), REGISTRO.extraer()
+
+
+def medido(operacion):
+    """
+    Decorador: yo mido cada llamada a la función como una operación
+    """
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with cronometro(operacion):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+def medido_por_bloques(operacion):
+    """
+    Decorador para generadores que entregan la simulación por bloques: yo sumo
+    solo el tiempo que pasa dentro del generador (no el de quien consume los
+    bloques, que puede estar dibujando) y lo anoto cuando el generador termina.
+    Si quien consume lo abandona antes (cancelación), no anoto nada.
+    """
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            generador = funcion(*args, **kwargs)
+            segundos = 0.0
+            try:
+                while True:
+                    inicio = time.perf_counter()
+                    try:
+                        bloque = next(generador)
+                    except StopIteration:
+                        registrar_operacion(operacion, segundos + time.perf_counter() - inicio)
+                        return
+                    except Exception:
+                        registrar_operacion(operacion, segundos + time.perf_counter() - inicio, ok=False)
+                        raise
+                    segundos += time.perf_counter() - inicio
+                    yield bloque
+            finally:
+                generador.close()
+        return envoltura
+    return decorador
+
+
+# Cachés cuyos aciertos y fallos cuento: nombre -> texto de la ayuda
+CACHES = {"ajustes": "ajustes", "carga_datos": "carga de datos"}
+
+
+def registrar_cache(cache, acierto, nivel="memoria"):
+    """
+    Yo cuento una búsqueda en una de las CACHES: como acierto (por nivel,
+    memoria o disco) o como fallo. Al ser contadores del registro, los de los
+    procesos del pool también llegan al principal con extraer/combinar.
+    """
+    if acierto:
+        REGISTRO.incrementar(f"cache_{cache}_aciertos_total", {"nivel": nivel},
+                             ayuda=f"Aciertos de la caché de {CACHES[cache]}")
+    else:
+        REGISTRO.incrementar(f"cache_{cache}_fallos_total",
+                             ayuda=f"Fallos de la caché de {CACHES[cache]}")
+
+
+def _colector_caches():
+    # Las tasas salen de los contadores del registro, que ya incluyen los del pool
+    metricas = []
+    for cache, texto in CACHES.items():
+        aciertos = REGISTRO.total(f"cache_{cache}_aciertos_total")
+        total = aciertos + REGISTRO.total(f"cache_{cache}_fallos_total")
+        metricas.append((f"cache_{cache}_tasa_aciertos", "gauge",
+                         f"Fracción de búsquedas con acierto en la caché de {texto}",
+                         {}, aciertos / total if total else 0.0))
+
+    # El tamaño sí es el de la caché de ajustes de este proceso
+    try:
+        from procesos_datos.cache_ajustes import CACHE_AJUSTES
+    except Exception:
+        from app.procesos_datos.cache_ajustes import CACHE_AJUSTES
+    metricas.append(("cache_ajustes_entradas", "gauge",
+                     "Entradas en memoria de la caché de ajustes del proceso principal",
+                     {}, len(CACHE_AJUSTES)))
+    return metricas
+
+
+REGISTRO.agregar_colector(_colector_caches)
+
+
+
+# 3. SERVIDOR HTTP DE MÉTRICAS
+
+class _ManejadorMetricas(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/metricas", "/"):
+            self.send_error(404)
+            return
+        cuerpo = REGISTRO.exponer().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato, *args):
+        # Prometheus consulta seguido: no lleno la consola con cada consulta
+        pass
+
+
+def iniciar_servidor_metricas(puerto, host="127.0.0.1"):
+    """
+    Yo levanto el servidor de métricas en un hilo aparte (no bloquea) y lo
+    devuelvo. Las métricas quedan en http://host:puerto/metrics
+
+    Por defecto solo escucho en la propia máquina: las métricas no tienen
+    autenticación. Para que Prometheus las lea desde otra máquina hay que
+    pedir host="0.0.0.0" a propósito (HOST_METRICAS en el .env).
+    """
+    servidor = ThreadingHTTPServer((host, int(puerto)), _ManejadorMetricas)
+    servidor.daemon_threads = True
+    hilo = threading.Thread(target=servidor.serve_forever, name="servidor-metricas", daemon=True)
+    hilo.start()
+    return servidor
@@ -1,12 +1,31 @@
+import math
+import time
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import pandas as pd
 
-# Voy a intentar cargar la herramienta scipy para hacer ajustes de curvas
+# Cargo la caché de ajustes (funciona tanto desde app/ como desde la raíz del proyecto)
+try:
+    from procesos_datos.cache_ajustes import CACHE_AJUSTES, huella_datos, clave_ajuste
+    from procesos_datos.serie_ambiente import SerieAmbiente
+except Exception:
+    from app.procesos_datos.cache_ajustes import CACHE_AJUSTES, huella_datos, clave_ajuste
+    from app.procesos_datos.serie_ambiente import SerieAmbiente
+
+# Medición opcional de tiempos por etapa (no cuesta nada si está apagada)
 try:
-    from scipy.optimize import curve_fit
-    SCIPY_AVAILABLE = True  # ¡Perfecto! Tengo la herramienta disponible
-except:
-    SCIPY_AVAILABLE = False  # Ups, no tengo scipy instalado
+    from instrumentacion import instrumentado, contar
+    from metricas import medido
+except Exception:
+    from app.instrumentacion import instrumentado, contar
+    from app.metricas import medido
+
+# Reviso si scipy está instalado SIN importarlo: cargar scipy.optimize es lento
+# y solo hace falta para el ajuste con periodo libre
+SCIPY_AVAILABLE = importlib.util.find_spec("scipy") is not None
+curve_fit = None  # La cargo la primera vez que la necesito
 
 
 
@@ -22,85 +41,534 @@ def modelo_sinusoidal(t, alpha, beta, gamma, phi):
     return alpha + beta * np.sin(gamma * t + phi)
 
 
+def jacobiano_sinusoidal(t, alpha, beta, gamma, phi):
+    """
+    Yo calculo las derivadas exactas del modelo respecto a cada parámetro.
+    Así curve_fit no tiene que estimarlas con diferencias finitas.
+
+    Devuelvo una matriz (n, 4) con columnas d/dalpha, d/dbeta, d/dgamma, d/dphi
+    """
+    t = np.asarray(t, dtype=float)
+    angulo = gamma * t + phi
+    seno = np.sin(angulo)
+    coseno = np.cos(angulo)
+    return np.column_stack([
+        np.ones_like(t),        # d/dalpha
+        seno,                   # d/dbeta
+        beta * t * coseno,      # d/dgamma
+        beta * coseno           # d/dphi
+    ])
 
-# 2. FUNCIÓN PRINCIPAL: ENCUENTRO LOS MEJORES PARÁMETROS PARA LA CURVA
 
-def ajustar_sinusoidal(datos):
+class ModeloSinusoidal:
     """
-    Yo tomo los datos reales de temperatura y encuentro la curva sinusoidal 
-    que mejor se ajusta a esos datos.
-    
-    Es como encontrar la ola perfecta que pasa por la mayoría de puntos
+    Yo guardo los parámetros de la curva ajustada y me puedo evaluar como una función.
+    Acepto un tiempo suelto (devuelvo un float) o un arreglo completo de tiempos
+    (devuelvo un arreglo), así no hace falta llamarme punto por punto.
     """
 
-    # Primero verifico si tengo la herramienta necesaria
-    if not SCIPY_AVAILABLE:
-        raise ImportError(
-            "Necesito SciPy para hacer este trabajo. Instálalo con: pip install scipy"
+    __slots__ = ("alpha", "beta", "gamma", "phi")
+
+    def __init__(self, alpha, beta, gamma, phi):
+        self.alpha = float(alpha)
+        self.beta = float(beta)
+        self.gamma = float(gamma)
+        self.phi = float(phi)
+
+    @property
+    def parametros(self):
+        # Devuelvo los parámetros en el mismo orden que usa modelo_sinusoidal
+        return (self.alpha, self.beta, self.gamma, self.phi)
+
+    @classmethod
+    def desde_parametros(cls, parametros):
+        # Reconstruyo el modelo a partir de la tupla (alpha, beta, gamma, phi)
+        return cls(*parametros)
+
+    def __call__(self, t):
+        if np.ndim(t) == 0:
+            # Para un solo tiempo uso math, que es mucho más rápido que numpy con escalares
+            return self.alpha + self.beta * math.sin(self.gamma * float(t) + self.phi)
+        t = np.asarray(t, dtype=float)
+        return self.alpha + self.beta * np.sin(self.gamma * t + self.phi)
+
+    def __repr__(self):
+        return (f"ModeloSinusoidal(alpha={self.alpha:.4g}, beta={self.beta:.4g}, "
+                f"gamma={self.gamma:.4g}, phi={self.phi:.4g})")
+
+
+
+class ParametrosFourier(tuple):
+    """
+    Yo soy la tupla plana (a0, omega, a..., b...) de un ModeloFourier. Me
+    comporto igual que una tupla, pero así se me distingue de los cuatro
+    parámetros de la sinusoide (con 1 armónico también somos 4 números).
+    """
+    __slots__ = ()
+
+
+class ModeloFourier:
+    """
+    Yo represento la temperatura como una suma de varias ondas (armónicos):
+    Temperatura(t) = a0 + suma_k [ a_k*cos(k*w*t) + b_k*sin(k*w*t) ]
+
+    Con más armónicos puedo copiar formas que una sola onda no logra,
+    como la meseta plana del mediodía.
+
+    Para evaluarme solo calculo un seno y un coseno por tiempo; los demás
+    armónicos salen de la recurrencia del ángulo suma:
+    cos((k+1)x) = cos(kx)cos(x) - sin(kx)sin(x)
+    sin((k+1)x) = sin(kx)cos(x) + cos(kx)sin(x)
+    """
+
+    __slots__ = ("a0", "a", "b", "omega")
+
+    def __init__(self, a0, a, b, omega):
+        self.a0 = float(a0)
+        self.a = np.asarray(a, dtype=float).ravel()
+        self.b = np.asarray(b, dtype=float).ravel()
+        self.omega = float(omega)
+        if self.a.shape != self.b.shape:
+            raise ValueError("Los coeficientes a y b deben tener el mismo número de armónicos.")
+
+    @property
+    def orden(self):
+        return len(self.a)
+
+    @property
+    def periodo(self):
+        return 2 * np.pi / self.omega
+
+    @property
+    def parametros(self):
+        # Devuelvo (a0, omega, a_1..a_N, b_1..b_N) como una tupla plana de números
+        return ParametrosFourier(
+            (self.a0, self.omega) + tuple(float(x) for x in self.a) + tuple(float(x) for x in self.b)
         )
 
+    @classmethod
+    def desde_parametros(cls, parametros):
+        # Reconstruyo el modelo a partir de la tupla plana (a0, omega, a..., b...)
+        a0, omega = parametros[0], parametros[1]
+        resto = list(parametros[2:])
+        orden = len(resto) // 2
+        return cls(a0, resto[:orden], resto[orden:], omega)
+
+    def __call__(self, t):
+        escalar = np.ndim(t) == 0
+        t = np.asarray(t, dtype=float)
+
+        x = self.omega * t
+        s1 = np.sin(x)
+        c1 = np.cos(x)
+        sk, ck = s1, c1
+        resultado = np.full(t.shape, self.a0)
+        for k in range(self.orden):
+            resultado = resultado + self.a[k] * ck + self.b[k] * sk
+            # Avanzo al siguiente armónico sin volver a llamar a sin/cos
+            sk, ck = sk * c1 + ck * s1, ck * c1 - sk * s1
+
+        return float(resultado) if escalar else resultado
+
+    def __repr__(self):
+        return f"ModeloFourier(orden={self.orden}, periodo={self.periodo:.4g}, a0={self.a0:.4g})"
+
+
+# 2. FUNCIONES AUXILIARES PARA LOS DOS TIPOS DE AJUSTE
+
+def _extraer_columnas(datos):
+    """
+    Yo reviso los datos y saco los tiempos y temperaturas como arreglos de números.
+    Acepto una SerieAmbiente (ya validada) o una tabla de pandas.
+    """
     # Verifico que me hayan dado datos para trabajar
     if datos is None:
         raise ValueError("No me diste ningún dato para ajustar la curva.")
 
+    # Una SerieAmbiente ya trae los arreglos listos
+    if isinstance(datos, SerieAmbiente):
+        return datos.tiempo, datos.Tam
+
     # Me aseguro de que los datos tengan las columnas correctas
     if "tiempo" not in datos.columns or "Tam" not in datos.columns:
         raise ValueError("Necesito que los datos tengan columnas llamadas 'tiempo' y 'Tam'")
 
     # Extraigo los tiempos y temperaturas de la tabla
-    tiempos = datos["tiempo"].values
-    temperaturas = datos["Tam"].values
+    tiempos = np.asarray(datos["tiempo"].values, dtype=float)
+    temperaturas = np.asarray(datos["Tam"].values, dtype=float)
+    return tiempos, temperaturas
+
+
+def _ajuste_periodo_fijo(tiempos, temperaturas, periodo):
+    """
+    Cuando ya sé el periodo, la curva se puede escribir como:
+    Temperatura(t) = alpha + a*sin(w*t) + b*cos(w*t)
+
+    Eso es lineal en (alpha, a, b), así que lo resuelvo de una sola vez con mínimos
+    cuadrados: es exacto, no necesita valores iniciales y no puede divergir.
+    """
+    if periodo is None or not np.isfinite(periodo) or periodo <= 0:
+        raise ValueError("El periodo debe ser un número positivo.")
+
+    if len(tiempos) < 3:
+        raise ValueError("Necesito al menos 3 puntos para ajustar la curva sinusoidal.")
+
+    omega = 2 * np.pi / periodo
 
-    # Ahora hago una estimación inicial de los parámetros para ayudar al ajuste
-    # Empiezo con valores razonables basados en los datos
-    alpha_0 = np.mean(temperaturas)  # Tomo el promedio de temperatura como punto de partida
-    beta_0 = (temperaturas.max() - temperaturas.min()) / 2  # Calculo cuánto varía la temperatura
-    gamma_0 = 2 * np.pi / 24  # Supongo que el patrón se repite cada 24 horas
-    phi_0 = 0  # Empiezo con fase cero
+    # Armo la matriz de diseño con una columna por cada término lineal
+    X = np.column_stack([
+        np.ones_like(tiempos),
+        np.sin(omega * tiempos),
+        np.cos(omega * tiempos)
+    ])
+    coeficientes, _, _, _ = np.linalg.lstsq(X, temperaturas, rcond=None)
+    alpha, a, b = coeficientes
 
-    # Junto todas mis estimaciones iniciales
-    p0 = [alpha_0, beta_0, gamma_0, phi_0]
+    # Paso de (a, b) a amplitud y fase: a*sin(x) + b*cos(x) = beta*sin(x + phi)
+    beta = float(np.hypot(a, b))
+    phi = float(np.arctan2(b, a))
+    return alpha, beta, omega, phi
+
+
+def _ajuste_periodo_libre(tiempos, temperaturas, p0=None):
+    """
+    Si el periodo también es una incógnita, el problema ya no es lineal y uso curve_fit.
+    Le paso el jacobiano exacto para que cada iteración sea más barata y estable.
+    """
+    curve_fit = _cargar_curve_fit()
+
+    if p0 is None:
+        # Arranco desde el ajuste lineal con periodo de 24 horas, que ya es muy bueno
+        alpha_0, beta_0, gamma_0, phi_0 = _ajuste_periodo_fijo(tiempos, temperaturas, 24.0)
+        if beta_0 < 1e-12:
+            # Si los datos son casi planos, uso la mitad del rango como amplitud inicial
+            beta_0 = (temperaturas.max() - temperaturas.min()) / 2
+        p0 = [alpha_0, beta_0, gamma_0, phi_0]
 
     try:
         # Aquí está la magia: le digo a curve_fit que encuentre los mejores parámetros
         # para que mi curva sinusoidal pase lo más cerca posible de todos los puntos reales
         parametros, _ = curve_fit(
-            modelo_sinusoidal, tiempos, temperaturas, p0=p0
+            modelo_sinusoidal, tiempos, temperaturas, p0=list(p0),
+            jac=jacobiano_sinusoidal
         )
     except Exception as e:
         raise RuntimeError(f"No pude ajustar la curva a tus datos: {e}")
 
+    return tuple(float(p) for p in parametros)
+
+
+def _cargar_curve_fit():
+    # Primero verifico si tengo la herramienta necesaria
+    global curve_fit
+    if curve_fit is None:
+        if not SCIPY_AVAILABLE:
+            raise ImportError(
+                "Necesito SciPy para hacer este trabajo. Instálalo con: pip install scipy"
+            )
+        # Solo la primera vez pago el costo de importar scipy.optimize
+        from scipy.optimize import curve_fit as _curve_fit
+        curve_fit = _curve_fit
+    return curve_fit
+
+
+
+# 3. FUNCIÓN PRINCIPAL: ENCUENTRO LOS MEJORES PARÁMETROS PARA LA CURVA
+
+@instrumentado()
+def ajustar_sinusoidal(datos, periodo_fijo=None):
+    """
+    Yo tomo los datos reales de temperatura y encuentro la curva sinusoidal 
+    que mejor se ajusta a esos datos.
+    
+    Es como encontrar la ola perfecta que pasa por la mayoría de puntos.
+
+    - Si me das periodo_fijo (por ejemplo 24 horas), resuelvo el ajuste de forma
+      exacta con mínimos cuadrados lineales (no necesito SciPy).
+    - Si no, busco también el periodo con curve_fit y el jacobiano analítico.
+    """
+
+    tiempos, temperaturas = _extraer_columnas(datos)
+
+    if periodo_fijo is not None:
+        parametros = _ajuste_periodo_fijo(tiempos, temperaturas, float(periodo_fijo))
+    else:
+        parametros = _ajuste_periodo_libre(tiempos, temperaturas)
+
     # Separo los parámetros que encontré
-    alpha, beta, gamma, phi = parametros
+    alpha, beta, gamma, phi = (float(p) for p in parametros)
 
-    # Ahora creo una función práctica que cualquiera puede usar
-    def Tam_ajustada(t):
-        # Esta función ya sabe calcular la temperatura en cualquier momento
-        # usando la curva que acabo de encontrar
-        return modelo_sinusoidal(t, alpha, beta, gamma, phi)
+    # Devuelvo tanto los parámetros como el modelo listo para usar
+    return (alpha, beta, gamma, phi), ModeloSinusoidal(alpha, beta, gamma, phi)
 
-    # Devuelvo tanto los parámetros como la función lista para usar
-    return (alpha, beta, gamma, phi), Tam_ajustada
 
 
+def _es_muestreo_uniforme(tiempos, rtol=1e-6):
+    """
+    Yo reviso si los tiempos están igualmente espaciados (por ejemplo, una medida cada hora)
+    """
+    if len(tiempos) < 2:
+        return False
+    pasos = np.diff(tiempos)
+    return bool(pasos[0] > 0 and np.allclose(pasos, pasos[0], rtol=rtol, atol=0))
+
+
+def _ajuste_fourier_fft(tiempos, temperaturas, orden, periodo):
+    """
+    Si los datos son uniformes y cubren un número entero de periodos, la FFT me da
+    directamente los coeficientes de mínimos cuadrados en O(n log n).
+    Devuelvo None si los datos no cumplen esas condiciones.
+    """
+    n = len(tiempos)
+    dt = tiempos[1] - tiempos[0]
+    ciclos = n * dt / periodo
+    m = int(round(ciclos))
+    if m < 1 or not np.isclose(ciclos, m, rtol=1e-6):
+        return None
+    # El armónico más alto tiene que quedar por debajo de la frecuencia de Nyquist
+    if 2 * orden * m >= n:
+        return None
+
+    espectro = np.fft.rfft(temperaturas)
+    omega = 2 * np.pi / periodo
+    k = np.arange(1, orden + 1)
+
+    # Cada armónico k cae en la casilla k*m del espectro; corrijo el desfase por t0
+    c = 2 * espectro[k * m] / n * np.exp(-1j * k * omega * tiempos[0])
+    return espectro[0].real / n, c.real, -c.imag
+
+
+def _ajuste_fourier_lineal(tiempos, temperaturas, orden, periodo):
+    """
+    Para muestras irregulares armo la matriz de diseño con todos los armónicos
+    y resuelvo un único problema lineal de mínimos cuadrados
+    """
+    omega = 2 * np.pi / periodo
+    k = np.arange(1, orden + 1)
+    angulos = np.outer(tiempos, k * omega)
+    X = np.hstack([np.ones((len(tiempos), 1)), np.cos(angulos), np.sin(angulos)])
+    coeficientes, _, _, _ = np.linalg.lstsq(X, temperaturas, rcond=None)
+    return coeficientes[0], coeficientes[1:orden + 1], coeficientes[orden + 1:]
+
+
+@instrumentado()
+def ajustar_fourier(datos, orden=3, periodo=24.0):
+    """
+    Yo ajusto un modelo de varios armónicos (ModeloFourier) a los datos de temperatura.
+
+    - orden: cuántos armónicos uso (1 equivale a la curva sinusoidal de periodo fijo)
+    - periodo: el periodo fundamental en horas (24 para el ciclo diario)
+
+    Si los datos son uniformes uso la FFT; si no, mínimos cuadrados lineales.
+    """
+    orden = int(orden)
+    if orden < 1:
+        raise ValueError("El orden del modelo de Fourier debe ser al menos 1.")
+    if periodo is None or not np.isfinite(periodo) or periodo <= 0:
+        raise ValueError("El periodo debe ser un número positivo.")
+
+    tiempos, temperaturas = _extraer_columnas(datos)
+    if len(tiempos) < 2 * orden + 1:
+        raise ValueError(
+            f"Necesito al menos {2 * orden + 1} puntos para ajustar {orden} armónicos."
+        )
+
+    coeficientes = None
+    if _es_muestreo_uniforme(tiempos):
+        coeficientes = _ajuste_fourier_fft(tiempos, temperaturas, orden, float(periodo))
+    if coeficientes is None:
+        coeficientes = _ajuste_fourier_lineal(tiempos, temperaturas, orden, float(periodo))
+
+    a0, a, b = coeficientes
+    modelo = ModeloFourier(a0, a, b, 2 * np.pi / float(periodo))
+    return modelo.parametros, modelo
+
+
+# 3.1 AJUSTE EN LOTE: MUCHAS SERIES (SENSORES, DÍAS) EN UNA SOLA LLAMADA
+
+def _ajustar_fila_libre(argumentos):
+    """
+    Yo ajusto una sola serie con periodo libre. Vivo a nivel de módulo para que
+    el pool de procesos me pueda enviar a otros núcleos.
+    """
+    tiempos, temperaturas, p0 = argumentos
+    try:
+        return _ajuste_periodo_libre(tiempos, temperaturas, p0=p0)
+    except Exception:
+        return None
 
-# 3. FUNCIÓN PARA GENERAR UNA CURVA SUAVE A PARTIR DE LOS PARÁMETROS
+
+def ajustar_lote(tiempos, temperaturas, periodo_fijo=24.0, procesos=None, bloque=64):
+    """
+    Yo ajusto la curva sinusoidal a muchas series a la vez.
+
+    - tiempos: arreglo (muestras,) con los tiempos compartidos por todas las series
+    - temperaturas: matriz (series, muestras), una fila por sensor o por día
+    - periodo_fijo: si lo indico, todas las series se resuelven con UN solo
+      problema lineal de mínimos cuadrados sobre la misma matriz de diseño
+    - periodo_fijo=None: ajusto también el periodo con curve_fit, repartiendo
+      las series en un pool de procesos (procesos=1 lo hace todo aquí mismo)
+
+    Devuelvo una tabla con una fila por serie: alpha, beta, gamma, phi,
+    rmse, r2, residuo_max y ajuste_ok. En tabla.attrs["ajustes_por_segundo"]
+    dejo el rendimiento obtenido.
+    """
+    inicio = time.perf_counter()
+
+    tiempos = np.asarray(tiempos, dtype=float).ravel()
+    Y = np.atleast_2d(np.asarray(temperaturas, dtype=float))
+    if Y.shape[1] != len(tiempos):
+        raise ValueError(
+            f"Cada serie debe tener {len(tiempos)} muestras, pero recibí una matriz {Y.shape}."
+        )
+    if not np.all(np.isfinite(tiempos)) or not np.all(np.isfinite(Y)):
+        raise ValueError("Los tiempos y temperaturas del lote no pueden tener valores vacíos.")
+    if len(tiempos) < 3:
+        raise ValueError("Necesito al menos 3 muestras por serie para ajustar la curva.")
+
+    # Paso 1: solución lineal para todas las series a la vez (periodo fijo o semilla)
+    periodo_lineal = float(periodo_fijo) if periodo_fijo is not None else 24.0
+    omega = 2 * np.pi / periodo_lineal
+    X = np.column_stack([
+        np.ones_like(tiempos),
+        np.sin(omega * tiempos),
+        np.cos(omega * tiempos)
+    ])
+    # lstsq resuelve todas las columnas del lado derecho con una sola factorización
+    coeficientes, _, _, _ = np.linalg.lstsq(X, Y.T, rcond=None)
+    alpha, a, b = coeficientes
+    beta = np.hypot(a, b)
+    phi = np.arctan2(b, a)
+    gamma = np.full(len(Y), omega)
+    ajuste_ok = np.ones(len(Y), dtype=bool)
+
+    # Paso 2 (opcional): refino cada serie con periodo libre en paralelo
+    if periodo_fijo is None:
+        rango = (Y.max(axis=1) - Y.min(axis=1)) / 2
+        beta_0 = np.where(beta < 1e-12, rango, beta)
+        tareas = [
+            (tiempos, Y[i], (alpha[i], beta_0[i], omega, phi[i]))
+            for i in range(len(Y))
+        ]
+        if procesos == 1 or len(tareas) == 1:
+            resultados = [_ajustar_fila_libre(tarea) for tarea in tareas]
+        else:
+            with ProcessPoolExecutor(max_workers=procesos) as pool:
+                resultados = list(pool.map(_ajustar_fila_libre, tareas, chunksize=max(1, int(bloque))))
+
+        for i, parametros in enumerate(resultados):
+            if parametros is None:
+                ajuste_ok[i] = False
+                alpha[i] = beta[i] = gamma[i] = phi[i] = np.nan
+            else:
+                alpha[i], beta[i], gamma[i], phi[i] = parametros
+
+    # Paso 3: estadísticas de residuos, todas vectorizadas
+    ajustadas = alpha[:, None] + beta[:, None] * np.sin(gamma[:, None] * tiempos[None, :] + phi[:, None])
+    residuos = Y - ajustadas
+    rmse = np.sqrt(np.mean(residuos ** 2, axis=1))
+    suma_total = np.sum((Y - Y.mean(axis=1, keepdims=True)) ** 2, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r2 = 1 - np.sum(residuos ** 2, axis=1) / suma_total
+    residuo_max = np.max(np.abs(residuos), axis=1)
+
+    tabla = pd.DataFrame({
+        "alpha": alpha,
+        "beta": beta,
+        "gamma": gamma,
+        "phi": phi,
+        "rmse": rmse,
+        "r2": r2,
+        "residuo_max": residuo_max,
+        "ajuste_ok": ajuste_ok
+    })
+
+    duracion = time.perf_counter() - inicio
+    tabla.attrs["segundos"] = duracion
+    tabla.attrs["ajustes_por_segundo"] = len(Y) / duracion if duracion > 0 else float("inf")
+    return tabla
+
+
+# 3.2 AJUSTE CON CACHÉ: NO REPITO AJUSTES DE DATOS QUE YA CONOZCO
+
+# Para cada familia de modelos guardo cómo se ajusta y cómo se reconstruye
+_FAMILIAS = {
+    "sinusoidal": (ajustar_sinusoidal, ModeloSinusoidal.desde_parametros),
+    "fourier": (ajustar_fourier, ModeloFourier.desde_parametros),
+}
+
+
+@medido("ajuste")
+@instrumentado()
+def ajustar_modelo_ambiente(datos, tipo="sinusoidal", cache=None, usar_cache=True, **opciones):
+    """
+    Yo ajusto el modelo de temperatura ambiente del tipo pedido ("sinusoidal"
+    o "fourier"), pero antes reviso si ya lo ajusté con exactamente los mismos
+    datos y opciones. En ese caso reconstruyo el modelo sin volver a ajustar.
+
+    Las opciones se pasan tal cual a la función de ajuste
+    (por ejemplo periodo_fijo=24 o orden=3, periodo=24).
+    """
+    if tipo not in _FAMILIAS:
+        raise ValueError(f"Tipo de modelo desconocido: '{tipo}'. Usa: {', '.join(_FAMILIAS)}")
+
+    funcion_ajuste, reconstruir = _FAMILIAS[tipo]
+    if not usar_cache:
+        return funcion_ajuste(datos, **opciones)
+
+    cache = CACHE_AJUSTES if cache is None else cache
+    if isinstance(datos, SerieAmbiente):
+        # La serie ya trae su huella calculada
+        huella = datos.huella
+    else:
+        huella = huella_datos(*_extraer_columnas(datos))
+    clave = clave_ajuste(huella, tipo, opciones)
+
+    guardado = cache.obtener(clave)
+    if guardado is not None:
+        contar("cache_ajustes_aciertos")
+        modelo = reconstruir(guardado)
+        return modelo.parametros, modelo
+
+    contar("cache_ajustes_fallos")
+    parametros, modelo = funcion_ajuste(datos, **opciones)
+    cache.guardar(clave, [float(p) for p in modelo.parametros])
+    return modelo.parametros, modelo
+
+
+# 4. FUNCIÓN PARA GENERAR UNA CURVA SUAVE A PARTIR DE LOS PARÁMETROS
 
 def generar_curva_ajustada(parametros, t_min=0, t_max=24, muestras=200):
     """
     Yo tomo los parámetros de la curva ajustada y genero una tabla con 
-    muchos puntos para dibujar una curva suave y bonita
-    """
-    alpha, beta, gamma, phi = parametros
+    muchos puntos para dibujar una curva suave y bonita.
 
+    También acepto directamente un modelo ya ajustado (ModeloSinusoidal,
+    ModeloFourier o cualquier función vectorizada de t), o los parámetros que
+    devuelve ajustar_fourier. Una tupla suelta solo puede ser la de la
+    sinusoide (alpha, beta, gamma, phi).
+    """
     # Creo muchos puntos de tiempo entre el mínimo y máximo
     t = np.linspace(t_min, t_max, muestras)
-    
+
+    # Los parámetros de Fourier se reconocen por su tipo: rearmo el modelo
+    if isinstance(parametros, ParametrosFourier):
+        parametros = ModeloFourier.desde_parametros(parametros)
+
     # Calculo la temperatura para cada uno de esos tiempos
-    T = modelo_sinusoidal(t, alpha, beta, gamma, phi)
+    if callable(parametros):
+        T = np.asarray(parametros(t), dtype=float)
+    else:
+        if len(parametros) != 4:
+            raise ValueError(
+                f"Esperaba los 4 parámetros de la sinusoide (alpha, beta, gamma, phi) y recibí "
+                f"{len(parametros)}. Para un modelo de Fourier pasa el modelo ajustado."
+            )
+        alpha, beta, gamma, phi = parametros
+        T = modelo_sinusoidal(t, alpha, beta, gamma, phi)
 
     # Devuelvo una tabla ordenada con tiempos y temperaturas
     return pd.DataFrame({
         "tiempo": t,
         "Tam": T
-    })
\ No newline at end of file
+    })
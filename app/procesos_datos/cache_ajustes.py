@@ -0,0 +1,200 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
+# Los aciertos y fallos también van al registro de métricas (ver app/metricas.py)
+try:
+    from metricas import registrar_cache
+except Exception:
+    from app.metricas import registrar_cache
+
+
+# 1. HUELLAS: IDENTIFICO LOS DATOS POR SU CONTENIDO
+
+def huella_datos(tiempos, temperaturas):
+    """
+    Yo calculo una huella (hash SHA-256) a partir del contenido de los arreglos
+    de tiempo y temperatura. Si los datos no cambian, la huella tampoco.
+    """
+    h = hashlib.sha256()
+    for arreglo in (tiempos, temperaturas):
+        valores = np.ascontiguousarray(arreglo, dtype=np.float64)
+        # Incluyo la forma para que [1, 2] + [3] no se confunda con [1] + [2, 3]
+        h.update(str(valores.shape).encode("utf-8"))
+        h.update(valores.tobytes())
+    return h.hexdigest()
+
+
+def clave_ajuste(huella, tipo, opciones=None):
+    """
+    Yo junto la huella de los datos, el tipo de modelo y sus opciones en una sola clave
+    """
+    texto = json.dumps(
+        {"huella": huella, "tipo": tipo, "opciones": opciones or {}},
+        sort_keys=True, default=str
+    )
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+
+# 2. CACHÉ EN MEMORIA (LRU) CON ALMACÉN OPCIONAL EN DISCO
+
+class CacheAjustes:
+    """
+    Yo guardo los parámetros de los modelos ya ajustados para no repetir el ajuste.
+
+    - En memoria mantengo como máximo max_entradas (saco la menos usada).
+    - Si me das una ruta, también guardo todo en un pequeño archivo SQLite para
+      que otros procesos o un reinicio del programa no tengan que volver a ajustar.
+      En disco mantengo como máximo max_disco filas (por defecto, las mismas que
+      en memoria) y borro las usadas hace más tiempo.
+
+    Los valores deben poder convertirse a JSON (listas, números, textos).
+    """
+
+    def __init__(self, max_entradas=256, ruta=None, max_disco=None):
+        self.max_entradas = max(1, int(max_entradas))
+        self.max_disco = max(1, int(max_disco)) if max_disco else self.max_entradas
+        self.ruta = ruta
+        self._memoria = OrderedDict()
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+
+        if self.ruta:
+            carpeta = os.path.dirname(os.path.abspath(self.ruta))
+            os.makedirs(carpeta, exist_ok=True)
+            with self._conectar() as conexion:
+                # "creado" guarda el último uso: con él elijo qué filas borrar
+                conexion.execute(
+                    "CREATE TABLE IF NOT EXISTS ajustes ("
+                    "clave TEXT PRIMARY KEY, valor TEXT NOT NULL, creado REAL NOT NULL)"
+                )
+                conexion.execute("CREATE INDEX IF NOT EXISTS ajustes_creado ON ajustes (creado)")
+
+    @contextmanager
+    def _conectar(self):
+        # Yo abro la conexión, confirmo (o deshago) la transacción y SIEMPRE la cierro:
+        # el "with" de sqlite3 solo confirma, no cierra
+        conexion = sqlite3.connect(self.ruta, timeout=5)
+        try:
+            with conexion:
+                yield conexion
+        finally:
+            conexion.close()
+
+    def obtener(self, clave):
+        """
+        Yo busco la clave primero en memoria y luego en disco. Devuelvo None si no está.
+        """
+        with self._candado:
+            if clave in self._memoria:
+                self._memoria.move_to_end(clave)
+                self.aciertos += 1
+                valor = self._memoria[clave]
+            else:
+                valor = None
+        if valor is not None:
+            registrar_cache("ajustes", True)
+            return valor
+
+        if self.ruta:
+            try:
+                with self._conectar() as conexion:
+                    fila = conexion.execute(
+                        "SELECT valor FROM ajustes WHERE clave = ?", (clave,)
+                    ).fetchone()
+                    if fila is not None:
+                        # Marco el uso para que el límite de disco no la borre primero
+                        conexion.execute("UPDATE ajustes SET creado = ? WHERE clave = ?",
+                                         (time.time(), clave))
+                if fila is not None:
+                    valor = json.loads(fila[0])
+            except (sqlite3.Error, ValueError):
+                valor = None
+
+        with self._candado:
+            if valor is None:
+                self.fallos += 1
+            else:
+                self.aciertos_disco += 1
+                self._guardar_en_memoria(clave, valor)
+        registrar_cache("ajustes", valor is not None, nivel="disco")
+        return valor
+
+    def guardar(self, clave, valor):
+        """
+        Yo guardo el valor en memoria y, si tengo ruta, también en disco
+        """
+        with self._candado:
+            self._guardar_en_memoria(clave, valor)
+
+        if self.ruta:
+            try:
+                with self._conectar() as conexion:
+                    conexion.execute(
+                        "INSERT OR REPLACE INTO ajustes (clave, valor, creado) VALUES (?, ?, ?)",
+                        (clave, json.dumps(valor), time.time())
+                    )
+                    # Igual que en memoria: no paso de max_disco filas
+                    conexion.execute(
+                        "DELETE FROM ajustes WHERE clave IN ("
+                        "SELECT clave FROM ajustes ORDER BY creado DESC LIMIT -1 OFFSET ?)",
+                        (self.max_disco,)
+                    )
+            except sqlite3.Error:
+                # Si el disco falla, la caché en memoria sigue funcionando
+                pass
+
+    def _guardar_en_memoria(self, clave, valor):
+        self._memoria[clave] = valor
+        self._memoria.move_to_end(clave)
+        while len(self._memoria) > self.max_entradas:
+            self._memoria.popitem(last=False)
+
+    def limpiar(self, incluir_disco=False):
+        """
+        Yo vacío la memoria (y el almacén en disco si me lo piden)
+        """
+        with self._candado:
+            self._memoria.clear()
+        if incluir_disco and self.ruta:
+            with self._conectar() as conexion:
+                conexion.execute("DELETE FROM ajustes")
+
+    def estadisticas(self):
+        """
+        Yo resumo cuántas veces encontré (o no) lo que me pidieron
+        """
+        with self._candado:
+            total = self.aciertos + self.aciertos_disco + self.fallos
+            return {
+                "entradas": len(self._memoria),
+                "aciertos": self.aciertos,
+                "aciertos_disco": self.aciertos_disco,
+                "fallos": self.fallos,
+                "tasa_aciertos": (self.aciertos + self.aciertos_disco) / total if total else 0.0
+            }
+
+    def __len__(self):
+        return len(self._memoria)
+
+
+
+# 3. CACHÉ COMPARTIDA POR DEFECTO
+
+# La configuro con variables de entorno (ver .env): si RUTA_CACHE_AJUSTES está
+# vacía, la caché vive solo en memoria
+CACHE_AJUSTES = CacheAjustes(
+    max_entradas=int(os.getenv("CACHE_AJUSTES_MAX", "256")),
+    ruta=os.getenv("RUTA_CACHE_AJUSTES") or None,
+    max_disco=int(os.getenv("CACHE_AJUSTES_MAX_DISCO") or 0) or None
+)
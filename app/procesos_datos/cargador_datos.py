@@ -2,6 +2,22 @@
 import pandas as pd  
 import numpy as np   
 
+# Cargo el filtro de atípicos (funciona tanto desde app/ como desde la raíz del proyecto)
+try:
+    from procesos_datos.filtro_atipicos import filtrar_bloques, filtrar_dataframe
+    from procesos_datos.serie_ambiente import como_serie
+except Exception:
+    from app.procesos_datos.filtro_atipicos import filtrar_bloques, filtrar_dataframe
+    from app.procesos_datos.serie_ambiente import como_serie
+
+# Medición opcional de tiempos por etapa (no cuesta nada si está apagada)
+try:
+    from instrumentacion import instrumentado
+    from metricas import medido
+except Exception:
+    from app.instrumentacion import instrumentado
+    from app.metricas import medido
+
 
 # 1. FUNCIÓN PARA REVISAR Y ARREGLAR LOS DATOS
 
@@ -40,13 +56,22 @@ def validar_dataframe(df):
 
 # 2. FUNCIÓN PARA LEER ARCHIVOS CSV
 
-def cargar_csv(archivo):
+@instrumentado()
+def cargar_csv(archivo, filtro=None, tamano_bloque=100_000):
     """
-    Esta función lee un archivo CSV y lo convierte en una tabla de datos
+    Esta función lee un archivo CSV y lo convierte en una tabla de datos.
+
+    Si se da un filtro de atípicos (FiltroHampel), el archivo se lee por bloques
+    de `tamano_bloque` filas y cada bloque pasa por el filtro antes de validar.
     """
     try:
-        # Leemos el archivo CSV y lo convertimos en tabla
-        df = pd.read_csv(archivo)
+        if filtro is None:
+            # Leemos el archivo CSV y lo convertimos en tabla
+            df = pd.read_csv(archivo)
+        else:
+            # Leemos el archivo por partes y filtramos los picos mientras leemos
+            bloques = pd.read_csv(archivo, chunksize=int(tamano_bloque))
+            df = filtrar_bloques(bloques, filtro)
         # Llamamos a nuestra función de validación para revisar que esté bien
         return validar_dataframe(df)
     except Exception as e:
@@ -83,10 +108,12 @@ def generar_modelo_variable_por_defecto():
 
 # 4. FUNCIÓN PARA PROCESAR DATOS QUE ESCRIBE EL USUARIO
 
-def procesar_datos_manual(lista_de_puntos):
+@instrumentado()
+def procesar_datos_manual(lista_de_puntos, filtro=None):
     """
     Esta función toma los datos que una persona escribe manualmente
-    y los convierte en una tabla organizada
+    y los convierte en una tabla organizada.
+    Si se da un filtro de atípicos, se aplica antes de validar.
     """
 
     # Si no nos dieron ningún dato, devolvemos nada
@@ -96,13 +123,19 @@ def procesar_datos_manual(lista_de_puntos):
     # Convertimos la lista de puntos en una tabla con columnas "tiempo" y "Tam"
     df = pd.DataFrame(lista_de_puntos, columns=["tiempo", "Tam"])
 
+    # Si nos pidieron limpiar picos raros, lo hacemos antes de validar
+    if filtro is not None:
+        df = filtrar_dataframe(df, filtro)
+
     # Llamamos a nuestra función de validación para revisar los datos
     return validar_dataframe(df)
 
 
 # 5. FUNCIÓN PRINCIPAL - DECIDE QUÉ DATOS USAR
 
-def obtener_datos(modo, archivo=None, lista_manual=None):
+@medido("carga_datos")
+@instrumentado()
+def obtener_datos(modo, archivo=None, lista_manual=None, filtro=None):
     """
     Esta es la función principal que decide de dónde tomar los datos
     según lo que elija el usuario:
@@ -110,6 +143,8 @@ def obtener_datos(modo, archivo=None, lista_manual=None):
     - Si elige "csv": usa un archivo de computadora
     - Si elige "manual": usa datos que escribe manualmente  
     - Si elige "automatica": usa temperaturas predefinidas
+
+    El filtro de atípicos opcional se aplica a los datos de CSV y manuales.
     """
 
     # Si el usuario eligió usar un archivo CSV
@@ -117,12 +152,12 @@ def obtener_datos(modo, archivo=None, lista_manual=None):
         if archivo is None:
             raise ValueError("No se ha proporcionado un archivo CSV.")
         # Leemos y validamos el archivo CSV
-        return cargar_csv(archivo)
+        return cargar_csv(archivo, filtro=filtro)
 
     # Si el usuario eligió escribir los datos manualmente
     elif modo == "manual":
         # Procesamos los datos que escribió
-        return procesar_datos_manual(lista_manual)
+        return procesar_datos_manual(lista_manual, filtro=filtro)
 
     # Si el usuario eligió el modo automático
     elif modo == "automatica":
@@ -131,4 +166,18 @@ def obtener_datos(modo, archivo=None, lista_manual=None):
 
     # Si el usuario eligió un modo que no existe
     else:
-        return None
\ No newline at end of file
+        return None
+
+
+# 6. FUNCIÓN PARA OBTENER LOS DATOS COMO SERIE AMBIENTE
+
+def obtener_serie(modo, archivo=None, lista_manual=None, filtro=None):
+    """
+    Esta función hace lo mismo que obtener_datos, pero entrega el resultado
+    como una SerieAmbiente (arreglos listos para interpolar, ajustar y simular).
+    Devuelve None si no hay datos.
+    """
+    datos = obtener_datos(modo, archivo=archivo, lista_manual=lista_manual, filtro=filtro)
+    if datos is None or len(datos) == 0:
+        return None
+    return como_serie(datos)
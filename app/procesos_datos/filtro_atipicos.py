@@ -0,0 +1,280 @@
+import math
+import time
+from bisect import bisect_left, insort
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+
+# Factor que convierte la MAD en una estimación de la desviación estándar (datos normales)
+_FACTOR_MAD = 1.4826
+
+
+
+# 1. FUNCIONES AUXILIARES SOBRE UNA VENTANA ORDENADA
+
+def _mediana_ordenada(ordenados):
+    """
+    Yo saco la mediana de una lista que ya está ordenada
+    """
+    m = len(ordenados)
+    mitad = m // 2
+    if m % 2:
+        return ordenados[mitad]
+    return 0.5 * (ordenados[mitad - 1] + ordenados[mitad])
+
+
+def _kesima_distancia(ordenados, centro, corte, k):
+    """
+    Yo busco la k-ésima distancia más pequeña |x - centro| dentro de la ventana
+    ordenada, sin calcular todas las distancias.
+
+    Las distancias a la izquierda del corte crecen hacia atrás y las de la derecha
+    crecen hacia adelante: son dos listas ordenadas, y el k-ésimo elemento de su
+    unión se encuentra con una búsqueda binaria en O(log w).
+    """
+    n_izq = corte
+    n_der = len(ordenados) - corte
+
+    def izquierda(i):
+        return centro - ordenados[corte - 1 - i]
+
+    def derecha(j):
+        return ordenados[corte + j] - centro
+
+    # Tomo i elementos de la izquierda y k+1-i de la derecha
+    bajo = max(0, k + 1 - n_der)
+    alto = min(k + 1, n_izq)
+    while bajo < alto:
+        i = (bajo + alto) // 2
+        j = k + 1 - i
+        if j > 0 and izquierda(i) < derecha(j - 1):
+            bajo = i + 1
+        else:
+            alto = i
+
+    i = bajo
+    j = k + 1 - i
+    candidatos = []
+    if i > 0:
+        candidatos.append(izquierda(i - 1))
+    if j > 0:
+        candidatos.append(derecha(j - 1))
+    return max(candidatos)
+
+
+def _mad_ordenada(ordenados, mediana):
+    """
+    Yo calculo la desviación absoluta mediana (MAD) de la ventana ordenada
+    """
+    m = len(ordenados)
+    corte = bisect_left(ordenados, mediana)
+    if m % 2:
+        return _kesima_distancia(ordenados, mediana, corte, m // 2)
+    return 0.5 * (
+        _kesima_distancia(ordenados, mediana, corte, m // 2 - 1)
+        + _kesima_distancia(ordenados, mediana, corte, m // 2)
+    )
+
+
+
+# 2. FILTRO DE HAMPEL EN FLUJO (POR BLOQUES)
+
+class FiltroHampel:
+    """
+    Yo detecto picos raros (atípicos) en las temperaturas de un sensor.
+
+    Para cada punto miro una ventana centrada de tamaño `ventana`: si el punto se
+    aleja de la mediana más de `n_sigmas` veces la desviación robusta (1.4826*MAD),
+    lo considero atípico. Según el modo:
+
+    - "reparar": lo reemplazo por la mediana de la ventana
+    - "marcar": lo dejo igual pero lo marco como atípico
+
+    Trabajo en flujo: me pueden dar los datos por bloques con procesar() y al
+    final llamar a finalizar(). Como la ventana está centrada, cada punto sale
+    con un retraso de ventana // 2 puntos. Mantengo la ventana ordenada con
+    bisect, así que la mediana y la MAD cuestan O(log w) comparaciones por punto.
+    """
+
+    MODOS = ("reparar", "marcar")
+
+    def __init__(self, ventana=7, n_sigmas=3.0, modo="reparar", umbral_minimo=0.0):
+        ventana = int(ventana)
+        if ventana < 3:
+            raise ValueError("La ventana del filtro debe tener al menos 3 puntos.")
+        if modo not in self.MODOS:
+            raise ValueError(f"Modo de filtro inválido: '{modo}'. Usa: {', '.join(self.MODOS)}")
+
+        # Con una ventana par uso la impar siguiente para que quede centrada
+        self.mitad = ventana // 2
+        self.ventana = 2 * self.mitad + 1
+        self.n_sigmas = float(n_sigmas)
+        self.modo = modo
+        self.umbral_minimo = float(umbral_minimo)
+        self.reiniciar()
+
+    def reiniciar(self):
+        """
+        Yo borro todo lo que llevo visto para empezar una serie nueva
+        """
+        self._crudos = deque()
+        self._ordenados = []
+        self._inicio = 0        # índice global del primer punto de la ventana
+        self._recibidos = 0
+        self._emitidos = 0
+        self._atipicos = 0
+        self._segundos = 0.0
+
+    def _agregar(self, x):
+        self._crudos.append(x)
+        insort(self._ordenados, x)
+        self._recibidos += 1
+        if len(self._crudos) > self.ventana:
+            self._quitar_primero()
+
+    def _quitar_primero(self):
+        viejo = self._crudos.popleft()
+        del self._ordenados[bisect_left(self._ordenados, viejo)]
+        self._inicio += 1
+
+    def _evaluar_siguiente(self, salida, marcas):
+        # Evalúo el punto centro de la ventana actual
+        valor = self._crudos[self._emitidos - self._inicio]
+        mediana = _mediana_ordenada(self._ordenados)
+        sigma = _FACTOR_MAD * _mad_ordenada(self._ordenados, mediana)
+        umbral = max(self.n_sigmas * sigma, self.umbral_minimo)
+
+        atipico = abs(valor - mediana) > umbral
+        if atipico:
+            self._atipicos += 1
+            if self.modo == "reparar":
+                valor = mediana
+
+        salida.append(valor)
+        marcas.append(atipico)
+        self._emitidos += 1
+
+    def procesar(self, valores):
+        """
+        Yo recibo un bloque de temperaturas y devuelvo (valores, atipicos) para los
+        puntos que ya tienen su ventana completa. Los demás salen en el siguiente
+        bloque o en finalizar().
+        """
+        inicio = time.perf_counter()
+        salida, marcas = [], []
+
+        for x in np.asarray(valores, dtype=float).ravel().tolist():
+            if not math.isfinite(x):
+                raise ValueError("El filtro de atípicos no acepta valores vacíos o infinitos.")
+            self._agregar(x)
+            if self._recibidos - 1 - self.mitad >= self._emitidos:
+                self._evaluar_siguiente(salida, marcas)
+
+        self._segundos += time.perf_counter() - inicio
+        return np.array(salida, dtype=float), np.array(marcas, dtype=bool)
+
+    def finalizar(self):
+        """
+        Yo proceso los últimos puntos, cuyas ventanas se recortan al final de la serie
+        """
+        inicio = time.perf_counter()
+        salida, marcas = [], []
+
+        while self._emitidos < self._recibidos:
+            primero = max(0, self._emitidos - self.mitad)
+            while self._inicio < primero:
+                self._quitar_primero()
+            self._evaluar_siguiente(salida, marcas)
+
+        self._segundos += time.perf_counter() - inicio
+        return np.array(salida, dtype=float), np.array(marcas, dtype=bool)
+
+    def reporte(self):
+        """
+        Yo resumo lo que hice: cuántos puntos vi, cuántos cambié o marqué y qué tan rápido
+        """
+        return {
+            "puntos_procesados": self._emitidos,
+            "puntos_atipicos": self._atipicos,
+            "puntos_modificados": self._atipicos if self.modo == "reparar" else 0,
+            "segundos": self._segundos,
+            "puntos_por_segundo": self._emitidos / self._segundos if self._segundos > 0 else float("inf")
+        }
+
+
+
+# 3. FUNCIONES PARA APLICAR EL FILTRO A TABLAS
+
+def filtrar_bloques(bloques, filtro):
+    """
+    Yo paso por el filtro una secuencia de tablas (por ejemplo, los bloques de
+    pd.read_csv con chunksize) y devuelvo una sola tabla filtrada.
+
+    Cada bloque se convierte a números y se limpia de filas vacías antes de
+    entrar al filtro. Agrego la columna "atipico" con las marcas.
+
+    La ventana del filtro tiene que ver vecinos en el tiempo: en flujo (una
+    sola pasada) eso solo vale si los datos llegan ordenados por tiempo. Si
+    encuentro un tiempo fuera de orden, al final ordeno toda la tabla y la
+    vuelvo a filtrar completa.
+    """
+    filtro.reiniciar()
+    partes, valores, marcas = [], [], []
+    ultimo_tiempo = -np.inf
+    ordenado = True
+
+    for bloque in bloques:
+        for col in ["tiempo", "Tam"]:
+            if col not in bloque.columns:
+                raise ValueError(f"El archivo CSV debe contener la columna '{col}'.")
+        bloque = bloque.copy()
+        bloque["tiempo"] = pd.to_numeric(bloque["tiempo"], errors="coerce")
+        bloque["Tam"] = pd.to_numeric(bloque["Tam"], errors="coerce")
+        bloque = bloque.dropna(subset=["tiempo", "Tam"])
+        if bloque.empty:
+            continue
+
+        tiempos = bloque["tiempo"].to_numpy()
+        if ordenado and (tiempos[0] < ultimo_tiempo or np.any(np.diff(tiempos) < 0)):
+            ordenado = False
+        ultimo_tiempo = tiempos[-1]
+
+        partes.append(bloque)
+        if not ordenado:
+            # Ya no sirve filtrar en flujo: solo guardo el bloque y filtro al final
+            continue
+        salida, marca = filtro.procesar(bloque["Tam"].values)
+        valores.append(salida)
+        marcas.append(marca)
+
+    salida, marca = filtro.finalizar()
+    valores.append(salida)
+    marcas.append(marca)
+
+    if not partes:
+        return pd.DataFrame(columns=["tiempo", "Tam", "atipico"])
+
+    df = pd.concat(partes, ignore_index=True)
+    if not ordenado:
+        # Orden estable: los tiempos repetidos conservan el orden del archivo
+        df = df.sort_values(by="tiempo", kind="mergesort").reset_index(drop=True)
+        filtro.reiniciar()
+        valores, marcas = [], []
+        for salida, marca in (filtro.procesar(df["Tam"].values), filtro.finalizar()):
+            valores.append(salida)
+            marcas.append(marca)
+
+    df["Tam"] = np.concatenate(valores)
+    df["atipico"] = np.concatenate(marcas)
+    return df
+
+
+def filtrar_dataframe(df, filtro):
+    """
+    Yo aplico el filtro a una tabla completa (por ejemplo, los datos manuales)
+    """
+    if df is None:
+        return None
+    return filtrar_bloques([df], filtro)
@@ -1,12 +1,71 @@
+import weakref
+import importlib.util
+
 import numpy as np
 import pandas as pd
 
-# Intento cargar la herramienta para hacer curvas suaves (SciPy)
+# Cargo el contenedor de la serie ambiente (funciona tanto desde app/ como desde la raíz)
 try:
-    from scipy.interpolate import CubicSpline
-    SCIPY_AVAILABLE = True  # ¡Bien! Tengo la herramienta de curvas suaves
-except:
-    SCIPY_AVAILABLE = False  # Ups, no tengo la herramienta de curvas suaves
+    from procesos_datos.serie_ambiente import SerieAmbiente
+except Exception:
+    from app.procesos_datos.serie_ambiente import SerieAmbiente
+
+# Medición opcional de tiempos por etapa (no cuesta nada si está apagada)
+try:
+    from instrumentacion import instrumentado, contar
+except Exception:
+    from app.instrumentacion import instrumentado, contar
+
+# Reviso si tengo la herramienta para hacer curvas suaves (SciPy) sin importarla:
+# scipy.interpolate es pesado y solo lo cargo la primera vez que piden un spline
+SCIPY_AVAILABLE = importlib.util.find_spec("scipy") is not None
+
+
+
+# 0. FUNCIONES AUXILIARES
+
+# Series ya construidas para cada tabla, por identidad de la tabla:
+# id(df) -> (referencia débil a df, columnas originales, serie)
+_SERIES_DE_TABLAS = {}
+
+
+def _a_serie(datos):
+    """
+    Yo convierto los datos en una SerieAmbiente. Si la tabla no tiene las
+    columnas que necesito, devuelvo None para que se use el valor por defecto.
+
+    Si me vuelven a pasar la MISMA tabla (por ejemplo, un tiempo suelto a la
+    vez) reutilizo la serie que ya construí, con su huella y su spline. Antes
+    compruebo que las columnas no cambiaron, porque una tabla de pandas se
+    puede modificar en su lugar.
+    """
+    if datos is None or isinstance(datos, SerieAmbiente):
+        return datos
+    if "tiempo" not in datos.columns or "Tam" not in datos.columns:
+        return None
+
+    tiempos = datos["tiempo"].to_numpy(dtype=np.float64)
+    temperaturas = datos["Tam"].to_numpy(dtype=np.float64)
+    clave = id(datos)
+    guardada = _SERIES_DE_TABLAS.get(clave)
+    if guardada is not None:
+        referencia, t_original, y_original, serie = guardada
+        if (referencia() is datos and np.array_equal(t_original, tiempos)
+                and np.array_equal(y_original, temperaturas)):
+            return serie
+
+    serie = SerieAmbiente(tiempos, temperaturas)
+    # Cuando la tabla desaparece, su entrada también
+    referencia = weakref.ref(datos, lambda _, c=clave: _SERIES_DE_TABLAS.pop(c, None))
+    _SERIES_DE_TABLAS[clave] = (referencia, tiempos.copy(), temperaturas.copy(), serie)
+    return serie
+
+
+def _constante(t, valor):
+    # Devuelvo el valor constante con la misma forma que t (número o arreglo)
+    if np.ndim(t) == 0:
+        return valor
+    return np.full(np.shape(t), float(valor))
 
 
 
@@ -15,35 +74,42 @@ except:
 def interpolacion_lineal(t, datos, default=25):
     """
     Yo calculo la temperatura en cualquier momento usando líneas rectas entre los puntos que conozco.
+    Puedo recibir un solo tiempo (devuelvo un número) o un arreglo de tiempos (devuelvo un arreglo).
     """
 
-    # Primero verifico si me dieron datos para trabajar
-    if datos is None:
-        return default  # Si no hay datos, uso el valor por defecto
-
-    # Reviso que los datos tengan las columnas que necesito
-    if "tiempo" not in datos.columns or "Tam" not in datos.columns:
-        return default  # Si faltan columnas importantes, uso el valor por defecto
+    # Primero verifico si me dieron datos para trabajar (y con las columnas que necesito)
+    serie = _a_serie(datos)
+    if serie is None:
+        return _constante(t, default)  # Si no hay datos, uso el valor por defecto
 
-    # Extraigo los tiempos y temperaturas que conozco
-    tiempos = datos["tiempo"].values    # Estos son los momentos donde sé la temperatura exacta
-    temperaturas = datos["Tam"].values  # Estas son las temperaturas que medí en esos momentos
+    # Estos son los momentos donde sé la temperatura exacta y las temperaturas medidas
+    tiempos = serie.tiempo
+    temperaturas = serie.Tam
 
-    # Ahora veo dónde está el tiempo que me preguntan
-    if t <= tiempos.min():
-        return temperaturas[0]  # Si me preguntan por un tiempo muy temprano, uso la primera temperatura que tengo
+    if np.ndim(t) == 0:
+        # Ahora veo dónde está el tiempo que me preguntan
+        if t <= serie.t_min:
+            return float(temperaturas[0])  # Si me preguntan por un tiempo muy temprano, uso la primera temperatura
 
-    if t >= tiempos.max():
-        return temperaturas[-1]  # Si me preguntan por un tiempo muy tarde, uso la última temperatura que tengo
+        if t >= serie.t_max:
+            return float(temperaturas[-1])  # Si me preguntan por un tiempo muy tarde, uso la última temperatura
 
     # Aquí hago la magia: calculo la temperatura exacta en cualquier punto intermedio
     # Tomo los dos puntos más cercanos y trazo una línea recta entre ellos
-    return float(np.interp(t, tiempos, temperaturas))
+    # (np.interp ya usa la primera/última temperatura fuera del rango)
+    resultado = np.interp(t, tiempos, temperaturas)
+    return float(resultado) if np.ndim(t) == 0 else resultado
 
 
 
 # 2. INTERPOLACIÓN SPLINE - Conecto puntos con curvas suaves
 
+@instrumentado("construir_spline")
+def _construir_spline(serie):
+    from scipy.interpolate import CubicSpline
+    return CubicSpline(serie.tiempo, serie.Tam, bc_type="natural")
+
+
 def interpolacion_spline(t, datos, default=25):
     """
     Yo calculo la temperatura usando curvas suaves que pasan por todos los puntos.
@@ -55,32 +121,40 @@ def interpolacion_spline(t, datos, default=25):
         return interpolacion_lineal(t, datos, default)
 
     # Verifico si me dieron datos para trabajar
-    if datos is None:
-        return default  # Si no hay datos, uso el valor por defecto
-
-    # Extraigo los tiempos y temperaturas que conozco
-    tiempos = datos["tiempo"].values
-    temperaturas = datos["Tam"].values
+    serie = _a_serie(datos)
+    if serie is None:
+        return _constante(t, default)  # Si no hay datos, uso el valor por defecto
 
-    # Aquí creo una curva suave que pasa exactamente por todos mis puntos conocidos
-    spline = CubicSpline(tiempos, temperaturas, bc_type="natural")
+    # Aquí creo una curva suave que pasa exactamente por todos mis puntos conocidos.
+    # La serie la guarda, así que solo la construyo la primera vez
+    spline = serie.memo("spline_natural", _construir_spline)
 
     # Uso mi curva suave para calcular la temperatura en el tiempo exacto que me preguntan
-    return float(spline(t))
+    resultado = spline(t)
+    return float(resultado) if np.ndim(t) == 0 else np.asarray(resultado, dtype=float)
 
 
 
 # 3. FUNCIÓN PRINCIPAL - Yo decido qué método usar
 
+@instrumentado()
 def temperatura_ambiente(t, datos, default=25, metodo="lineal"):
     """
     Yo soy la función principal que te dice la temperatura en cualquier momento.
     Decido si usar líneas rectas, curvas suaves, o temperatura constante.
+
+    Acepto datos como SerieAmbiente o como tabla de pandas, y t como un número
+    o como un arreglo (así se evalúan muchos tiempos en una sola llamada).
     """
 
+    contar("puntos_Tam", np.size(t))
+
+    # Convierto una sola vez aquí; los métodos de abajo ya reciben la serie
+    datos = _a_serie(datos)
+
     # Si no me dan datos, simplemente devuelvo la temperatura constante
     if datos is None:
-        return default
+        return _constante(t, default)
 
     # Si eligen el método de curvas suaves Y tengo la herramienta disponible
     if metodo == "spline" and SCIPY_AVAILABLE:
@@ -88,4 +162,4 @@ def temperatura_ambiente(t, datos, default=25, metodo="lineal"):
         return interpolacion_spline(t, datos, default)
 
     # Por defecto, uso el método confiable de líneas rectas
-    return interpolacion_lineal(t, datos, default)
\ No newline at end of file
+    return interpolacion_lineal(t, datos, default)
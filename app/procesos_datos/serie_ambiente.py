@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+# Cargo la función de huellas (funciona tanto desde app/ como desde la raíz del proyecto)
+try:
+    from procesos_datos.cache_ajustes import huella_datos
+except Exception:
+    from app.procesos_datos.cache_ajustes import huella_datos
+
+
+
+# 1. CONTENEDOR INMUTABLE DE LA SERIE DE TEMPERATURA AMBIENTE
+
+class SerieAmbiente:
+    """
+    Yo guardo una serie de temperatura ambiente (tiempo, Tam) lista para usarse
+    en todo el simulador: interpolación, ajuste de curvas y RK4.
+
+    Al crearme convierto todo a arreglos float64 contiguos (ordenados por tiempo y
+    de solo lectura) y calculo una sola vez:
+    - los límites t_min y t_max y el número de puntos n
+    - si el muestreo es uniforme y, en ese caso, el paso entre muestras
+    - una huella del contenido para usar como clave de caché
+
+    No se me puede modificar después de creada.
+    """
+
+    __slots__ = ("tiempo", "Tam", "n", "t_min", "t_max", "uniforme", "paso", "huella", "_memo")
+
+    def __init__(self, tiempo, Tam):
+        t = np.array(tiempo, dtype=np.float64).ravel()
+        y = np.array(Tam, dtype=np.float64).ravel()
+
+        if t.shape != y.shape:
+            raise ValueError("Los arreglos de tiempo y Tam deben tener el mismo tamaño.")
+        if len(t) == 0:
+            raise ValueError("La serie de temperatura ambiente no tiene datos.")
+        if not (np.all(np.isfinite(t)) and np.all(np.isfinite(y))):
+            raise ValueError("La serie de temperatura ambiente no puede tener valores vacíos.")
+
+        # Me aseguro de que los tiempos estén en orden creciente
+        if len(t) > 1 and np.any(np.diff(t) < 0):
+            orden = np.argsort(t, kind="stable")
+            t = t[orden]
+            y = y[orden]
+
+        t = np.ascontiguousarray(t)
+        y = np.ascontiguousarray(y)
+        t.flags.writeable = False
+        y.flags.writeable = False
+
+        uniforme = False
+        paso = None
+        if len(t) > 1:
+            pasos = np.diff(t)
+            if pasos[0] > 0 and np.allclose(pasos, pasos[0], rtol=1e-9, atol=0):
+                uniforme = True
+                paso = float((t[-1] - t[0]) / (len(t) - 1))
+
+        asignar = object.__setattr__
+        asignar(self, "tiempo", t)
+        asignar(self, "Tam", y)
+        asignar(self, "n", int(len(t)))
+        asignar(self, "t_min", float(t[0]))
+        asignar(self, "t_max", float(t[-1]))
+        asignar(self, "uniforme", uniforme)
+        asignar(self, "paso", paso)
+        asignar(self, "huella", huella_datos(t, y))
+        asignar(self, "_memo", {})
+
+    def __setattr__(self, nombre, valor):
+        raise AttributeError("SerieAmbiente es inmutable.")
+
+    def __delattr__(self, nombre):
+        raise AttributeError("SerieAmbiente es inmutable.")
+
+    def __len__(self):
+        return self.n
+
+    def __eq__(self, otra):
+        if not isinstance(otra, SerieAmbiente):
+            return NotImplemented
+        return self.huella == otra.huella
+
+    def __hash__(self):
+        return hash(self.huella)
+
+    def __repr__(self):
+        espaciado = f"paso={self.paso:.4g}" if self.uniforme else "no uniforme"
+        return f"SerieAmbiente(n={self.n}, t=[{self.t_min:.4g}, {self.t_max:.4g}], {espaciado})"
+
+    def memo(self, clave, fabrica):
+        """
+        Yo guardo objetos derivados de la serie (por ejemplo un spline) para
+        construirlos una sola vez. Como la serie no cambia, nunca quedan viejos.
+        """
+        if clave not in self._memo:
+            self._memo[clave] = fabrica(self)
+        return self._memo[clave]
+
+    @classmethod
+    def desde_dataframe(cls, df):
+        """
+        Yo convierto una tabla con columnas "tiempo" y "Tam" en una SerieAmbiente
+        """
+        if "tiempo" not in df.columns or "Tam" not in df.columns:
+            raise ValueError("Necesito que los datos tengan columnas llamadas 'tiempo' y 'Tam'")
+        return cls(df["tiempo"].to_numpy(dtype=np.float64), df["Tam"].to_numpy(dtype=np.float64))
+
+    def a_dataframe(self):
+        """
+        Yo devuelvo la serie como una tabla de pandas (para mostrarla o guardarla)
+        """
+        return pd.DataFrame({"tiempo": self.tiempo.copy(), "Tam": self.Tam.copy()})
+
+
+
+# 2. CONVERSIÓN EN LA FRONTERA
+
+def como_serie(datos):
+    """
+    Yo acepto None, una SerieAmbiente o una tabla de pandas y devuelvo una
+    SerieAmbiente (o None). Así cada parte del simulador convierte una sola vez.
+    """
+    if datos is None or isinstance(datos, SerieAmbiente):
+        return datos
+    if isinstance(datos, pd.DataFrame):
+        return SerieAmbiente.desde_dataframe(datos)
+    raise TypeError(f"No sé convertir {type(datos).__name__} en una SerieAmbiente.")
@@ -0,0 +1,240 @@
+"""
+Benchmarks del simulador (tiempo, evaluaciones de la EDO por segundo y memoria pico).
+
+Uso (desde la raíz del proyecto):
+
+    python -m app.pruebas.benchmark_simulacion                  # mide y compara con la base
+    python -m app.pruebas.benchmark_simulacion --guardar        # mide y guarda como nueva base
+    python -m app.pruebas.benchmark_simulacion --rapido --umbral 25
+
+Termina con código 1 si algún caso es más lento (o usa más memoria) que la
+base guardada por encima del umbral en porcentaje.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app.simulacion.solucion_rk4 import ejecutar_simulacion
+from app.procesos_datos.cargador_datos import cargar_csv
+from app.procesos_datos.serie_ambiente import SerieAmbiente
+from app.procesos_datos.interpolacion import interpolacion_lineal, interpolacion_spline
+
+
+BASE_POR_DEFECTO = Path(__file__).with_name("benchmarks_base.json")
+
+LISTA_MANUAL = [(0, 15), (4, 20), (8, 30), (12, 26), (16, 22), (20, 18), (24, 15)]
+
+
+# ------------------------------------------------------------
+# DATOS SINTÉTICOS
+# ------------------------------------------------------------
+def _serie_sintetica(n: int, semilla: int = 0) -> pd.DataFrame:
+    # Temperatura diaria con ruido, muestreada n veces a lo largo de 48 h
+    rng = np.random.default_rng(semilla)
+    tiempo = np.linspace(0.0, 48.0, n)
+    Tam = 15.0 + 6.0 * np.sin(2 * np.pi * (tiempo - 9.0) / 24.0) + rng.normal(0.0, 0.3, n)
+    return pd.DataFrame({"tiempo": tiempo, "Tam": Tam})
+
+
+def _escribir_csv(carpeta: str, n: int) -> str:
+    ruta = os.path.join(carpeta, f"ambiente_{n}.csv")
+    if not os.path.exists(ruta):
+        _serie_sintetica(n).to_csv(ruta, index=False)
+    return ruta
+
+
+# ------------------------------------------------------------
+# CASOS
+# ------------------------------------------------------------
+def definir_casos(carpeta: str, rapido: bool = False) -> dict:
+    """
+    Devuelve {nombre: (función sin argumentos, evaluaciones de la EDO por llamada)}.
+    RK4 evalúa la derivada 4 veces por paso.
+    """
+    casos = {}
+
+    # ejecutar_simulacion en modo automático, de 10^2 a 10^6 pasos
+    potencias = range(2, 6) if rapido else range(2, 7)
+    for p in potencias:
+        pasos = 10 ** p
+        casos[f"rk4_automatica_lineal_1e{p}"] = (
+            lambda pasos=pasos: ejecutar_simulacion(t_total=24.0, pasos=pasos), 4 * pasos
+        )
+
+    pasos = 10_000
+    archivo_ambiente = _escribir_csv(carpeta, 2_000)
+    casos["rk4_manual_lineal_1e4"] = (
+        lambda: ejecutar_simulacion(t_total=24.0, pasos=pasos, modo_datos="manual",
+                                    lista_manual=LISTA_MANUAL), 4 * pasos)
+    casos["rk4_csv_lineal_1e4"] = (
+        lambda: ejecutar_simulacion(t_total=24.0, pasos=pasos, modo_datos="csv",
+                                    archivo=archivo_ambiente), 4 * pasos)
+    casos["rk4_csv_spline_1e4"] = (
+        lambda: ejecutar_simulacion(t_total=24.0, pasos=pasos, modo_datos="csv",
+                                    archivo=archivo_ambiente, metodo_interp="spline"), 4 * pasos)
+    # Sin caché de ajustes: así cada repetición mide el ajuste completo
+    casos["rk4_sinusoidal_libre_1e4"] = (
+        lambda: ejecutar_simulacion(t_total=24.0, pasos=pasos, usar_sinusoidal=True,
+                                    usar_cache_ajustes=False), 4 * pasos)
+    casos["rk4_sinusoidal_24h_1e4"] = (
+        lambda: ejecutar_simulacion(t_total=24.0, pasos=pasos, usar_sinusoidal=True,
+                                    periodo_sinusoidal=24.0, usar_cache_ajustes=False), 4 * pasos)
+    casos["rk4_fourier3_1e4"] = (
+        lambda: ejecutar_simulacion(t_total=24.0, pasos=pasos, usar_sinusoidal=True,
+                                    armonicos=3, usar_cache_ajustes=False), 4 * pasos)
+
+    # cargar_csv sobre archivos grandes generados
+    filas = [100_000] if rapido else [100_000, 1_000_000]
+    for n in filas:
+        ruta = _escribir_csv(carpeta, n)
+        casos[f"cargar_csv_{n // 1000}k"] = (lambda ruta=ruta: cargar_csv(ruta), 0)
+
+    # Interpoladores solos: un arreglo grande y muchas llamadas escalares
+    serie = SerieAmbiente.desde_dataframe(_serie_sintetica(5_000))
+    malla = np.linspace(0.0, 48.0, 1_000_000)
+    escalares = np.linspace(0.0, 48.0, 10_000).tolist()
+    casos["interp_lineal_arreglo_1e6"] = (lambda: interpolacion_lineal(malla, serie), 0)
+    casos["interp_spline_arreglo_1e6"] = (lambda: interpolacion_spline(malla, serie), 0)
+    casos["interp_lineal_escalar_1e4"] = (
+        lambda: [interpolacion_lineal(t, serie) for t in escalares], 0)
+    casos["interp_spline_escalar_1e4"] = (
+        lambda: [interpolacion_spline(t, serie) for t in escalares], 0)
+
+    return casos
+
+
+# ------------------------------------------------------------
+# MEDICIÓN
+# ------------------------------------------------------------
+def medir(funcion, evaluaciones: int = 0, repeticiones: int = 3) -> dict:
+    """
+    Mide el mejor tiempo de `repeticiones` llamadas (el menos afectado por
+    ruido) y, en una llamada aparte con tracemalloc, la memoria pico.
+    """
+    funcion()  # calentamiento: importaciones perezosas, cachés de la serie, etc.
+
+    tiempos = []
+    for _ in range(max(1, repeticiones)):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+        # Un caso que ya tarda mucho no necesita tantas repeticiones
+        if tiempos[-1] > 2.0:
+            break
+
+    tracemalloc.start()
+    try:
+        funcion()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    mejor = min(tiempos)
+    return {
+        "segundos": mejor,
+        "mediana_segundos": float(np.median(tiempos)),
+        "evaluaciones_por_segundo": evaluaciones / mejor if evaluaciones and mejor > 0 else None,
+        "memoria_pico_mb": pico / 2 ** 20,
+    }
+
+
+def comparar(actual: dict, base: dict, umbral: float) -> list:
+    """
+    Devuelve la lista de (caso, métrica, base, actual, cambio %) que empeoraron
+    más del umbral.
+    """
+    regresiones = []
+    for caso, med in actual.items():
+        anterior = base.get(caso)
+        if anterior is None:
+            continue
+        for metrica in ("segundos", "memoria_pico_mb"):
+            antes, ahora = anterior.get(metrica), med.get(metrica)
+            # Ignoro memorias diminutas: ahí el ruido relativo es enorme
+            if not antes or ahora is None or (metrica == "memoria_pico_mb" and antes < 1.0):
+                continue
+            cambio = 100.0 * (ahora - antes) / antes
+            if cambio > umbral:
+                regresiones.append((caso, metrica, antes, ahora, cambio))
+    return regresiones
+
+
+# ------------------------------------------------------------
+# PROGRAMA
+# ------------------------------------------------------------
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Benchmarks del simulador con umbrales de regresión.")
+    p.add_argument("--base", default=str(BASE_POR_DEFECTO), help="Archivo JSON de la base")
+    p.add_argument("--guardar", action="store_true", help="Guardar esta medición como nueva base")
+    p.add_argument("--umbral", type=float, default=20.0, help="Regresión máxima permitida (%%)")
+    p.add_argument("--repeticiones", "-n", type=int, default=3)
+    p.add_argument("--rapido", action="store_true", help="Omitir los casos de 10^6")
+    p.add_argument("--filtro", default=None, help="Solo los casos cuyo nombre contenga este texto")
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    base = {}
+    if os.path.exists(args.base):
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f).get("casos", {})
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as carpeta:
+        casos = definir_casos(carpeta, rapido=args.rapido)
+        print(f"{'caso':<30} {'tiempo':>10} {'evals/s':>12} {'mem pico':>10} {'vs base':>9}")
+        for nombre, (funcion, evaluaciones) in casos.items():
+            if args.filtro and args.filtro not in nombre:
+                continue
+            med = medir(funcion, evaluaciones, args.repeticiones)
+            resultados[nombre] = med
+
+            evals = f"{med['evaluaciones_por_segundo']:,.0f}" if med["evaluaciones_por_segundo"] else "-"
+            cambio = ""
+            if base.get(nombre, {}).get("segundos"):
+                cambio = f"{100.0 * (med['segundos'] / base[nombre]['segundos'] - 1.0):+.1f}%"
+            print(f"{nombre:<30} {1000 * med['segundos']:>8.2f}ms {evals:>12} "
+                  f"{med['memoria_pico_mb']:>8.1f}MB {cambio:>9}")
+
+    regresiones = comparar(resultados, base, args.umbral)
+    for caso, metrica, antes, ahora, cambio in regresiones:
+        print(f"✗ Regresión en {caso} ({metrica}): {antes:.4g} -> {ahora:.4g} ({cambio:+.1f}%)")
+
+    if args.guardar:
+        # Conservo los casos que no se midieron esta vez (por --filtro o --rapido)
+        casos_base = dict(base)
+        casos_base.update(resultados)
+        with open(args.base, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "pandas": pd.__version__,
+                "plataforma": platform.platform(),
+                "casos": casos_base,
+            }, f, indent=2, ensure_ascii=False)
+        print(f"✓ Base guardada en {args.base}")
+
+    if regresiones and not args.guardar:
+        return 1
+    if regresiones:
+        print(f"ℹ {len(regresiones)} regresión(es) aceptada(s) como nueva base")
+    elif base:
+        print("✓ Sin regresiones")
+    elif not args.guardar:
+        print("ℹ No hay base para comparar (usa --guardar)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
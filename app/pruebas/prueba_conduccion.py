@@ -0,0 +1,84 @@
+import numpy as np
+from app.simulacion.conduccion import ejecutar_conduccion
+from app.simulacion.ley_newton import temperatura_newton
+
+# Ambiente constante de 25 °C para poder comparar con soluciones exactas
+AMBIENTE = dict(modo_datos="manual", lista_manual=[(0, 25.0), (24, 25.0)])
+
+
+def _raices(ecuacion, intervalos, iteraciones=100):
+    """
+    Raíces de `ecuacion` por bisección, una en cada intervalo (a, b) donde cambia de signo.
+    """
+    raices = []
+    for a, b in intervalos:
+        for _ in range(iteraciones):
+            c = 0.5 * (a + b)
+            if np.sign(ecuacion(a)) == np.sign(ecuacion(c)):
+                a = c
+            else:
+                b = c
+        raices.append(0.5 * (a + b))
+    return np.array(raices)
+
+
+def centro_exacto(geometria, t, T0, Tam, L, k_cond, rho, cp, h, terminos=40):
+    """
+    Temperatura del centro por la serie exacta (placa o esfera, Tam constante).
+    Aquí Bi = h L / k usa L (media espesura o radio), como en las tablas de Heisler.
+    """
+    Bi = h * L / k_cond
+    Fo = k_cond / (rho * cp) * t * 3600.0 / L**2
+    e = 1e-12
+    if geometria == "placa":
+        z = _raices(lambda z: z * np.tan(z) - Bi,
+                    [(n * np.pi + e, (n + 0.5) * np.pi - e) for n in range(terminos)])
+        C = 4 * np.sin(z) / (2 * z + np.sin(2 * z))
+    else:
+        z = _raices(lambda z: 1 - z / np.tan(z) - Bi,
+                    [(n * np.pi + e, (n + 1) * np.pi - e) for n in range(terminos)])
+        C = 4 * (np.sin(z) - z * np.cos(z)) / (2 * z - np.sin(2 * z))
+    return Tam + (T0 - Tam) * np.sum(C * np.exp(-z**2 * Fo))
+
+
+# ------------------------------------------------------------
+# 1️⃣ PRUEBA: placa y esfera contra la serie exacta (Bi = 1)
+# ------------------------------------------------------------
+print("\n--- Prueba 1: Serie exacta (placa y esfera) ---")
+material = dict(L=0.05, k_cond=0.5, rho=1000.0, cp=3800.0, h=10.0)
+for geometria in ("placa", "esfera"):
+    df = ejecutar_conduccion(T0=90.0, t_total=5.0, geometria=geometria, nodos=101,
+                             pasos=2000, theta=0.5, **material, **AMBIENTE)
+    numerico = df["Temperatura centro (°C)"].iloc[-1]
+    exacto = centro_exacto(geometria, 5.0, 90.0, 25.0, **material)
+    print(f"{geometria}: centro numérico {numerico:.4f} °C, exacto {exacto:.4f} °C")
+    assert abs(numerico - exacto) < 0.05, f"{geometria}: diferencia {numerico - exacto:.4f} °C"
+print("✅ Coincide con la serie exacta")
+
+
+# ------------------------------------------------------------
+# 2️⃣ PRUEBA: Biot pequeño = ley de Newton (modelo concentrado)
+# ------------------------------------------------------------
+print("\n--- Prueba 2: Límite concentrado (Bi << 0.1) ---")
+for geometria in ("placa", "cilindro", "esfera"):
+    df = ejecutar_conduccion(T0=90.0, t_total=5.0, geometria=geometria, L=0.05, k_cond=200.0,
+                             h=5.0, pasos=2000, **AMBIENTE)
+    newton = temperatura_newton(5.0, 90.0, df.attrs["k_equivalente"], 25.0)
+    media = df["Temperatura (°C)"].iloc[-1]
+    print(f"{geometria}: Bi = {df.attrs['biot']:.5f}, media {media:.4f} °C, Newton {newton:.4f} °C")
+    assert abs(media - newton) < 0.05, f"{geometria}: diferencia {media - newton:.4f} °C"
+print("✅ Coincide con la ley de Newton")
+
+
+# ------------------------------------------------------------
+# 3️⃣ PRUEBA: parámetros inválidos
+# ------------------------------------------------------------
+print("\n--- Prueba 3: t_total inválido ---")
+for t_total in (0.0, -1.0):
+    try:
+        ejecutar_conduccion(t_total=t_total)
+    except ValueError as e:
+        print(f"t_total={t_total}: {e}")
+    else:
+        raise AssertionError(f"t_total={t_total} debió fallar")
+print("✅ Se rechaza t_total <= 0")
@@ -0,0 +1,46 @@
+import io
+import numpy as np
+import pandas as pd
+from app.procesos_datos.filtro_atipicos import FiltroHampel
+from app.procesos_datos.cargador_datos import cargar_csv, procesar_datos_manual
+
+# Serie diaria suave con un pico falso a las 12 h
+tiempos = np.arange(24.0)
+temperaturas = 15 + 4 * np.sin(2 * np.pi * tiempos / 24)
+temperaturas[12] = 60.0
+
+
+def filtrada(df):
+    return df.sort_values("tiempo")[["tiempo", "Tam", "atipico"]].reset_index(drop=True)
+
+
+# ------------------------------------------------------------
+# 1️⃣ PRUEBA: datos ordenados (referencia)
+# ------------------------------------------------------------
+print("\n--- Prueba 1: Datos ordenados por tiempo ---")
+ordenados = list(zip(tiempos, temperaturas))
+referencia = filtrada(procesar_datos_manual(ordenados, filtro=FiltroHampel()))
+print(referencia[referencia["atipico"]])
+assert referencia["atipico"].tolist() == [t == 12 for t in tiempos], "Debe marcar solo el pico de las 12 h"
+print("✅ Solo se marca el pico")
+
+
+# ------------------------------------------------------------
+# 2️⃣ PRUEBA: lista manual desordenada
+# ------------------------------------------------------------
+print("\n--- Prueba 2: Lista manual desordenada ---")
+orden = np.random.default_rng(0).permutation(len(tiempos))
+desordenados = [ordenados[i] for i in orden]
+resultado = filtrada(procesar_datos_manual(desordenados, filtro=FiltroHampel()))
+pd.testing.assert_frame_equal(resultado, referencia)
+print("✅ Mismo resultado que con los datos ordenados")
+
+
+# ------------------------------------------------------------
+# 3️⃣ PRUEBA: CSV desordenado leído por bloques
+# ------------------------------------------------------------
+print("\n--- Prueba 3: CSV desordenado por bloques ---")
+texto = pd.DataFrame(desordenados, columns=["tiempo", "Tam"]).to_csv(index=False)
+resultado = filtrada(cargar_csv(io.StringIO(texto), filtro=FiltroHampel(), tamano_bloque=5))
+pd.testing.assert_frame_equal(resultado, referencia)
+print("✅ Mismo resultado que con los datos ordenados")
@@ -0,0 +1,46 @@
+import numpy as np
+from app.simulacion.solucion_rk4 import ejecutar_simulacion, ejecutar_conjunto
+from app.simulacion.modelos_rhs import MODELOS_RHS
+
+# Ambiente constante para comparar los modelos entre sí
+AMBIENTE = dict(T0=90.0, k=-0.13, t_total=5.0, modo_datos="manual", lista_manual=[(0, 25.0), (24, 25.0)])
+
+# Parámetros con los que cada modelo se reduce a la ley de Newton
+NEUTROS = {
+    "newton": None,
+    "k_variable": {"eventos": [(1.0, 2.0, 1.0)], "periodo": 24},
+    "radiacion": {"kr": 0.0},
+    "cambio_fase": {"T_fase": 0.0, "latente_cp": 0.0},
+}
+
+
+# ------------------------------------------------------------
+# 1️⃣ PRUEBA: cada modelo registrado se reduce a Newton
+# ------------------------------------------------------------
+print("\n--- Prueba 1: Modelos con parámetros neutros ---")
+faltantes = set(MODELOS_RHS) - set(NEUTROS)
+assert not faltantes, f"Modelos sin parámetros neutros en la prueba: {faltantes}"
+base = ejecutar_simulacion(**AMBIENTE)["Temperatura (°C)"].to_numpy()
+for nombre, parametros in NEUTROS.items():
+    T = ejecutar_simulacion(**AMBIENTE, modelo=nombre, parametros_modelo=parametros)["Temperatura (°C)"].to_numpy()
+    conjunto = ejecutar_conjunto(**AMBIENTE, modelo=nombre, parametros_modelo=parametros)
+    diferencia = max(np.abs(T - base).max(), np.abs(conjunto["Temperatura 0 (°C)"].to_numpy() - base).max())
+    print(f"{nombre}: diferencia máxima con Newton {diferencia:.2e} °C")
+    assert diferencia < 1e-9, f"{nombre} no se reduce a Newton"
+print("✅ Todos los modelos se reducen a Newton")
+
+
+# ------------------------------------------------------------
+# 2️⃣ PRUEBA: un parámetro requerido que falta da ValueError
+# ------------------------------------------------------------
+print("\n--- Prueba 2: Parámetros requeridos ---")
+for nombre, modelo in MODELOS_RHS.items():
+    for requerido in modelo.requeridos:
+        incompletos = {c: v for c, v in NEUTROS[nombre].items() if c != requerido}
+        try:
+            ejecutar_simulacion(**AMBIENTE, modelo=nombre, parametros_modelo=incompletos)
+        except ValueError as e:
+            print(f"{nombre} sin '{requerido}': {e}")
+        else:
+            raise AssertionError(f"{nombre} sin '{requerido}' debió fallar")
+print("✅ Los parámetros que faltan se rechazan con ValueError")
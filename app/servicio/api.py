@@ -0,0 +1,418 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+from urllib.parse import parse_qs
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional, Tuple
+
+# ------------------------------------------------------------
+# IMPORTS DEPENDIENTES DE LA ESTRUCTURA DEL PROYECTO
+# ------------------------------------------------------------
+
+try:
+    from simulacion.solucion_rk4 import ejecutar_simulacion
+    from simulacion.lotes import normalizar_trabajo, trabajos_desde_contenido
+    from simulacion.ley_newton import ajustar_k
+    from servicio.trabajos import GestorTrabajos, TrabajoNoEncontrado
+    from visualizacion.decimacion import indices_lttb
+    from metricas import REGISTRO, con_metricas, descartar_heredadas
+except Exception:
+    from app.simulacion.solucion_rk4 import ejecutar_simulacion
+    from app.simulacion.lotes import normalizar_trabajo, trabajos_desde_contenido
+    from app.simulacion.ley_newton import ajustar_k
+    from app.servicio.trabajos import GestorTrabajos, TrabajoNoEncontrado
+    from app.visualizacion.decimacion import indices_lttb
+    from app.metricas import REGISTRO, con_metricas, descartar_heredadas
+
+
+# Tamaño máximo del cuerpo de una solicitud (bytes)
+MAX_CUERPO = 10 * 1024 * 1024
+
+
+class ErrorSolicitud(ValueError):
+    """Solicitud inválida: se responde con el código HTTP indicado."""
+
+    def __init__(self, mensaje: str, estado: int = 400):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+# ------------------------------------------------------------
+# CÁLCULOS (CORREN EN LOS PROCESOS DEL POOL)
+# ------------------------------------------------------------
+def _tabla_json(resultados, max_puntos: Optional[int]) -> bytes:
+    t = resultados["Tiempo (h)"].to_numpy()
+    T = resultados["Temperatura (°C)"].to_numpy()
+    Tam = resultados["Tamiente (°C)"].to_numpy()
+    if max_puntos:
+        indices = indices_lttb(t, T, max_puntos)
+        t, T, Tam = t[indices], T[indices], Tam[indices]
+    return json.dumps({
+        "filas": len(resultados),
+        "tiempo": t.tolist(),
+        "temperatura": T.tolist(),
+        "Tam": Tam.tolist(),
+    }).encode("utf-8")
+
+
+def _simular_json(argumento: Tuple[dict, Optional[int]]) -> bytes:
+    """
+    Corre una simulación y devuelve el resultado ya convertido a JSON, así el
+    proceso principal no gasta tiempo serializando tablas grandes.
+    """
+    parametros, max_puntos = argumento
+    return _tabla_json(ejecutar_simulacion(**parametros), max_puntos)
+
+
+def _ajustar_k_json(argumento: dict) -> bytes:
+    return json.dumps(ajustar_k(**argumento)).encode("utf-8")
+
+
+def _sin_archivos(parametros: dict) -> dict:
+    # Por la API no dejo leer archivos del servidor: los datos van en lista_manual
+    if "archivo" in parametros or parametros.get("modo_datos") == "csv":
+        raise ErrorSolicitud("La API no lee archivos: usa modo_datos='manual' con lista_manual.")
+    return parametros
+
+
+def _clave(nombre: str, argumento) -> str:
+    texto = json.dumps([nombre, argumento], sort_keys=True, default=list)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+# ------------------------------------------------------------
+# SERVICIO: CACHÉ DE RESULTADOS Y AGRUPACIÓN DE SOLICITUDES IGUALES
+# ------------------------------------------------------------
+class ServicioSimulacion:
+    """
+    Atiende las solicitudes de la API sin depender de sockets (se puede probar
+    llamando directamente a atender).
+
+    - Los cálculos se mandan a un pool de procesos (el bucle asyncio nunca se bloquea).
+    - Si llega una solicitud idéntica a otra que todavía se está calculando,
+      ambas esperan el mismo cálculo (no se repite).
+    - Los resultados se guardan en una caché LRU de hasta max_cache entradas.
+    """
+
+    def __init__(self, executor=None, trabajadores: Optional[int] = None, max_cache: int = 256,
+                 gestor: Optional[GestorTrabajos] = None):
+        self._propio = executor is None
+        if executor is None:
+            executor = ProcessPoolExecutor(max_workers=trabajadores or os.cpu_count() or 1,
+                                           initializer=descartar_heredadas)
+            # Arranco los procesos ya, antes de abrir sockets: si se crearan con fork
+            # después, heredarían las conexiones y estas no se cerrarían al responder
+            executor.submit(int).result()
+        self.executor = executor
+        self.max_cache = int(max_cache)
+        self._cache = OrderedDict()
+        self._en_vuelo = {}
+        self.estadisticas = {
+            "solicitudes": 0, "calculos": 0, "aciertos_cache": 0, "agrupadas": 0, "errores": 0
+        }
+        self._rutas = {
+            ("GET", "/salud"): self._salud,
+            ("GET", "/estadisticas"): self._estadisticas,
+            ("POST", "/simular"): self._simular,
+            ("POST", "/simular/lote"): self._simular_lote,
+            ("POST", "/ajustar_k"): self._ajustar_k,
+            ("POST", "/trabajos"): self._enviar_trabajo,
+            ("GET", "/trabajos"): self._listar_trabajos,
+        }
+        # Rutas con el id del trabajo: /trabajos/<id> y /trabajos/<id>/resultado
+        self._rutas_trabajo = {
+            ("GET", ""): self._estado_trabajo,
+            ("DELETE", ""): self._cancelar_trabajo,
+            ("GET", "resultado"): self._resultado_trabajo,
+        }
+
+        # La cola de trabajos largos usa el mismo pool; al arrancar retoma lo pendiente
+        self.gestor = gestor if gestor is not None else GestorTrabajos(executor=self.executor)
+        if self.gestor.executor is None:
+            self.gestor.executor = self.executor
+        self.gestor.iniciar()
+        REGISTRO.agregar_colector(self._metricas)
+
+    def cerrar(self):
+        REGISTRO.quitar_colector(self._metricas)
+        self.gestor.cerrar()
+        if self._propio:
+            self.executor.shutdown(wait=True)
+
+    # -- cálculo con caché y agrupación --
+    def _guardar(self, clave: str, futuro: asyncio.Future):
+        self._en_vuelo.pop(clave, None)
+        if futuro.cancelled() or futuro.exception() is not None:
+            return
+        self._cache[clave] = futuro.result()
+        while len(self._cache) > self.max_cache:
+            self._cache.popitem(last=False)
+
+    def _metricas(self):
+        # Colector para app/metricas.py: estadísticas de la caché de resultados
+        e = self.estadisticas
+        buscadas = e["aciertos_cache"] + e["agrupadas"] + e["calculos"]
+        return [
+            ("api_cache_aciertos_total", "counter", "Resultados servidos desde la caché de la API",
+             {}, e["aciertos_cache"]),
+            ("api_agrupadas_total", "counter", "Solicitudes que esperaron un cálculo igual en curso",
+             {}, e["agrupadas"]),
+            ("api_calculos_total", "counter", "Cálculos mandados al pool de procesos", {}, e["calculos"]),
+            ("api_cache_tasa_aciertos", "gauge", "Fracción de cálculos evitados (caché o agrupación)",
+             {}, (e["aciertos_cache"] + e["agrupadas"]) / buscadas if buscadas else 0.0),
+            ("api_cache_entradas", "gauge", "Resultados guardados en la caché de la API", {}, len(self._cache)),
+            ("api_en_vuelo", "gauge", "Cálculos en curso", {}, len(self._en_vuelo)),
+        ]
+
+    async def _en_pool(self, funcion: Callable, argumento) -> bytes:
+        loop = asyncio.get_running_loop()
+        resultado, metricas = await loop.run_in_executor(self.executor, con_metricas, funcion, argumento)
+        REGISTRO.combinar(metricas)
+        return resultado
+
+    async def calcular(self, funcion: Callable, argumento) -> bytes:
+        clave = _clave(funcion.__name__, argumento)
+
+        if clave in self._cache:
+            self._cache.move_to_end(clave)
+            self.estadisticas["aciertos_cache"] += 1
+            return self._cache[clave]
+
+        futuro = self._en_vuelo.get(clave)
+        if futuro is not None:
+            self.estadisticas["agrupadas"] += 1
+        else:
+            self.estadisticas["calculos"] += 1
+            futuro = asyncio.ensure_future(self._en_pool(funcion, argumento))
+            futuro.add_done_callback(lambda f: self._guardar(clave, f))
+            self._en_vuelo[clave] = futuro
+
+        # shield: si un cliente se desconecta, el cálculo sigue para los demás
+        return await asyncio.shield(futuro)
+
+    # -- rutas --
+    async def _salud(self, cuerpo):
+        return b'{"estado": "ok"}'
+
+    async def _estadisticas(self, cuerpo):
+        datos = dict(self.estadisticas, en_cache=len(self._cache), en_vuelo=len(self._en_vuelo))
+        return json.dumps(datos).encode("utf-8")
+
+    async def _simular(self, cuerpo):
+        if not isinstance(cuerpo, dict):
+            raise ErrorSolicitud("El cuerpo debe ser un objeto JSON con los parámetros.")
+        cuerpo = dict(cuerpo)
+        max_puntos = cuerpo.pop("max_puntos", None)
+        parametros = _sin_archivos(normalizar_trabajo(cuerpo))
+        return await self.calcular(_simular_json, (parametros, int(max_puntos) if max_puntos else None))
+
+    async def _simular_lote(self, cuerpo):
+        max_puntos = cuerpo.pop("max_puntos", None) if isinstance(cuerpo, dict) else None
+        max_puntos = int(max_puntos) if max_puntos else None
+        trabajos = trabajos_desde_contenido(cuerpo)
+        for trabajo in trabajos:
+            _sin_archivos(trabajo["parametros"])
+
+        resultados = await asyncio.gather(
+            *(self.calcular(_simular_json, (t["parametros"], max_puntos)) for t in trabajos),
+            return_exceptions=True
+        )
+
+        # Armo la respuesta pegando los JSON ya serializados de cada trabajo
+        partes = []
+        for trabajo, resultado in zip(trabajos, resultados):
+            cabecera = json.dumps({"id": trabajo["id"], "nombre": trabajo["nombre"]})[:-1]
+            if isinstance(resultado, BaseException):
+                partes.append(f'{cabecera}, "error": {json.dumps(str(resultado))}}}'.encode("utf-8"))
+            else:
+                partes.append(cabecera.encode("utf-8") + b', "resultado": ' + resultado + b"}")
+        return b'{"resultados": [' + b", ".join(partes) + b"]}"
+
+    async def _ajustar_k(self, cuerpo):
+        if not isinstance(cuerpo, dict) or "tiempos" not in cuerpo or "temperaturas" not in cuerpo:
+            raise ErrorSolicitud("Se necesitan 'tiempos' y 'temperaturas'.")
+        argumento = {
+            "tiempos": [float(x) for x in cuerpo["tiempos"]],
+            "temperaturas": [float(x) for x in cuerpo["temperaturas"]],
+            "Tam": float(cuerpo.get("Tam", 25.0)),
+            "T0": None if cuerpo.get("T0") is None else float(cuerpo["T0"]),
+        }
+        return await self.calcular(_ajustar_k_json, argumento)
+
+    # -- cola de trabajos (las consultas a SQLite van en un hilo aparte) --
+    async def _enviar_trabajo(self, cuerpo):
+        for simulacion in GestorTrabajos.simulaciones_de(cuerpo)[1]:
+            _sin_archivos(simulacion["parametros"])
+        id_trabajo = await asyncio.to_thread(self.gestor.enviar, cuerpo)
+        return json.dumps({"id": id_trabajo}).encode("utf-8")
+
+    async def _listar_trabajos(self, cuerpo, consulta=None):
+        limite = int((consulta or {}).get("limite", [50])[0])
+        return json.dumps(await asyncio.to_thread(self.gestor.listar, limite)).encode("utf-8")
+
+    async def _estado_trabajo(self, cuerpo, id_trabajo, consulta):
+        return json.dumps(await asyncio.to_thread(self.gestor.estado, id_trabajo)).encode("utf-8")
+
+    async def _cancelar_trabajo(self, cuerpo, id_trabajo, consulta):
+        await asyncio.to_thread(self.gestor.cancelar, id_trabajo)
+        return json.dumps({"id": id_trabajo, "estado": "cancelado"}).encode("utf-8")
+
+    async def _resultado_trabajo(self, cuerpo, id_trabajo, consulta):
+        indice = int(consulta.get("indice", [0])[0])
+        max_puntos = int(consulta.get("max_puntos", [0])[0]) or None
+
+        def leer():
+            return _tabla_json(self.gestor.resultado(id_trabajo, indice), max_puntos)
+        return await asyncio.to_thread(leer)
+
+    def _buscar_ruta(self, metodo: str, ruta: str):
+        """
+        Devuelve el manejador y sus argumentos extra para la ruta, o None.
+        """
+        camino, _, texto_consulta = ruta.partition("?")
+        camino = camino.rstrip("/") or "/"
+        consulta = parse_qs(texto_consulta)
+        metodo = metodo.upper()
+
+        if (metodo, camino) in self._rutas:
+            if camino == "/trabajos" and metodo == "GET":
+                return self._rutas[(metodo, camino)], (consulta,)
+            return self._rutas[(metodo, camino)], ()
+
+        partes = camino.strip("/").split("/")
+        if partes[0] == "trabajos" and len(partes) in (2, 3):
+            subruta = partes[2] if len(partes) == 3 else ""
+            manejador = self._rutas_trabajo.get((metodo, subruta))
+            if manejador is not None:
+                return manejador, (partes[1], consulta)
+        return None
+
+    async def atender(self, metodo: str, ruta: str, cuerpo: bytes = b"") -> Tuple[int, bytes]:
+        """
+        Procesa una solicitud y devuelve (código HTTP, cuerpo JSON en bytes).
+        """
+        inicio = time.perf_counter()
+        self.estadisticas["solicitudes"] += 1
+        encontrada = self._buscar_ruta(metodo, ruta)
+        if encontrada is None:
+            estado, respuesta, nombre = 404, json.dumps(
+                {"error": f"Ruta no encontrada: {metodo} {ruta}"}).encode("utf-8"), "desconocida"
+        else:
+            manejador, extras = encontrada
+            estado, respuesta = await self._despachar(manejador, extras, cuerpo)
+            nombre = manejador.__name__.lstrip("_")
+
+        # Uso el nombre del manejador como etiqueta (no la ruta con el id del trabajo)
+        REGISTRO.observar("api_duracion_segundos", time.perf_counter() - inicio, {"ruta": nombre},
+                          ayuda="Tiempo de respuesta de la API en segundos")
+        REGISTRO.incrementar("api_solicitudes_total", {"ruta": nombre, "codigo": estado},
+                             ayuda="Solicitudes a la API, por ruta y código HTTP")
+        return estado, respuesta
+
+    async def _despachar(self, manejador: Callable, extras: tuple, cuerpo: bytes) -> Tuple[int, bytes]:
+        try:
+            datos = json.loads(cuerpo) if cuerpo else {}
+            return 200, await manejador(datos, *extras)
+        except ErrorSolicitud as e:
+            self.estadisticas["errores"] += 1
+            return e.estado, json.dumps({"error": str(e)}).encode("utf-8")
+        except TrabajoNoEncontrado as e:
+            # Trabajo (o simulación de un trabajo) que no existe; otro KeyError es un fallo (500)
+            self.estadisticas["errores"] += 1
+            return 404, json.dumps({"error": e.args[0] if e.args else str(e)}).encode("utf-8")
+        except (ValueError, TypeError) as e:
+            # JSON mal formado, parámetros desconocidos o con tipos inválidos
+            self.estadisticas["errores"] += 1
+            return 400, json.dumps({"error": str(e)}).encode("utf-8")
+        except Exception as e:
+            self.estadisticas["errores"] += 1
+            return 500, json.dumps({"error": str(e)}).encode("utf-8")
+
+
+# ------------------------------------------------------------
+# SERVIDOR HTTP MÍNIMO SOBRE ASYNCIO
+# ------------------------------------------------------------
+_MOTIVOS = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+            500: "Internal Server Error"}
+
+
+async def _responder(escritor, estado: int, cuerpo: bytes, mantener: bool):
+    cabeceras = (
+        f"HTTP/1.1 {estado} {_MOTIVOS.get(estado, '')}\r\n"
+        "Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(cuerpo)}\r\n"
+        f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n"
+    )
+    escritor.write(cabeceras.encode("latin-1") + cuerpo)
+    await escritor.drain()
+
+
+def crear_manejador(servicio: ServicioSimulacion):
+    """
+    Devuelve la corrutina que atiende cada conexión (HTTP/1.1 con keep-alive).
+    """
+    async def manejar(lector: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea.strip():
+                    break
+                metodo, ruta, version = linea.decode("latin-1").split(" ", 2)
+
+                cabeceras = {}
+                while True:
+                    h = await lector.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    nombre, _, valor = h.decode("latin-1").partition(":")
+                    cabeceras[nombre.strip().lower()] = valor.strip()
+
+                mantener = (cabeceras.get("connection", "").lower() != "close"
+                            and version.strip().upper() == "HTTP/1.1")
+                largo = int(cabeceras.get("content-length", 0) or 0)
+                if largo > MAX_CUERPO:
+                    await _responder(escritor, 413, b'{"error": "Cuerpo demasiado grande"}', False)
+                    break
+                cuerpo = await lector.readexactly(largo) if largo else b""
+
+                estado, respuesta = await servicio.atender(metodo, ruta, cuerpo)
+                await _responder(escritor, estado, respuesta, mantener)
+                if not mantener:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            escritor.close()
+
+    return manejar
+
+
+async def iniciar_servidor(servicio: ServicioSimulacion, host: str = "127.0.0.1", puerto: int = 8000):
+    """
+    Crea el servidor asyncio (sin bloquear). Con puerto=0 se elige uno libre.
+    """
+    return await asyncio.start_server(crear_manejador(servicio), host, puerto)
+
+
+def ejecutar_servidor(host: str = "127.0.0.1", puerto: int = 8000,
+                      trabajadores: Optional[int] = None, max_cache: int = 256):
+    """
+    Arranca la API y la deja atendiendo hasta que se interrumpa (Ctrl+C).
+    """
+    async def principal():
+        servicio = ServicioSimulacion(trabajadores=trabajadores, max_cache=max_cache)
+        servidor = await iniciar_servidor(servicio, host, puerto)
+        print(f" API de simulación escuchando en http://{host}:{puerto}")
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            servicio.cerrar()
+
+    try:
+        asyncio.run(principal())
+    except KeyboardInterrupt:
+        print("API detenida.")
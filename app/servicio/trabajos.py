@@ -0,0 +1,394 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Optional
+
+# ------------------------------------------------------------
+# IMPORTS DEPENDIENTES DE LA ESTRUCTURA DEL PROYECTO
+# ------------------------------------------------------------
+
+try:
+    from simulacion.solucion_rk4 import iterar_simulacion, resultado_parcial
+    from simulacion.lotes import trabajos_desde_contenido
+    from visualizacion.exportacion import escribir_resultados, leer_npz
+    from metricas import REGISTRO, con_metricas, descartar_heredadas
+except Exception:
+    from app.simulacion.solucion_rk4 import iterar_simulacion, resultado_parcial
+    from app.simulacion.lotes import trabajos_desde_contenido
+    from app.visualizacion.exportacion import escribir_resultados, leer_npz
+    from app.metricas import REGISTRO, con_metricas, descartar_heredadas
+
+
+# Cada cuánto (segundos) un proceso guarda el progreso y revisa si lo cancelaron
+INTERVALO_PROGRESO = 0.5
+
+# Estados de cada simulación (ítem) de un trabajo
+PENDIENTE, EJECUTANDO, TERMINADO, ERROR, CANCELADO = (
+    "pendiente", "ejecutando", "terminado", "error", "cancelado"
+)
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS trabajos (
+    id TEXT PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    huella TEXT NOT NULL,
+    cancelado INTEGER NOT NULL DEFAULT 0,
+    creado REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS trabajos_huella ON trabajos (huella);
+CREATE TABLE IF NOT EXISTS items (
+    id_trabajo TEXT NOT NULL,
+    indice INTEGER NOT NULL,
+    nombre TEXT NOT NULL,
+    parametros TEXT NOT NULL,
+    estado TEXT NOT NULL,
+    progreso REAL NOT NULL DEFAULT 0,
+    archivo TEXT,
+    filas INTEGER,
+    segundos REAL,
+    error TEXT,
+    PRIMARY KEY (id_trabajo, indice)
+);
+"""
+
+
+# ------------------------------------------------------------
+# ALMACÉN EN DISCO (SQLITE + ARCHIVOS NPZ)
+# ------------------------------------------------------------
+def _conectar(ruta: str) -> sqlite3.Connection:
+    # Una conexión por operación: la usan varios procesos e hilos a la vez
+    conexion = sqlite3.connect(ruta, timeout=30)
+    conexion.execute("PRAGMA journal_mode=WAL")
+    return conexion
+
+
+def _carpeta_resultados(ruta: str) -> Path:
+    return Path(ruta).resolve().parent / "resultados"
+
+
+def _actualizar_item(ruta: str, id_trabajo: str, indice: int, **campos):
+    asignaciones = ", ".join(f"{c} = ?" for c in campos)
+    with _conectar(ruta) as conexion:
+        conexion.execute(
+            f"UPDATE items SET {asignaciones} WHERE id_trabajo = ? AND indice = ?",
+            (*campos.values(), id_trabajo, indice)
+        )
+
+
+def _esta_cancelado(ruta: str, id_trabajo: str) -> bool:
+    with _conectar(ruta) as conexion:
+        fila = conexion.execute("SELECT cancelado FROM trabajos WHERE id = ?", (id_trabajo,)).fetchone()
+    return bool(fila and fila[0])
+
+
+# ------------------------------------------------------------
+# EJECUCIÓN DE UNA SIMULACIÓN (CORRE EN UN PROCESO DEL POOL)
+# ------------------------------------------------------------
+def _ejecutar_item(ruta: str, id_trabajo: str, indice: int):
+    """
+    Corre una simulación del trabajo por bloques, guardando el progreso en la
+    base de datos, y deja el resultado en un archivo NPZ.
+    """
+    with _conectar(ruta) as conexion:
+        fila = conexion.execute(
+            "SELECT parametros, estado FROM items WHERE id_trabajo = ? AND indice = ?",
+            (id_trabajo, indice)
+        ).fetchone()
+    if fila is None or fila[1] in (TERMINADO, CANCELADO):
+        return
+    if _esta_cancelado(ruta, id_trabajo):
+        _actualizar_item(ruta, id_trabajo, indice, estado=CANCELADO)
+        return
+
+    parametros = json.loads(fila[0])
+    _actualizar_item(ruta, id_trabajo, indice, estado=EJECUTANDO, progreso=0.0, error=None)
+    inicio = ultimo = time.perf_counter()
+    try:
+        # Unos 100 bloques por simulación: progreso fino sin frenar el bucle RK4
+        pasos_por_bloque = max(1000, int(parametros.get("pasos", 200)) // 100)
+        progreso = None
+        for progreso in iterar_simulacion(**parametros, pasos_por_bloque=pasos_por_bloque):
+            ahora = time.perf_counter()
+            if ahora - ultimo >= INTERVALO_PROGRESO and not progreso["terminado"]:
+                ultimo = ahora
+                if _esta_cancelado(ruta, id_trabajo):
+                    _actualizar_item(ruta, id_trabajo, indice, estado=CANCELADO)
+                    return
+                _actualizar_item(ruta, id_trabajo, indice,
+                                 progreso=progreso["paso"] / progreso["pasos"])
+
+        resultados = resultado_parcial(progreso)
+        carpeta = _carpeta_resultados(ruta)
+        archivo = f"{id_trabajo}_{indice}.npz"
+        temporal = carpeta / (archivo + ".tmp")
+        escribir_resultados(resultados, temporal, formato="npz")
+        os.replace(temporal, carpeta / archivo)
+
+        _actualizar_item(ruta, id_trabajo, indice, estado=TERMINADO, progreso=1.0,
+                         archivo=archivo, filas=len(resultados),
+                         segundos=time.perf_counter() - inicio)
+    except Exception as e:
+        _actualizar_item(ruta, id_trabajo, indice, estado=ERROR, error=str(e),
+                         segundos=time.perf_counter() - inicio)
+
+
+# ------------------------------------------------------------
+# GESTOR DE TRABAJOS
+# ------------------------------------------------------------
+class TrabajoNoEncontrado(KeyError):
+    """
+    El trabajo (o una de sus simulaciones) no existe en la cola. Hereda de
+    KeyError para que el código que ya la atrapaba así siga funcionando.
+    """
+
+
+class GestorTrabajos:
+    """
+    Cola de trabajos de simulación con estado persistente.
+
+    Un trabajo es una simulación o un barrido (varias simulaciones). Al enviarlo
+    se guarda en SQLite y se devuelve su id; luego se consulta su estado,
+    progreso y resultados, incluso después de reiniciar el programa.
+
+    Parámetros:
+    -----------
+    ruta : str, opcional
+        Archivo SQLite (por defecto, la variable de entorno RUTA_TRABAJOS).
+        Los resultados se guardan en la carpeta "resultados" a su lado.
+    trabajadores : int, opcional
+        Procesos del pool propio (por defecto, los núcleos).
+    executor : concurrent.futures.Executor, opcional
+        Pool ya creado para reutilizar (por ejemplo, el de la API).
+    """
+
+    def __init__(self, ruta: Optional[str] = None, trabajadores: Optional[int] = None, executor=None):
+        self.ruta = str(ruta or os.getenv("RUTA_TRABAJOS") or "trabajos/trabajos.sqlite3")
+        self.trabajadores = trabajadores
+        self.executor = executor
+        self._propio = False
+        self._futuros = {}
+
+        _carpeta_resultados(self.ruta).mkdir(parents=True, exist_ok=True)
+        with _conectar(self.ruta) as conexion:
+            conexion.executescript(_ESQUEMA)
+
+    # -- pool de procesos --
+    def iniciar(self) -> int:
+        """
+        Crea el pool (si no se dio uno) y vuelve a encolar las simulaciones
+        pendientes o interrumpidas. Devuelve cuántas se encolaron.
+        """
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.trabajadores or os.cpu_count() or 1,
+                                                initializer=descartar_heredadas)
+            self._propio = True
+
+        with _conectar(self.ruta) as conexion:
+            filas = conexion.execute(
+                "SELECT i.id_trabajo, i.indice FROM items i JOIN trabajos t ON t.id = i.id_trabajo "
+                "WHERE t.cancelado = 0 AND i.estado IN (?, ?) ORDER BY t.creado, i.indice",
+                (PENDIENTE, EJECUTANDO)
+            ).fetchall()
+        for id_trabajo, indice in filas:
+            self._encolar(id_trabajo, indice)
+        return len(filas)
+
+    def cerrar(self):
+        if self._propio and self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+            self._propio = False
+
+    def _encolar(self, id_trabajo: str, indice: int):
+        clave = (id_trabajo, indice)
+        if self.executor is None or clave in self._futuros:
+            return
+        futuro = self.executor.submit(con_metricas, _ejecutar_item, self.ruta, id_trabajo, indice)
+        self._futuros[clave] = futuro
+        futuro.add_done_callback(lambda f: self._al_terminar(clave, f))
+
+    def _al_terminar(self, clave, futuro):
+        self._futuros.pop(clave, None)
+        if futuro.cancelled():
+            return
+        # Si el proceso murió (el error no llegó a guardarse), lo marco aquí
+        if futuro.exception() is not None:
+            _actualizar_item(self.ruta, *clave, estado=ERROR, error=str(futuro.exception()))
+            return
+        # Las métricas del proceso (latencia, cachés) las expone el principal
+        REGISTRO.combinar(futuro.result()[1])
+
+    # -- envío y consulta --
+    @staticmethod
+    def simulaciones_de(contenido):
+        """
+        Devuelve (es_barrido, simulaciones) de un trabajo, con las simulaciones
+        en el formato de trabajos_desde_contenido.
+        """
+        es_barrido = isinstance(contenido, list) or (
+            isinstance(contenido, dict) and ("trabajos" in contenido or "rejilla" in contenido)
+        )
+        items = trabajos_desde_contenido(contenido if es_barrido else [contenido])
+        if not items:
+            raise ValueError("El trabajo no tiene ninguna simulación.")
+        return es_barrido, items
+
+    def enviar(self, contenido, nombre: Optional[str] = None) -> str:
+        """
+        Guarda un trabajo y devuelve su id. `contenido` es un dict con los
+        parámetros de una simulación, o un barrido como los de los lotes
+        (lista de trabajos, o dict con "trabajos"/"rejilla" y "base").
+
+        Si ya existe un trabajo idéntico que no falló ni se canceló, devuelvo
+        su id: sus resultados se reutilizan sin volver a calcular.
+        """
+        es_barrido, items = self.simulaciones_de(contenido)
+        huella = hashlib.sha256(" ".join(i["id"] for i in items).encode("utf-8")).hexdigest()
+
+        for previo in self._buscar_por_huella(huella):
+            if self.estado(previo)["estado"] not in (ERROR, CANCELADO):
+                return previo
+
+        id_trabajo = uuid.uuid4().hex[:12]
+        if nombre is None:
+            nombre = items[0]["nombre"] if not es_barrido else f"Barrido de {len(items)} simulaciones"
+        with _conectar(self.ruta) as conexion:
+            conexion.execute(
+                "INSERT INTO trabajos (id, nombre, tipo, huella, creado) VALUES (?, ?, ?, ?, ?)",
+                (id_trabajo, nombre, "barrido" if es_barrido else "simulacion", huella, time.time())
+            )
+            conexion.executemany(
+                "INSERT INTO items (id_trabajo, indice, nombre, parametros, estado) VALUES (?, ?, ?, ?, ?)",
+                [(id_trabajo, i, item["nombre"], json.dumps(item["parametros"]), PENDIENTE)
+                 for i, item in enumerate(items)]
+            )
+        for i in range(len(items)):
+            self._encolar(id_trabajo, i)
+        return id_trabajo
+
+    def _buscar_por_huella(self, huella: str) -> List[str]:
+        with _conectar(self.ruta) as conexion:
+            filas = conexion.execute(
+                "SELECT id FROM trabajos WHERE huella = ? ORDER BY creado DESC", (huella,)
+            ).fetchall()
+        return [f[0] for f in filas]
+
+    def estado(self, id_trabajo: str) -> dict:
+        """
+        Devuelve el estado del trabajo: "pendiente", "ejecutando", "terminado",
+        "con_errores" (terminó, pero alguna simulación falló), "error" o
+        "cancelado", junto con el progreso (0 a 1) y el detalle de cada simulación.
+        """
+        with _conectar(self.ruta) as conexion:
+            trabajo = conexion.execute(
+                "SELECT nombre, tipo, cancelado, creado FROM trabajos WHERE id = ?", (id_trabajo,)
+            ).fetchone()
+            if trabajo is None:
+                raise TrabajoNoEncontrado(f"No existe el trabajo '{id_trabajo}'")
+            items = conexion.execute(
+                "SELECT indice, nombre, estado, progreso, filas, segundos, error FROM items "
+                "WHERE id_trabajo = ? ORDER BY indice", (id_trabajo,)
+            ).fetchall()
+
+        estados = [i[2] for i in items]
+        terminados, errores = estados.count(TERMINADO), estados.count(ERROR)
+        if trabajo[2]:
+            estado = CANCELADO
+        elif terminados == len(items):
+            estado = TERMINADO
+        elif terminados + errores == len(items):
+            estado = "con_errores" if terminados else ERROR
+        elif EJECUTANDO in estados or terminados or errores:
+            estado = EJECUTANDO
+        else:
+            estado = PENDIENTE
+
+        return {
+            "id": id_trabajo,
+            "nombre": trabajo[0],
+            "tipo": trabajo[1],
+            "estado": estado,
+            "progreso": sum(i[3] if i[2] != ERROR else 1.0 for i in items) / len(items),
+            "total": len(items),
+            "terminados": terminados,
+            "errores": errores,
+            "creado": trabajo[3],
+            "simulaciones": [
+                {"indice": i[0], "nombre": i[1], "estado": i[2], "progreso": i[3],
+                 "filas": i[4], "segundos": i[5], "error": i[6]}
+                for i in items
+            ],
+        }
+
+    def listar(self, limite: int = 50) -> List[dict]:
+        """
+        Devuelve el estado (sin el detalle por simulación) de los últimos trabajos.
+        """
+        with _conectar(self.ruta) as conexion:
+            ids = conexion.execute(
+                "SELECT id FROM trabajos ORDER BY creado DESC LIMIT ?", (int(limite),)
+            ).fetchall()
+        salida = []
+        for (id_trabajo,) in ids:
+            estado = self.estado(id_trabajo)
+            estado.pop("simulaciones")
+            salida.append(estado)
+        return salida
+
+    def resultado(self, id_trabajo: str, indice: int = 0):
+        """
+        Devuelve el DataFrame de resultados de una simulación terminada del trabajo.
+        """
+        with _conectar(self.ruta) as conexion:
+            fila = conexion.execute(
+                "SELECT estado, archivo FROM items WHERE id_trabajo = ? AND indice = ?",
+                (id_trabajo, int(indice))
+            ).fetchone()
+        if fila is None:
+            raise TrabajoNoEncontrado(f"No existe la simulación {indice} del trabajo '{id_trabajo}'")
+        if fila[0] != TERMINADO:
+            raise ValueError(f"La simulación {indice} del trabajo '{id_trabajo}' está '{fila[0]}'")
+        return leer_npz(_carpeta_resultados(self.ruta) / fila[1])
+
+    def cancelar(self, id_trabajo: str):
+        """
+        Cancela el trabajo: lo que no empezó ya no se corre y lo que está
+        corriendo se detiene en el siguiente bloque.
+        """
+        with _conectar(self.ruta) as conexion:
+            cambiados = conexion.execute(
+                "UPDATE trabajos SET cancelado = 1 WHERE id = ?", (id_trabajo,)
+            ).rowcount
+            conexion.execute(
+                "UPDATE items SET estado = ? WHERE id_trabajo = ? AND estado = ?",
+                (CANCELADO, id_trabajo, PENDIENTE)
+            )
+        if not cambiados:
+            raise TrabajoNoEncontrado(f"No existe el trabajo '{id_trabajo}'")
+
+    def esperar(self, ids: Optional[List[str]] = None, intervalo: float = 1.0,
+                al_avanzar: Optional[Callable[[dict], None]] = None):
+        """
+        Espera a que terminen los trabajos indicados (por defecto, todos los
+        encolados en este gestor), llamando a al_avanzar(estado) en cada revisión.
+        """
+        if ids is None:
+            ids = sorted({clave[0] for clave in list(self._futuros)})
+        while True:
+            activos = 0
+            for id_trabajo in ids:
+                estado = self.estado(id_trabajo)
+                if al_avanzar is not None:
+                    al_avanzar(estado)
+                if estado["estado"] in (PENDIENTE, EJECUTANDO):
+                    activos += 1
+            en_pool = any(clave[0] in ids for clave in list(self._futuros))
+            if not activos and not en_pool:
+                return
+            time.sleep(intervalo)
@@ -0,0 +1,361 @@
+import importlib.util
+import numpy as np
+import pandas as pd
+from typing import Iterator, Optional, List, Tuple
+
+# ------------------------------------------------------------
+# IMPORTS DEPENDIENTES DE LA ESTRUCTURA DEL PROYECTO
+# ------------------------------------------------------------
+
+# Reutilizo las mismas fuentes de Tam que la simulación RK4 (CSV, manual,
+# automática, ajuste sinusoidal/Fourier), así ambos motores ven el mismo ambiente
+try:
+    from simulacion.solucion_rk4 import _cargar_datos, _ajustar_ambiente, _Tam_en_malla
+except Exception:
+    from app.simulacion.solucion_rk4 import _cargar_datos, _ajustar_ambiente, _Tam_en_malla
+
+try:
+    from instrumentacion import etapa, contar
+    from metricas import REGISTRO, cronometro
+except Exception:
+    from app.instrumentacion import etapa, contar
+    from app.metricas import REGISTRO, cronometro
+
+# Reviso si scipy está instalado SIN importarlo: solo hace falta LAPACK al resolver
+_LAPACK_DISPONIBLE = importlib.util.find_spec("scipy") is not None
+_dgttrf = _dgttrs = None
+
+
+def _cargar_lapack():
+    """
+    Carga (una sola vez) las rutinas tridiagonales de LAPACK:
+    dgttrf factoriza la matriz y dgttrs resuelve con esa factorización.
+    """
+    global _dgttrf, _dgttrs
+    if _dgttrf is None:
+        from scipy.linalg.lapack import dgttrf, dgttrs
+        _dgttrf, _dgttrs = dgttrf, dgttrs
+    return _dgttrf, _dgttrs
+
+
+# Exponente de la coordenada en cada geometría: (1/r^m) d/dr (r^m dT/dr)
+GEOMETRIAS = {"placa": 0, "cilindro": 1, "esfera": 2}
+
+
+# ------------------------------------------------------------
+# DISCRETIZACIÓN (VOLÚMENES FINITOS SOBRE LA MITAD DEL CUERPO)
+# ------------------------------------------------------------
+def _malla_radial(L: float, nodos: int, m: int):
+    """
+    Nodos r_i = i * dr desde el centro (r=0) hasta la superficie (r=L).
+    Devuelve los radios, el "volumen" de cada nodo y el "área" de las caras
+    entre nodos (sin las constantes 2π/4π, que se cancelan).
+    """
+    r = np.linspace(0.0, L, nodos)
+    dr = r[1] - r[0]
+    caras = np.concatenate(([0.0], r[:-1] + 0.5 * dr, [L]))
+    volumenes = (caras[1:] ** (m + 1) - caras[:-1] ** (m + 1)) / (m + 1)
+    areas = caras[1:-1] ** m
+    return r, dr, volumenes, areas
+
+
+def _sistema_tridiagonal(volumenes, areas, dr, k_cond, rho, cp, h, L, m):
+    """
+    Sistema C dT/dt = K T + b(t):
+        C  capacidad térmica de cada nodo (diagonal)
+        K  conducción entre nodos y convección en la superficie (tridiagonal)
+        b  aporte del ambiente, solo en el nodo de la superficie: h A_s Tam(t)
+    Devuelve C, las tres diagonales de K (inferior, principal, superior) y h A_s.
+    """
+    capacidad = rho * cp * volumenes
+    conductancia = k_cond * areas / dr
+
+    diag = np.zeros(len(volumenes))
+    diag[:-1] -= conductancia
+    diag[1:] -= conductancia
+    h_As = h * L ** m
+    diag[-1] -= h_As
+    return capacidad, conductancia.copy(), diag, conductancia.copy(), h_As
+
+
+class _ResolvedorTridiagonal:
+    """
+    Resuelve A x = y con A tridiagonal constante. La factorizo una sola vez
+    (LAPACK dgttrf) y cada paso solo hace la sustitución (dgttrs): O(n) por paso.
+    Si no está scipy, uso el algoritmo de Thomas con numpy.
+    """
+
+    def __init__(self, inferior, diagonal, superior):
+        if _LAPACK_DISPONIBLE:
+            dgttrf, self._dgttrs = _cargar_lapack()
+            self._lu = dgttrf(inferior, diagonal, superior)
+            if self._lu[-1] != 0:
+                raise np.linalg.LinAlgError("Matriz de conducción singular.")
+        else:
+            self._dgttrs = None
+            n = len(diagonal)
+            c = np.zeros(n - 1)
+            denominador = np.empty(n)
+            denominador[0] = diagonal[0]
+            for i in range(n - 1):
+                c[i] = superior[i] / denominador[i]
+                denominador[i + 1] = diagonal[i + 1] - inferior[i] * c[i]
+            self._inferior = np.asarray(inferior, dtype=float).tolist()
+            self._c = c.tolist()
+            self._denominador = denominador.tolist()
+
+    def resolver(self, y: np.ndarray) -> np.ndarray:
+        if self._dgttrs is not None:
+            dl, d, du, du2, ipiv, _ = self._lu
+            x, info = self._dgttrs(dl, d, du, du2, ipiv, y)
+            return x
+        # Thomas: barrido hacia adelante y sustitución hacia atrás
+        n = len(y)
+        z = y.tolist()
+        z[0] /= self._denominador[0]
+        for i in range(1, n):
+            z[i] = (z[i] - self._inferior[i - 1] * z[i - 1]) / self._denominador[i]
+        for i in range(n - 2, -1, -1):
+            z[i] -= self._c[i] * z[i + 1]
+        return np.array(z)
+
+
+def numero_biot(h: float, k_cond: float, L: float, geometria: str = "placa") -> float:
+    """
+    Número de Biot con la longitud característica V/A (L, L/2 o L/3).
+    Con Bi < 0.1 el cuerpo está casi a temperatura uniforme y la ley de
+    Newton (modelo concentrado) es una buena aproximación.
+    """
+    m = GEOMETRIAS[geometria]
+    return h * (L / (m + 1)) / k_cond
+
+
+def k_equivalente(h: float, rho: float, cp: float, L: float, geometria: str = "placa") -> float:
+    """
+    Constante k (1/h) de la ley de Newton equivalente al mismo cuerpo:
+    k = -h A / (rho cp V), pasada de 1/s a 1/h.
+    """
+    m = GEOMETRIAS[geometria]
+    return -h * (m + 1) / (rho * cp * L) * 3600.0
+
+
+# ------------------------------------------------------------
+# SIMULACIÓN POR BLOQUES (PARA MOSTRAR PROGRESO Y PODER CANCELAR)
+# ------------------------------------------------------------
+def iterar_conduccion(
+    T0: float = 90.0,
+    t_total: float = 5.0,
+    geometria: str = "placa",
+    L: float = 0.05,
+    k_cond: float = 0.5,
+    rho: float = 1000.0,
+    cp: float = 3800.0,
+    h: float = 10.0,
+    nodos: int = 51,
+    pasos: int = 500,
+    theta: float = 1.0,
+    modo_datos: str = "automatica",
+    archivo=None,
+    lista_manual: Optional[List[Tuple[float, float]]] = None,
+    usar_sinusoidal: bool = False,
+    metodo_interp: str = "lineal",
+    Tam_const: float = 25.0,
+    periodo_sinusoidal: Optional[float] = None,
+    armonicos: int = 1,
+    usar_cache_ajustes: bool = True,
+    filtro_atipicos=None,
+    datos=None,
+    pasos_por_bloque: int = 1000
+) -> Iterator[dict]:
+    """
+    Ejecuta la misma simulación que ejecutar_conduccion, pero por bloques de
+    `pasos_por_bloque` pasos. Después de cada bloque entrega un dict con:
+
+        "paso", "pasos", "terminado"
+        "tiempo", "superficie", "centro", "media", "Tam"
+                       arreglos con los puntos calculados hasta ahora (vistas)
+        "perfil"       temperaturas actuales de todos los nodos (copia)
+        "radios"       posición de cada nodo desde el centro (m)
+    """
+    if geometria not in GEOMETRIAS:
+        raise ValueError(f"Geometría inválida. Usa: {', '.join(GEOMETRIAS)}.")
+    if min(L, k_cond, rho, cp, t_total) <= 0 or h < 0:
+        raise ValueError("L, k_cond, rho, cp y t_total deben ser positivos, y h no negativo.")
+    if not 0.5 <= theta <= 1.0:
+        raise ValueError("theta debe estar entre 0.5 (Crank-Nicolson) y 1 (implícito).")
+    m = GEOMETRIAS[geometria]
+
+    # 1 Ambiente: las mismas fuentes y ajustes que la simulación RK4
+    with etapa("cargar_datos"):
+        datos = _cargar_datos(modo_datos, archivo, lista_manual, filtro_atipicos, datos)
+    with etapa("ajuste_ambiente"):
+        Tam_func_ajustada = _ajustar_ambiente(
+            datos, usar_sinusoidal, armonicos, periodo_sinusoidal, usar_cache_ajustes
+        )
+
+    pasos = max(10, int(pasos))
+    nodos = max(3, int(nodos))
+    pasos_por_bloque = max(1, int(pasos_por_bloque))
+    tiempos = np.linspace(0.0, t_total, pasos + 1)
+    with etapa("Tam_malla"):
+        Tam = _Tam_en_malla(tiempos, Tam_func_ajustada, datos, Tam_const, metodo_interp)
+
+    # 2 Sistema discreto: (C/dt - θK) T' = (C/dt + (1-θ)K) T + h A_s (θ Tam' + (1-θ) Tam)
+    r, dr, volumenes, areas = _malla_radial(float(L), nodos, m)
+    capacidad, inferior, diag, superior, h_As = _sistema_tridiagonal(
+        volumenes, areas, dr, k_cond, rho, cp, h, float(L), m
+    )
+    dt = t_total / pasos * 3600.0  # horas -> segundos
+    with etapa("factorizacion"):
+        resolvedor = _ResolvedorTridiagonal(
+            -theta * inferior, capacidad / dt - theta * diag, -theta * superior
+        )
+    # Parte explícita (solo con θ < 1)
+    explicito = 1.0 - theta
+    e_inf, e_diag, e_sup = explicito * inferior, capacidad / dt + explicito * diag, explicito * superior
+    aporte = h_As * (theta * Tam[1:] + explicito * Tam[:-1])
+
+    pesos = volumenes / volumenes.sum()
+    superficie = np.empty(pasos + 1)
+    centro = np.empty(pasos + 1)
+    media = np.empty(pasos + 1)
+    T = np.full(nodos, float(T0))
+    superficie[0] = centro[0] = media[0] = float(T0)
+
+    # 3 Avance en el tiempo: un producto tridiagonal y una sustitución por paso
+    for inicio in range(0, pasos, pasos_por_bloque):
+        fin = min(pasos, inicio + pasos_por_bloque)
+        with etapa("conduccion"):
+            for n in range(inicio, fin):
+                y = e_diag * T
+                if explicito:
+                    y[1:] += e_inf * T[:-1]
+                    y[:-1] += e_sup * T[1:]
+                y[-1] += aporte[n]
+                T = resolvedor.resolver(y)
+                superficie[n + 1] = T[-1]
+                centro[n + 1] = T[0]
+                media[n + 1] = pesos @ T
+        contar("pasos_conduccion", fin - inicio)
+
+        yield {
+            "paso": fin,
+            "pasos": pasos,
+            "terminado": fin == pasos,
+            "tiempo": tiempos[:fin + 1],
+            "superficie": superficie[:fin + 1],
+            "centro": centro[:fin + 1],
+            "media": media[:fin + 1],
+            "Tam": Tam[:fin + 1],
+            "perfil": T.copy(),
+            "radios": r,
+        }
+
+
+def resultado_conduccion(progreso: dict) -> pd.DataFrame:
+    """
+    Convierte un dict de progreso de iterar_conduccion en el DataFrame de
+    resultados. "Temperatura (°C)" es la media del cuerpo, así las gráficas y
+    exportaciones de la simulación RK4 sirven igual.
+    """
+    with etapa("dataframe"):
+        return pd.DataFrame({
+            "Tiempo (h)": np.array(progreso["tiempo"]),
+            "Temperatura (°C)": np.array(progreso["media"]),
+            "Temperatura superficie (°C)": np.array(progreso["superficie"]),
+            "Temperatura centro (°C)": np.array(progreso["centro"]),
+            "Tamiente (°C)": np.array(progreso["Tam"])
+        })
+
+
+# ------------------------------------------------------------
+# FUNCIÓN PRINCIPAL: CONDUCCIÓN INTERNA 1-D
+# ------------------------------------------------------------
+def ejecutar_conduccion(
+    T0: float = 90.0,
+    t_total: float = 5.0,
+    geometria: str = "placa",
+    L: float = 0.05,
+    k_cond: float = 0.5,
+    rho: float = 1000.0,
+    cp: float = 3800.0,
+    h: float = 10.0,
+    nodos: int = 51,
+    pasos: int = 500,
+    theta: float = 1.0,
+    modo_datos: str = "automatica",
+    archivo=None,
+    lista_manual: Optional[List[Tuple[float, float]]] = None,
+    usar_sinusoidal: bool = False,
+    metodo_interp: str = "lineal",
+    Tam_const: float = 25.0,
+    periodo_sinusoidal: Optional[float] = None,
+    armonicos: int = 1,
+    usar_cache_ajustes: bool = True,
+    filtro_atipicos=None,
+    datos=None
+) -> pd.DataFrame:
+    """
+    Simula el enfriamiento de un cuerpo con conducción interna 1-D (placa,
+    cilindro o esfera) y convección en la superficie hacia el mismo Tam(t)
+    que usa ejecutar_simulacion. Sirve cuando el número de Biot es mayor que
+    0.1 y la temperatura del cuerpo no es uniforme (productos gruesos).
+
+    Diferencias finitas implícitas (volúmenes finitos en r, esquema θ en t):
+    incondicionalmente estable, con una matriz tridiagonal que se factoriza
+    una vez (LAPACK) y se resuelve en O(nodos) por paso.
+
+    Parámetros:
+    -----------
+    T0 : float
+        Temperatura inicial uniforme del cuerpo (°C)
+    t_total : float
+        Duración total de la simulación (horas)
+    geometria : str
+        'placa' (L = media espesura), 'cilindro' o 'esfera' (L = radio)
+    L : float
+        Media espesura o radio (m)
+    k_cond : float
+        Conductividad térmica del cuerpo (W/m·K)
+    rho, cp : float
+        Densidad (kg/m³) y calor específico (J/kg·K)
+    h : float
+        Coeficiente de convección en la superficie (W/m²·K)
+    nodos : int
+        Nodos entre el centro y la superficie
+    pasos : int
+        Pasos de tiempo
+    theta : float
+        1 = implícito (por defecto, sin oscilaciones); 0.5 = Crank-Nicolson
+    modo_datos, archivo, lista_manual, usar_sinusoidal, metodo_interp,
+    Tam_const, periodo_sinusoidal, armonicos, usar_cache_ajustes,
+    filtro_atipicos, datos :
+        Fuente de la temperatura ambiente, igual que en ejecutar_simulacion.
+
+    Retorna:
+    --------
+    pandas.DataFrame con columnas:
+        "Tiempo (h)" | "Temperatura (°C)" (media) | "Temperatura superficie (°C)"
+        | "Temperatura centro (°C)" | "Tamiente (°C)"
+    En attrs quedan el número de Biot y la k de Newton equivalente.
+    """
+    progreso = None
+    with cronometro("conduccion"):
+        for progreso in iterar_conduccion(
+            T0=T0, t_total=t_total, geometria=geometria, L=L, k_cond=k_cond, rho=rho,
+            cp=cp, h=h, nodos=nodos, pasos=pasos, theta=theta, modo_datos=modo_datos,
+            archivo=archivo, lista_manual=lista_manual, usar_sinusoidal=usar_sinusoidal,
+            metodo_interp=metodo_interp, Tam_const=Tam_const,
+            periodo_sinusoidal=periodo_sinusoidal, armonicos=armonicos,
+            usar_cache_ajustes=usar_cache_ajustes, filtro_atipicos=filtro_atipicos,
+            datos=datos, pasos_por_bloque=max(10, int(pasos))
+        ):
+            pass
+    REGISTRO.incrementar("pasos_conduccion_total", cantidad=progreso["paso"],
+                         ayuda="Pasos de tiempo calculados por el motor de conducción")
+
+    resultados = resultado_conduccion(progreso)
+    resultados.attrs["geometria"] = geometria
+    resultados.attrs["biot"] = numero_biot(h, k_cond, L, geometria)
+    resultados.attrs["k_equivalente"] = k_equivalente(h, rho, cp, L, geometria)
+    return resultados
@@ -0,0 +1,155 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# ------------------------------------------------------------
+# IMPORTS DEPENDIENTES DE LA ESTRUCTURA DEL PROYECTO
+# ------------------------------------------------------------
+
+try:
+    from simulacion.solucion_rk4 import ejecutar_simulacion
+except Exception:
+    from app.simulacion.solucion_rk4 import ejecutar_simulacion
+
+
+# ------------------------------------------------------------
+# RESUMEN DE UN RESULTADO
+# ------------------------------------------------------------
+def tiempo_hasta_umbral(resultados: pd.DataFrame, umbral: float) -> float:
+    """
+    Devuelve el primer instante (h) en que la temperatura del cuerpo cruza el
+    umbral, interpolando linealmente entre pasos. NaN si nunca lo cruza.
+    """
+    t = resultados["Tiempo (h)"].to_numpy()
+    T = resultados["Temperatura (°C)"].to_numpy()
+    if len(T) == 0:
+        return float("nan")
+
+    # Busco el primer paso en que el signo de (T - umbral) cambia respecto al inicio
+    lado = np.sign(T - umbral)
+    if lado[0] == 0:
+        return float(t[0])
+    cruces = np.nonzero(lado != lado[0])[0]
+    if len(cruces) == 0:
+        return float("nan")
+
+    j = int(cruces[0])
+    T_a, T_b = T[j - 1], T[j]
+    if T_b == T_a:
+        return float(t[j])
+    fraccion = (umbral - T_a) / (T_b - T_a)
+    return float(t[j - 1] + fraccion * (t[j] - t[j - 1]))
+
+
+def resumir_escenario(resultados: pd.DataFrame, umbral: float) -> Dict[str, float]:
+    """
+    Resume un resultado: temperatura final, mínima y tiempo hasta el umbral.
+    """
+    return {
+        "T final (°C)": float(resultados["Temperatura (°C)"].iloc[-1]),
+        "T mínima (°C)": float(resultados["Temperatura (°C)"].min()),
+        f"Tiempo hasta {umbral:g} °C (h)": tiempo_hasta_umbral(resultados, umbral),
+    }
+
+
+# ------------------------------------------------------------
+# EJECUCIÓN CONCURRENTE DE VARIOS ESCENARIOS
+# ------------------------------------------------------------
+def _ejecutar_escenario(parametros: dict):
+    """
+    Corre un escenario en un proceso del pool y mide cuánto tarda.
+    """
+    inicio = time.perf_counter()
+    resultados = ejecutar_simulacion(**parametros)
+    return resultados, time.perf_counter() - inicio
+
+
+def ejecutar_escenarios(
+    escenarios: List[dict],
+    max_trabajadores: Optional[int] = None,
+    al_avanzar: Optional[Callable[[str, str, dict], None]] = None,
+    executor=None
+) -> List[dict]:
+    """
+    Ejecuta varios escenarios a la vez en un pool de procesos acotado.
+
+    Parámetros:
+    -----------
+    escenarios : list[dict]
+        Cada escenario es un dict con "nombre" y los argumentos de
+        ejecutar_simulacion (T0, k, t_total, modo_datos, usar_sinusoidal, ...).
+        Los nombres deben ser distintos: el progreso y las gráficas se
+        identifican por nombre (ValueError si se repiten).
+    max_trabajadores : int, opcional
+        Tamaño del pool (por defecto, el menor entre escenarios y núcleos).
+    al_avanzar : callable, opcional
+        Se llama como al_avanzar(nombre, estado, info) con estado
+        "ejecutando", "listo" o "error", para mostrar el progreso.
+    executor : concurrent.futures.Executor, opcional
+        Pool ya creado para reutilizar (si no, se crea uno temporal).
+
+    Retorna:
+    --------
+    Lista (en el mismo orden que escenarios) de dicts con
+    "nombre", "resultados" (DataFrame o None), "segundos" y "error".
+    """
+    if not escenarios:
+        return []
+
+    nombres = [str(e.get("nombre", f"Escenario {i + 1}")) for i, e in enumerate(escenarios)]
+    repetidos = sorted({n for n in nombres if nombres.count(n) > 1})
+    if repetidos:
+        raise ValueError(f"Nombres de escenario repetidos: {', '.join(repetidos)}")
+    salida = [{"nombre": n, "resultados": None, "segundos": float("nan"), "error": None} for n in nombres]
+
+    propio = executor is None
+    if propio:
+        if max_trabajadores is None:
+            max_trabajadores = min(len(escenarios), os.cpu_count() or 1)
+        executor = ProcessPoolExecutor(max_workers=max(1, int(max_trabajadores)))
+
+    try:
+        futuros = {}
+        for i, escenario in enumerate(escenarios):
+            parametros = {c: v for c, v in escenario.items() if c != "nombre"}
+            futuros[executor.submit(_ejecutar_escenario, parametros)] = i
+            if al_avanzar is not None:
+                al_avanzar(nombres[i], "ejecutando", {})
+
+        # Recojo cada escenario apenas termina, sin esperar a los demás
+        for futuro in as_completed(futuros):
+            i = futuros[futuro]
+            try:
+                resultados, segundos = futuro.result()
+                salida[i]["resultados"] = resultados
+                salida[i]["segundos"] = segundos
+                estado = "listo"
+            except Exception as e:
+                salida[i]["error"] = str(e)
+                estado = "error"
+            if al_avanzar is not None:
+                al_avanzar(nombres[i], estado, salida[i])
+    finally:
+        if propio:
+            executor.shutdown(wait=True)
+
+    return salida
+
+
+def tabla_resumen(salida: List[dict], umbral: float) -> pd.DataFrame:
+    """
+    Arma la tabla comparativa (una fila por escenario) a partir de ejecutar_escenarios.
+    """
+    filas = []
+    for item in salida:
+        fila = {"Escenario": item["nombre"], "Duración (s)": item["segundos"]}
+        if item["resultados"] is not None:
+            fila.update(resumir_escenario(item["resultados"], umbral))
+        else:
+            fila["Error"] = item["error"]
+        filas.append(fila)
+    return pd.DataFrame(filas)
@@ -0,0 +1,99 @@
+import numpy as np
+from typing import Optional, Sequence
+
+
+# ------------------------------------------------------------
+# SOLUCIÓN ANALÍTICA (TEMPERATURA AMBIENTE CONSTANTE)
+# ------------------------------------------------------------
+def temperatura_newton(t, T0: float, k: float, Tam: float):
+    """
+    Solución exacta de dT/dt = k * (T - Tam) con Tam constante:
+
+        T(t) = Tam + (T0 - Tam) * exp(k * t)
+    """
+    return Tam + (T0 - Tam) * np.exp(k * np.asarray(t, dtype=float))
+
+
+# ------------------------------------------------------------
+# AJUSTE DE LA CONSTANTE DE ENFRIAMIENTO k
+# ------------------------------------------------------------
+def _k_inicial(t: np.ndarray, T: np.ndarray, T0: float, Tam: float) -> float:
+    """
+    Estimación inicial de k con la recta ln((T - Tam) / (T0 - Tam)) = k * t
+    (mínimos cuadrados por el origen, solo con los puntos donde el log existe).
+    """
+    cociente = (T - Tam) / (T0 - Tam)
+    validos = (cociente > 0) & (t > 0)
+    if not np.any(validos):
+        return -0.1
+    tv = t[validos]
+    return float(np.dot(tv, np.log(cociente[validos])) / np.dot(tv, tv))
+
+
+def ajustar_k(
+    tiempos: Sequence[float],
+    temperaturas: Sequence[float],
+    Tam: float = 25.0,
+    T0: Optional[float] = None,
+    iteraciones: int = 50,
+    tolerancia: float = 1e-12
+) -> dict:
+    """
+    Ajusta la constante de enfriamiento k a mediciones (t, T) del cuerpo,
+    suponiendo temperatura ambiente constante.
+
+    Parámetros:
+    -----------
+    tiempos, temperaturas : secuencias de float
+        Mediciones del cuerpo (horas, °C).
+    Tam : float
+        Temperatura ambiente (°C).
+    T0 : float, opcional
+        Temperatura inicial conocida. Si es None, también se ajusta.
+    iteraciones, tolerancia :
+        Control del método de Gauss-Newton.
+
+    Retorna:
+    --------
+    dict con "k", "T0", "rmse", "r2" e "iteraciones".
+    """
+    t = np.asarray(tiempos, dtype=float)
+    T = np.asarray(temperaturas, dtype=float)
+    if t.shape != T.shape or t.ndim != 1:
+        raise ValueError("tiempos y temperaturas deben ser listas del mismo largo.")
+    ajustar_T0 = T0 is None
+    if len(t) < (2 if ajustar_T0 else 1) + 1:
+        raise ValueError("Se necesitan al menos 3 mediciones (2 si se conoce T0).")
+
+    Tam = float(Tam)
+    T0 = float(T[np.argmin(t)]) if ajustar_T0 else float(T0)
+    if T0 == Tam:
+        raise ValueError("T0 es igual a la temperatura ambiente: k no se puede ajustar.")
+    k = _k_inicial(t, T, T0, Tam)
+
+    # Gauss-Newton con el jacobiano analítico de T(t) = Tam + (T0 - Tam) e^{kt}
+    n_iter = 0
+    for n_iter in range(1, int(iteraciones) + 1):
+        e = np.exp(k * t)
+        residuo = T - (Tam + (T0 - Tam) * e)
+        columnas = [(T0 - Tam) * t * e]
+        if ajustar_T0:
+            columnas.append(e)
+        J = np.column_stack(columnas)
+        delta = np.linalg.lstsq(J, residuo, rcond=None)[0]
+        k += float(delta[0])
+        if ajustar_T0:
+            T0 += float(delta[1])
+        if np.max(np.abs(delta)) < tolerancia * (1.0 + abs(k)):
+            break
+
+    residuo = T - temperatura_newton(t, T0, k, Tam)
+    ss_res = float(np.dot(residuo, residuo))
+    ss_tot = float(np.sum((T - T.mean()) ** 2))
+    return {
+        "k": float(k),
+        "T0": float(T0),
+        "rmse": float(np.sqrt(ss_res / len(T))),
+        "r2": 1.0 - ss_res / ss_tot if ss_tot > 0 else 1.0,
+        "iteraciones": n_iter,
+    }
@@ -0,0 +1,318 @@
+import os
+import json
+import time
+import hashlib
+import itertools
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+# ------------------------------------------------------------
+# IMPORTS DEPENDIENTES DE LA ESTRUCTURA DEL PROYECTO
+# ------------------------------------------------------------
+
+try:
+    from simulacion.solucion_rk4 import ejecutar_simulacion
+    from simulacion.modelos_rhs import preparar_parametros
+    from visualizacion.exportacion import escribir_resultados, nombre_archivo, FORMATOS
+    from metricas import REGISTRO, con_metricas, descartar_heredadas, registrar_operacion
+except Exception:
+    from app.simulacion.solucion_rk4 import ejecutar_simulacion
+    from app.simulacion.modelos_rhs import preparar_parametros
+    from app.visualizacion.exportacion import escribir_resultados, nombre_archivo, FORMATOS
+    from app.metricas import REGISTRO, con_metricas, descartar_heredadas, registrar_operacion
+
+
+# Archivo (una línea JSON por trabajo terminado) que permite reanudar un lote
+MANIFIESTO = "manifiesto.jsonl"
+
+
+# ------------------------------------------------------------
+# LECTURA DE TRABAJOS (JSON / CSV / REJILLA DE PARÁMETROS)
+# ------------------------------------------------------------
+def _a_bool(valor) -> bool:
+    if isinstance(valor, str):
+        return valor.strip().lower() in ("1", "true", "si", "sí", "yes", "verdadero")
+    return bool(valor)
+
+
+# Parámetros de ejecutar_simulacion que se pueden dar en un archivo de trabajos
+_TIPOS = {
+    "T0": float,
+    "k": float,
+    "t_total": float,
+    "modo_datos": str,
+    "archivo": str,
+    "lista_manual": lambda v: [tuple(map(float, p)) for p in v],
+    "usar_sinusoidal": _a_bool,
+    "pasos": int,
+    "metodo_interp": str,
+    "Tam_const": float,
+    "periodo_sinusoidal": float,
+    "armonicos": int,
+    "usar_cache_ajustes": _a_bool,
+    "modelo": str,
+    "parametros_modelo": lambda v: json.loads(v) if isinstance(v, str) else dict(v),
+}
+
+
+def normalizar_trabajo(trabajo: dict) -> dict:
+    """
+    Convierte los valores de un trabajo a los tipos de ejecutar_simulacion.
+    Las celdas vacías (None / NaN de un CSV) se omiten para usar el valor por defecto.
+    """
+    parametros = {}
+    for clave, valor in trabajo.items():
+        if clave == "nombre":
+            continue
+        if clave not in _TIPOS:
+            raise ValueError(f"Parámetro desconocido en el trabajo: '{clave}'")
+        if valor is None or (isinstance(valor, float) and valor != valor) or valor == "":
+            continue
+        parametros[clave] = _TIPOS[clave](valor)
+
+    # El modelo y sus parámetros requeridos se revisan aquí, antes de mandar el trabajo al pool
+    if "modelo" in parametros or "parametros_modelo" in parametros:
+        preparar_parametros(parametros.get("parametros_modelo"), parametros.get("modelo", "newton"))
+    return parametros
+
+
+def identificador_trabajo(parametros: dict) -> str:
+    """
+    Huella estable de los parámetros: el mismo trabajo da siempre el mismo id,
+    así se reconoce como terminado al reanudar.
+    """
+    texto = json.dumps(parametros, sort_keys=True, default=list)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()[:16]
+
+
+def expandir_rejilla(base: dict, rejilla: Dict[str, list]) -> List[dict]:
+    """
+    Genera un trabajo por cada combinación de valores de la rejilla,
+    partiendo de los parámetros base.
+    """
+    claves = list(rejilla)
+    trabajos = []
+    for valores in itertools.product(*(rejilla[c] for c in claves)):
+        trabajo = dict(base)
+        trabajo.update(zip(claves, valores))
+        trabajo.setdefault("nombre", ", ".join(f"{c}={v}" for c, v in zip(claves, valores)))
+        trabajos.append(trabajo)
+    return trabajos
+
+
+def trabajos_desde_contenido(contenido) -> List[dict]:
+    """
+    Arma la lista de trabajos (cada uno con "id", "nombre" y "parametros") a
+    partir de una lista de trabajos, o de un objeto con "trabajos" (lista) y/o
+    "rejilla" ({parámetro: [valores]}) más "base" (parámetros comunes).
+    """
+    if isinstance(contenido, list):
+        crudos = contenido
+    elif isinstance(contenido, dict):
+        base = contenido.get("base", {})
+        crudos = [{**base, **t} for t in contenido.get("trabajos", [])]
+        if "rejilla" in contenido:
+            crudos += expandir_rejilla(base, contenido["rejilla"])
+    else:
+        raise ValueError("Los trabajos deben ser una lista o un objeto con 'trabajos'/'rejilla'.")
+
+    trabajos = []
+    for i, crudo in enumerate(crudos):
+        parametros = normalizar_trabajo(crudo)
+        id_trabajo = identificador_trabajo(parametros)
+        nombre = crudo.get("nombre")
+        if nombre is None or (isinstance(nombre, float) and nombre != nombre):
+            nombre = f"Trabajo {i + 1}"
+        trabajos.append({"id": id_trabajo, "nombre": str(nombre), "parametros": parametros})
+    return trabajos
+
+
+def cargar_trabajos(ruta) -> List[dict]:
+    """
+    Lee un archivo de trabajos y devuelve la lista de trabajos.
+
+    Formatos aceptados:
+    - CSV: una fila por trabajo, columnas con los nombres de los parámetros
+      (y opcionalmente "nombre").
+    - JSON: lo mismo que acepta trabajos_desde_contenido.
+    """
+    ruta = Path(ruta)
+    if ruta.suffix.lower() == ".csv":
+        return trabajos_desde_contenido(pd.read_csv(ruta).to_dict(orient="records"))
+    return trabajos_desde_contenido(json.loads(ruta.read_text(encoding="utf-8")))
+
+
+# ------------------------------------------------------------
+# MANIFIESTO (REANUDAR UN LOTE INTERRUMPIDO)
+# ------------------------------------------------------------
+def leer_manifiesto(directorio) -> Dict[str, dict]:
+    """
+    Devuelve los trabajos ya terminados bien (por id) cuyo archivo sigue existiendo.
+    Una última línea cortada por una interrupción simplemente se ignora.
+    """
+    ruta = Path(directorio) / MANIFIESTO
+    terminados = {}
+    if not ruta.exists():
+        return terminados
+    with open(ruta, encoding="utf-8") as f:
+        for linea in f:
+            try:
+                registro = json.loads(linea)
+            except json.JSONDecodeError:
+                continue
+            if registro.get("estado") == "ok" and (Path(directorio) / registro["archivo"]).exists():
+                terminados[registro["id"]] = registro
+    return terminados
+
+
+# ------------------------------------------------------------
+# EJECUCIÓN DEL LOTE
+# ------------------------------------------------------------
+def _ejecutar_trabajo(trabajo: dict, directorio: str, formato: str,
+                      decimales: Optional[int], float32: bool) -> dict:
+    """
+    Corre un trabajo en un proceso del pool y escribe su resultado directamente
+    en disco (así la tabla no tiene que volver al proceso principal).
+    """
+    inicio = time.perf_counter()
+    resultados = ejecutar_simulacion(**trabajo["parametros"])
+    segundos_simulacion = time.perf_counter() - inicio
+
+    archivo = nombre_archivo(trabajo["id"], formato)
+    # Escribo en un temporal y lo renombro: nunca queda un archivo a medias
+    temporal = Path(directorio) / (archivo + ".tmp")
+    escribir_resultados(resultados, temporal, formato=formato, decimales=decimales, float32=float32)
+    os.replace(temporal, Path(directorio) / archivo)
+
+    return {
+        "id": trabajo["id"],
+        "nombre": trabajo["nombre"],
+        "estado": "ok",
+        "archivo": archivo,
+        "filas": len(resultados),
+        "segundos": time.perf_counter() - inicio,
+        "segundos_simulacion": segundos_simulacion,
+        "parametros": trabajo["parametros"],
+    }
+
+
+def ejecutar_lote(
+    trabajos: List[dict],
+    directorio,
+    formato: str = "npz",
+    trabajadores: Optional[int] = None,
+    decimales: Optional[int] = None,
+    float32: bool = False,
+    reanudar: bool = True,
+    al_terminar: Optional[Callable[[dict], None]] = None
+) -> dict:
+    """
+    Ejecuta un lote de trabajos en paralelo y escribe cada resultado apenas termina.
+
+    Parámetros:
+    -----------
+    trabajos : list[dict]
+        Trabajos de cargar_trabajos (con "id", "nombre" y "parametros").
+    directorio : str o Path
+        Carpeta de salida: un archivo por trabajo más el manifiesto.
+    formato : str
+        Formato de los resultados (ver exportacion.FORMATOS). Por defecto NPZ.
+    trabajadores : int, opcional
+        Procesos en paralelo (por defecto, los núcleos). Con 1 se corre en este proceso.
+    decimales, float32 :
+        Precisión con la que se guardan los resultados.
+    reanudar : bool
+        Si True, se saltan los trabajos que el manifiesto ya marca como terminados.
+    al_terminar : callable, opcional
+        Se llama con el registro de cada trabajo terminado (o con error).
+
+    Retorna:
+    --------
+    dict con "total", "saltados", "ok", "errores", "segundos",
+    "trabajos_por_segundo" y "pasos_por_segundo".
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconocido: '{formato}'. Usa: {', '.join(FORMATOS)}")
+
+    directorio = Path(directorio)
+    directorio.mkdir(parents=True, exist_ok=True)
+
+    terminados = leer_manifiesto(directorio) if reanudar else {}
+    # El mismo trabajo repetido en el archivo solo se corre una vez
+    pendientes = list({t["id"]: t for t in trabajos if t["id"] not in terminados}.values())
+
+    resumen = {"total": len(trabajos), "saltados": len(trabajos) - len(pendientes),
+               "ok": 0, "errores": 0, "segundos": 0.0,
+               "trabajos_por_segundo": 0.0, "pasos_por_segundo": 0.0}
+    if not pendientes:
+        return resumen
+
+    if trabajadores is None:
+        trabajadores = os.cpu_count() or 1
+    trabajadores = max(1, min(int(trabajadores), len(pendientes)))
+
+    pasos_totales = 0
+    inicio = time.perf_counter()
+
+    with open(directorio / MANIFIESTO, "a", encoding="utf-8") as manifiesto:
+
+        def registrar(registro):
+            nonlocal pasos_totales
+            manifiesto.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            manifiesto.flush()
+            if registro["estado"] == "ok":
+                resumen["ok"] += 1
+                pasos_totales += registro["filas"] - 1
+            else:
+                resumen["errores"] += 1
+            # Los trabajos corren en otros procesos: la métrica la anoto aquí, en el principal
+            registrar_operacion("trabajo_lote", registro.get("segundos") or 0.0,
+                                ok=registro["estado"] == "ok")
+            if al_terminar is not None:
+                al_terminar(registro)
+
+        def fallo(trabajo, error):
+            return {"id": trabajo["id"], "nombre": trabajo["nombre"], "estado": "error",
+                    "error": str(error), "parametros": trabajo["parametros"]}
+
+        if trabajadores == 1:
+            for trabajo in pendientes:
+                try:
+                    registrar(_ejecutar_trabajo(trabajo, str(directorio), formato, decimales, float32))
+                except Exception as e:
+                    registrar(fallo(trabajo, e))
+        else:
+            with ProcessPoolExecutor(max_workers=trabajadores, initializer=descartar_heredadas) as executor:
+                # Mantengo acotados los trabajos en vuelo (útil con rejillas grandes)
+                cola = iter(pendientes)
+                en_vuelo = {}
+
+                def enviar():
+                    for trabajo in itertools.islice(cola, 2 * trabajadores - len(en_vuelo)):
+                        futuro = executor.submit(con_metricas, _ejecutar_trabajo, trabajo,
+                                                 str(directorio), formato, decimales, float32)
+                        en_vuelo[futuro] = trabajo
+
+                enviar()
+                while en_vuelo:
+                    listos, _ = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                    for futuro in listos:
+                        trabajo = en_vuelo.pop(futuro)
+                        try:
+                            registro, metricas = futuro.result()
+                        except Exception as e:
+                            registrar(fallo(trabajo, e))
+                            continue
+                        # Sumo aquí lo que midió el proceso (simulación, cachés de ajustes)
+                        REGISTRO.combinar(metricas)
+                        registrar(registro)
+                    enviar()
+
+    resumen["segundos"] = time.perf_counter() - inicio
+    if resumen["segundos"] > 0:
+        resumen["trabajos_por_segundo"] = (resumen["ok"] + resumen["errores"]) / resumen["segundos"]
+        resumen["pasos_por_segundo"] = pasos_totales / resumen["segundos"]
+    return resumen
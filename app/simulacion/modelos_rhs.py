@@ -0,0 +1,254 @@
+import numpy as np
+from typing import Callable, Dict, Optional
+
+
+# ------------------------------------------------------------
+# MODELOS DE PÉRDIDA DE CALOR (LADO DERECHO dT/dt = f(T, Tam, k))
+# ------------------------------------------------------------
+# Cada modelo es una función vectorizada:
+#
+#     derivada(T, Tam, k, p) -> dT/dt
+#
+#   T    temperaturas del cuerpo (float o arreglo: un valor por miembro del conjunto)
+#   Tam  temperatura ambiente en ese instante (float o arreglo que se difunde con T)
+#   k    constante de enfriamiento en ese instante (1/h), ya evaluada en el tiempo
+#   p    dict de parámetros del modelo (floats o arreglos con la forma de T)
+#
+# Lo que depende del tiempo (Tam, k(t)) se evalúa UNA vez en toda la malla
+# antes del bucle; dentro del bucle solo hay operaciones de numpy sobre arreglos.
+
+# Cero absoluto y constante de Stefan-Boltzmann (W/m²·K⁴)
+KELVIN = 273.15
+SIGMA = 5.670374419e-8
+
+
+class ModeloRHS:
+    """
+    Un modelo registrado: su derivada vectorizada y, si k cambia con el
+    tiempo, la función que evalúa k en toda la malla de una vez.
+
+    Parámetros:
+    -----------
+    nombre : str
+        Nombre con el que se pide el modelo (p. ej. "radiacion").
+    derivada : callable
+        derivada(T, Tam, k, p) vectorizada.
+    coeficiente : callable, opcional
+        coeficiente(malla, k, p) -> k en cada tiempo de la malla. Si es None,
+        k es constante.
+    descripcion : str
+        Texto corto para listas y menús.
+    requeridos : tupla de str
+        Parámetros sin valor por defecto (p. ej. ("kr",) en 'radiacion').
+    """
+
+    def __init__(self, nombre: str, derivada: Callable, coeficiente: Optional[Callable] = None,
+                 descripcion: str = "", requeridos: tuple = ()):
+        self.nombre = nombre
+        self.derivada = derivada
+        self.coeficiente = coeficiente
+        self.descripcion = descripcion
+        self.requeridos = tuple(requeridos)
+
+    def k_en_malla(self, malla: np.ndarray, k, p: dict) -> np.ndarray:
+        """
+        Evalúa k en todos los tiempos de la malla. Devuelve un arreglo con
+        forma (len(malla),) + forma de k; si k es constante no copia nada.
+        """
+        k = np.asarray(k, dtype=float)
+        if self.coeficiente is None:
+            return np.broadcast_to(k, (len(malla),) + k.shape)
+        return np.asarray(self.coeficiente(malla, k, p), dtype=float)
+
+    def __repr__(self):
+        return f"ModeloRHS({self.nombre!r})"
+
+
+MODELOS_RHS: Dict[str, ModeloRHS] = {}
+
+
+def registrar_modelo(modelo: ModeloRHS) -> ModeloRHS:
+    """
+    Agrega un modelo al registro (o reemplaza uno con el mismo nombre).
+    """
+    MODELOS_RHS[modelo.nombre] = modelo
+    return modelo
+
+
+def obtener_modelo(modelo) -> ModeloRHS:
+    """
+    Devuelve el modelo registrado con ese nombre (o el mismo objeto si ya es
+    un ModeloRHS).
+    """
+    if isinstance(modelo, ModeloRHS):
+        return modelo
+    if modelo not in MODELOS_RHS:
+        raise ValueError(f"Modelo desconocido: '{modelo}'. Usa: {', '.join(MODELOS_RHS)}")
+    return MODELOS_RHS[modelo]
+
+
+def preparar_parametros(parametros: Optional[dict], modelo=None) -> dict:
+    """
+    Convierte los parámetros numéricos (listas incluidas) a float o arreglo
+    de numpy una sola vez. Lo que no es numérico (eventos, funciones) queda igual.
+
+    Si se da el modelo, reviso antes que estén sus parámetros requeridos: así
+    el error sale al empezar (ValueError) y no dentro del bucle RK4.
+    """
+    if modelo is not None:
+        modelo = obtener_modelo(modelo)
+        for nombre in modelo.requeridos:
+            if nombre not in (parametros or {}):
+                raise ValueError(f"falta el parámetro '{nombre}' del modelo {modelo.nombre}")
+    preparados = {}
+    for nombre, valor in (parametros or {}).items():
+        if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+            preparados[nombre] = float(valor)
+        elif isinstance(valor, (list, tuple, np.ndarray)) and nombre != "eventos":
+            preparados[nombre] = np.asarray(valor, dtype=float)
+        else:
+            preparados[nombre] = valor
+    return preparados
+
+
+# ------------------------------------------------------------
+# 1. LEY DE NEWTON CLÁSICA
+# ------------------------------------------------------------
+def _newton(T, Tam, k, p):
+    return k * (T - Tam)
+
+
+# ------------------------------------------------------------
+# 2. NEWTON CON k(t): APERTURAS DE PUERTA, HORARIOS DE VENTILADOR
+# ------------------------------------------------------------
+def _k_por_eventos(malla: np.ndarray, k: np.ndarray, p: dict) -> np.ndarray:
+    """
+    k(t) = k * factor(t). Los eventos son (t_inicio, t_fin, factor) en horas;
+    si se da "periodo" (p. ej. 24) los eventos se repiten cada periodo.
+    También se acepta "k_t": una función vectorizada de t que da k directamente.
+    """
+    if p.get("k_t") is not None:
+        valores = np.asarray(p["k_t"](malla), dtype=float)
+        return np.multiply.outer(valores, np.ones(k.shape))
+
+    periodo = p.get("periodo")
+    t = np.mod(malla, float(periodo)) if periodo else malla
+    factor = np.ones(len(malla))
+    for t_inicio, t_fin, f in p.get("eventos", ()):
+        factor = np.where((t >= float(t_inicio)) & (t < float(t_fin)), factor * float(f), factor)
+    return np.multiply.outer(factor, k)
+
+
+# ------------------------------------------------------------
+# 3. CONVECCIÓN + RADIACIÓN (TÉRMINOS T⁴)
+# ------------------------------------------------------------
+def coeficiente_radiacion(emisividad: float, area: float, masa: float, cp: float) -> float:
+    """
+    Coeficiente kr (1/(h·K³)) del término de radiación:
+
+        dT/dt = ... + kr * ((T + 273.15)⁴ - (Tam + 273.15)⁴)
+        kr = -ε σ A / (m cp), pasado de 1/s a 1/h
+
+    Parámetros:
+    -----------
+    emisividad : float
+        Emisividad de la superficie (0 a 1)
+    area : float
+        Área expuesta (m²)
+    masa, cp : float
+        Masa (kg) y calor específico (J/kg·K) del cuerpo
+    """
+    return -emisividad * SIGMA * area / (masa * cp) * 3600.0
+
+
+def _radiacion(T, Tam, k, p):
+    TK = T + KELVIN
+    TamK = Tam + KELVIN
+    TK2 = TK * TK
+    TamK2 = TamK * TamK
+    return k * (T - Tam) + p["kr"] * (TK2 * TK2 - TamK2 * TamK2)
+
+
+# ------------------------------------------------------------
+# 4. CAMBIO DE FASE (MESETA DE CONGELACIÓN / SOLIDIFICACIÓN)
+# ------------------------------------------------------------
+def _cambio_fase(T, Tam, k, p):
+    """
+    Capacidad calorífica aparente: cerca de T_fase el cuerpo absorbe o libera
+    el calor latente y la temperatura casi no cambia (meseta).
+
+        dT/dt = k (T - Tam) / (1 + (L/cp) g(T)),   g = campana normal de ancho σ
+    """
+    z = (T - p["T_fase"]) / p.get("ancho", 0.5)
+    campana = np.exp(-0.5 * z * z) / (p.get("ancho", 0.5) * 2.5066282746310002)
+    return k * (T - Tam) / (1.0 + p["latente_cp"] * campana)
+
+
+registrar_modelo(ModeloRHS(
+    "newton", _newton,
+    descripcion="Ley de Newton: k (T - Tam)"))
+registrar_modelo(ModeloRHS(
+    "k_variable", _newton, coeficiente=_k_por_eventos,
+    descripcion="Newton con k(t): eventos (t_inicio, t_fin, factor), periodo o k_t"))
+registrar_modelo(ModeloRHS(
+    "radiacion", _radiacion,
+    descripcion="Convección + radiación: k (T - Tam) + kr (T⁴ - Tam⁴), en kelvin",
+    requeridos=("kr",)))
+registrar_modelo(ModeloRHS(
+    "cambio_fase", _cambio_fase,
+    descripcion="Newton con meseta de cambio de fase: T_fase, latente_cp (L/cp, K) y ancho (K)",
+    requeridos=("T_fase", "latente_cp")))
+
+
+# ------------------------------------------------------------
+# INTEGRADOR RK4 VECTORIZADO (UN MIEMBRO O UN CONJUNTO)
+# ------------------------------------------------------------
+def integrar_rk4(modelo, T0, Tam_etapas: np.ndarray, k_etapas: np.ndarray,
+                 dt: float, parametros: Optional[dict] = None,
+                 inicio: int = 0, fin: Optional[int] = None,
+                 salida: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Avanza RK4 de paso fijo con cualquier modelo del registro.
+
+    Parámetros:
+    -----------
+    modelo : str o ModeloRHS
+    T0 : float o arreglo
+        Estado al inicio del paso `inicio` (un valor por miembro del conjunto).
+    Tam_etapas, k_etapas : arreglos
+        Tam y k en la malla de dt/2 (2 * pasos + 1 puntos). Pueden tener una
+        segunda dimensión por miembro.
+    dt : float
+        Paso de tiempo (horas).
+    parametros : dict, opcional
+        Parámetros del modelo (ya pasados por preparar_parametros o no).
+    inicio, fin : int
+        Rango de pasos a calcular (para avanzar por bloques).
+    salida : arreglo, opcional
+        Donde escribir el estado después de cada paso (salida[i + 1]).
+
+    Retorna:
+    --------
+    El estado después del paso `fin`.
+    """
+    modelo = obtener_modelo(modelo)
+    derivada = modelo.derivada
+    p = preparar_parametros(parametros, modelo)
+    fin = (len(Tam_etapas) - 1) // 2 if fin is None else fin
+    T = np.array(T0, dtype=float)
+    medio = 0.5 * dt
+    sexto = dt / 6.0
+
+    for i in range(inicio, fin):
+        # Las etapas k2 y k3 comparten Tam y k del punto medio
+        Tam_ini, Tam_med, Tam_fin = Tam_etapas[2 * i], Tam_etapas[2 * i + 1], Tam_etapas[2 * i + 2]
+        k_ini, k_med, k_fin = k_etapas[2 * i], k_etapas[2 * i + 1], k_etapas[2 * i + 2]
+
+        k1 = derivada(T, Tam_ini, k_ini, p)
+        k2 = derivada(T + medio * k1, Tam_med, k_med, p)
+        k3 = derivada(T + medio * k2, Tam_med, k_med, p)
+        k4 = derivada(T + dt * k3, Tam_fin, k_fin, p)
+        T = T + sexto * (k1 + 2.0 * (k2 + k3) + k4)
+        if salida is not None:
+            salida[i + 1] = T
+    return T
@@ -1,6 +1,6 @@
 import numpy as np
 import pandas as pd
-from typing import Optional, List, Tuple
+from typing import Iterator, Optional, List, Tuple
 
 # ------------------------------------------------------------
 # IMPORTS DEPENDIENTES DE LA ESTRUCTURA DEL PROYECTO
@@ -23,30 +23,267 @@ except Exception:
         temperatura_ambiente = None
 
 try:
-    from procesos_datos.ajuste_curvas import ajustar_sinusoidal
+    from procesos_datos.ajuste_curvas import ajustar_modelo_ambiente
     _AJUSTE_DISPONIBLE = True
 except Exception:
     try:
-        from app.procesos_datos.ajuste_curvas import ajustar_sinusoidal
+        from app.procesos_datos.ajuste_curvas import ajustar_modelo_ambiente
         _AJUSTE_DISPONIBLE = True
     except Exception:
-        ajustar_sinusoidal = None
+        ajustar_modelo_ambiente = None
         _AJUSTE_DISPONIBLE = False
 
+try:
+    from instrumentacion import etapa, contar, medir
+    from metricas import REGISTRO, cronometro, medido_por_bloques
+except Exception:
+    from app.instrumentacion import etapa, contar, medir
+    from app.metricas import REGISTRO, cronometro, medido_por_bloques
+
+try:
+    from simulacion.modelos_rhs import obtener_modelo, preparar_parametros, integrar_rk4
+except Exception:
+    from app.simulacion.modelos_rhs import obtener_modelo, preparar_parametros, integrar_rk4
+
+try:
+    from procesos_datos.serie_ambiente import como_serie
+except Exception:
+    try:
+        from app.procesos_datos.serie_ambiente import como_serie
+    except Exception:
+        como_serie = None
+
 
 # ------------------------------------------------------------
 # FUNCIÓN INTERNA: ECUACIÓN DIFERENCIAL DE ENFRIAMIENTO
 # ------------------------------------------------------------
-def _f_enfriamiento(Ti: float, t: float, k: float, datos: Optional[pd.DataFrame],
+def _f_enfriamiento(Ti: float, t: float, k: float, datos,
                     Tam_const: float, metodo_interp: str = "lineal") -> float:
     """
-    Calcula la derivada dT/dt = k * (T - Tam(t))
+    Calcula la derivada dT/dt = k * (T - Tam(t)) con el modelo "newton" del
+    registro (modelos_rhs). El bucle RK4 ya no la llama paso a paso.
     """
     if temperatura_ambiente is None:
         Tam_t = Tam_const
     else:
         Tam_t = temperatura_ambiente(t, datos, default=Tam_const, metodo=metodo_interp)
-    return k * (Ti - Tam_t)
+    return obtener_modelo("newton").derivada(Ti, Tam_t, k, None)
+
+
+
+# ------------------------------------------------------------
+# FUNCIONES INTERNAS: DATOS Y TEMPERATURA AMBIENTE
+# ------------------------------------------------------------
+def _cargar_datos(modo_datos: str, archivo, lista_manual, filtro_atipicos, datos):
+    """
+    Obtiene la serie de temperatura ambiente según el modo de datos y la
+    convierte una sola vez al contenedor compartido (SerieAmbiente).
+    """
+    if datos is not None:
+        # Me dieron la serie directamente: no hace falta cargar nada
+        pass
+
+    elif modo_datos == "csv":
+        if obtener_datos is None:
+            raise RuntimeError("No se pudo acceder a 'obtener_datos' para modo CSV.")
+        datos = obtener_datos("csv", archivo=archivo, filtro=filtro_atipicos)
+
+    elif modo_datos == "manual":
+        if obtener_datos is None:
+            raise RuntimeError("No se pudo acceder a 'obtener_datos' para modo manual.")
+        datos = obtener_datos("manual", lista_manual=lista_manual, filtro=filtro_atipicos)
+
+    elif modo_datos == "automatica":
+        if obtener_datos is not None:
+            datos = obtener_datos("automatica")
+        else:
+            # Generar modelo base si no hay cargador
+            tiempos = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23]
+            temperaturas = [12.2, 11.7, 11.7, 11.1, 10.6, 10.6, 10.0, 11.1, 13.3, 15.6, 17.8, 17.8, 17.8, 17.8, 17.2, 16.7, 16.1, 15.6, 14.4, 14.4, 13.9, 13.3, 12.2, 12.2]
+            datos = pd.DataFrame({"tiempo": tiempos, "Tam": temperaturas})
+
+    else:
+        raise ValueError("Modo de datos inválido. Usa: 'csv', 'manual' o 'automatica'.")
+
+    if como_serie is not None:
+        datos = como_serie(datos)
+    return datos
+
+
+def _ajustar_ambiente(datos, usar_sinusoidal: bool, armonicos: int,
+                      periodo_sinusoidal: Optional[float], usar_cache_ajustes: bool):
+    """
+    Ajusta (opcionalmente) un modelo sinusoidal o de Fourier a la serie.
+    Devuelve el modelo ajustado o None si no se pidió o no fue posible.
+    """
+    Tam_func_ajustada = None
+    if usar_sinusoidal and _AJUSTE_DISPONIBLE:
+        try:
+            if int(armonicos) > 1:
+                parametros, Tam_func_ajustada = ajustar_modelo_ambiente(
+                    datos, tipo="fourier", usar_cache=usar_cache_ajustes,
+                    orden=int(armonicos),
+                    periodo=periodo_sinusoidal if periodo_sinusoidal is not None else 24.0
+                )
+            else:
+                parametros, Tam_func_ajustada = ajustar_modelo_ambiente(
+                    datos, tipo="sinusoidal", usar_cache=usar_cache_ajustes,
+                    periodo_fijo=periodo_sinusoidal
+                )
+        except Exception as e:
+            print(f"⚠ No se pudo ajustar modelo sinusoidal: {e}")
+            Tam_func_ajustada = None
+    elif usar_sinusoidal:
+        print("⚠ Módulo de ajuste sinusoidal no disponible (falta scipy o ajuste_curvas).")
+    return Tam_func_ajustada
+
+
+def _Tam_en_malla(malla: np.ndarray, Tam_func_ajustada, datos,
+                  Tam_const: float, metodo_interp: str) -> np.ndarray:
+    """
+    Evalúa Tam(t) de una sola vez en todos los tiempos de la malla.
+    """
+    if Tam_func_ajustada is not None:
+        return np.asarray(Tam_func_ajustada(malla), dtype=float)
+    if temperatura_ambiente is not None:
+        return np.asarray(
+            temperatura_ambiente(malla, datos, default=Tam_const, metodo=metodo_interp), dtype=float
+        )
+    return np.full(malla.shape, float(Tam_const))
+
+
+
+# SIMULACIÓN POR BLOQUES (PARA MOSTRAR PROGRESO Y PODER CANCELAR)
+
+# La latencia que se expone (operacion="simulacion") es la de todo el generador,
+# así cuentan también la interfaz por bloques y la cola de trabajos
+@medido_por_bloques("simulacion")
+def iterar_simulacion(
+    T0: float = 90.0,
+    k: float = -0.13,
+    t_total: float = 5.0,
+    modo_datos: str = "automatica",
+    archivo=None,
+    lista_manual: Optional[List[Tuple[float, float]]] = None,
+    usar_sinusoidal: bool = False,
+    pasos: int = 200,
+    metodo_interp: str = "lineal",
+    Tam_const: float = 25.0,
+    periodo_sinusoidal: Optional[float] = None,
+    armonicos: int = 1,
+    usar_cache_ajustes: bool = True,
+    filtro_atipicos=None,
+    datos=None,
+    pasos_por_bloque: int = 1000,
+    modelo: str = "newton",
+    parametros_modelo: Optional[dict] = None
+) -> Iterator[dict]:
+    """
+    Ejecuta la misma simulación que ejecutar_simulacion, pero por bloques de
+    `pasos_por_bloque` pasos RK4. Después de cada bloque entrega un dict con:
+
+        "paso"         pasos completados hasta ahora
+        "pasos"        pasos totales
+        "terminado"    True en el último bloque
+        "tiempo", "temperatura", "Tam"
+                       arreglos con los puntos calculados hasta ahora (vistas,
+                       sin copiar; usar resultado_parcial para tener un DataFrame)
+
+    Quien consume el generador puede dejar de pedir bloques en cualquier
+    momento: la simulación se detiene en ese límite de bloque.
+    """
+    # El modelo se valida antes de cargar datos, así un nombre mal escrito falla rápido
+    modelo_rhs = obtener_modelo(modelo)
+    parametros_modelo = preparar_parametros(parametros_modelo, modelo_rhs)
+
+    # 1 Obtener los datos base (como SerieAmbiente)
+    with etapa("cargar_datos"):
+        datos = _cargar_datos(modo_datos, archivo, lista_manual, filtro_atipicos, datos)
+
+    # 2 Ajuste sinusoidal o de Fourier (opcional)
+    with etapa("ajuste_ambiente"):
+        Tam_func_ajustada = _ajustar_ambiente(
+            datos, usar_sinusoidal, armonicos, periodo_sinusoidal, usar_cache_ajustes
+        )
+
+    
+    # 3 Preparar arreglos de tiempo y temperatura ambiente
+    
+    pasos = max(10, int(pasos))
+    pasos_por_bloque = max(1, int(pasos_por_bloque))
+    dt = t_total / pasos
+    tiempos = np.linspace(0.0, t_total, pasos + 1)
+
+    # RK4 necesita Tam al inicio, en la mitad y al final de cada paso: todos esos
+    # tiempos forman una malla de dt/2, así que evalúo Tam de una sola vez en ella
+    malla = np.linspace(0.0, t_total, 2 * pasos + 1)
+    with etapa("Tam_malla"):
+        Tam_etapas = _Tam_en_malla(malla, Tam_func_ajustada, datos, Tam_const, metodo_interp)
+    contar("evaluaciones_Tam", len(malla))
+    Tam_usada = Tam_etapas[::2]
+
+    
+    # 4 Bucle RK4 principal (sin crear funciones por paso). La ley de Newton
+    #   clásica va con números de Python, que para un solo cuerpo es lo más
+    #   rápido; los demás modelos usan su derivada vectorizada del registro.
+    
+    newton = modelo_rhs.nombre == "newton"
+    if newton:
+        k = float(k)
+        Tam_lista = Tam_etapas.tolist()
+    else:
+        k_etapas = modelo_rhs.k_en_malla(malla, float(k), parametros_modelo)
+    T = np.empty(pasos + 1)
+    Ti = float(T0)
+    T[0] = Ti
+
+    for inicio in range(0, pasos, pasos_por_bloque):
+        fin = min(pasos, inicio + pasos_por_bloque)
+        with etapa("rk4"):
+            if newton:
+                bloque = []
+                for i in range(inicio, fin):
+                    # Las etapas k2 y k3 comparten el mismo Tam del punto medio
+                    Tam_ini = Tam_lista[2 * i]
+                    Tam_med = Tam_lista[2 * i + 1]
+                    Tam_fin = Tam_lista[2 * i + 2]
+
+                    k1 = k * (Ti - Tam_ini)
+                    k2 = k * (Ti + 0.5 * dt * k1 - Tam_med)
+                    k3 = k * (Ti + 0.5 * dt * k2 - Tam_med)
+                    k4 = k * (Ti + dt * k3 - Tam_fin)
+                    Ti = Ti + (dt / 6.0) * (k1 + 2*k2 + 2*k3 + k4)
+                    bloque.append(Ti)
+                T[inicio + 1:fin + 1] = bloque
+            else:
+                Ti = integrar_rk4(modelo_rhs, Ti, Tam_etapas, k_etapas, dt, parametros_modelo,
+                                  inicio=inicio, fin=fin, salida=T)
+        contar("pasos_rk4", fin - inicio)
+        contar("evaluaciones_rhs", 4 * (fin - inicio))
+        REGISTRO.incrementar("pasos_rk4_total", cantidad=fin - inicio,
+                             ayuda="Pasos RK4 calculados por las simulaciones")
+
+        yield {
+            "paso": fin,
+            "pasos": pasos,
+            "terminado": fin == pasos,
+            "tiempo": tiempos[:fin + 1],
+            "temperatura": T[:fin + 1],
+            "Tam": Tam_usada[:fin + 1],
+        }
+
+
+def resultado_parcial(progreso: dict) -> pd.DataFrame:
+    """
+    Convierte un dict de progreso de iterar_simulacion en el DataFrame de
+    resultados (con las mismas columnas que ejecutar_simulacion).
+    """
+    with etapa("dataframe"):
+        return pd.DataFrame({
+            "Tiempo (h)": np.array(progreso["tiempo"]),
+            "Temperatura (°C)": np.array(progreso["temperatura"]),
+            "Tamiente (°C)": np.array(progreso["Tam"])
+        })
 
 
 
@@ -62,7 +299,17 @@ def ejecutar_simulacion(
     usar_sinusoidal: bool = False,
     pasos: int = 200,
     metodo_interp: str = "lineal",
-    Tam_const: float = 25.0
+    Tam_const: float = 25.0,
+    periodo_sinusoidal: Optional[float] = None,
+    armonicos: int = 1,
+    usar_cache_ajustes: bool = True,
+    filtro_atipicos=None,
+    datos=None,
+    instrumentar: bool = False,
+    medir_memoria: bool = False,
+    perfil: Optional[str] = None,
+    modelo: str = "newton",
+    parametros_modelo: Optional[dict] = None
 ) -> pd.DataFrame:
     """
     Ejecuta la simulación del enfriamiento con temperatura ambiente variable
@@ -90,6 +337,35 @@ def ejecutar_simulacion(
         Método de interpolación para Tam (lineal o spline)
     Tam_const : float
         Temperatura ambiente constante de respaldo
+    periodo_sinusoidal : float, opcional
+        Periodo conocido (horas) del ajuste sinusoidal. Si se indica, el ajuste
+        es lineal y exacto; si es None, también se ajusta el periodo.
+    armonicos : int
+        Número de armónicos del modelo ajustado. Con 1 se usa la sinusoide
+        clásica; con más se ajusta un modelo de Fourier (periodo 24 h por defecto).
+    usar_cache_ajustes : bool
+        Si True, reutiliza los parámetros ya ajustados para los mismos datos
+        y opciones (caché en memoria y, si se configura, en disco).
+    filtro_atipicos : FiltroHampel, opcional
+        Filtro de picos que se aplica a los datos CSV o manuales antes de validarlos.
+    datos : SerieAmbiente o pandas.DataFrame, opcional
+        Serie de temperatura ambiente ya cargada. Si se indica, se usa
+        directamente y se ignoran modo_datos, archivo y lista_manual.
+    instrumentar : bool
+        Si True, mide el tiempo de cada etapa (carga de datos, ajuste, Tam en
+        la malla, bucle RK4, DataFrame) y cuenta evaluaciones. El resumen queda
+        en resultados.attrs["instrumentacion"] y en el registro (logging).
+    medir_memoria : bool
+        Si True, también mide la memoria pico por etapa con tracemalloc.
+    perfil : str, opcional
+        Ruta de un archivo .prof: corre cProfile durante la simulación y
+        guarda ahí sus estadísticas.
+    modelo : str
+        Modelo de pérdida de calor del registro (modelos_rhs.MODELOS_RHS):
+        'newton', 'k_variable', 'radiacion' o 'cambio_fase'.
+    parametros_modelo : dict, opcional
+        Parámetros del modelo, por ejemplo {"kr": -1e-9} para 'radiacion' o
+        {"eventos": [(8, 8.5, 3.0)], "periodo": 24} para 'k_variable'.
 
     Retorna:
     --------
@@ -97,103 +373,107 @@ def ejecutar_simulacion(
         "Tiempo (h)" | "Temperatura (°C)" | "Tamiente (°C)"
     """
 
-    
-    # 1 Obtener los datos base
-    
-    datos = None
-    if modo_datos == "csv":
-        if obtener_datos is None:
-            raise RuntimeError("No se pudo acceder a 'obtener_datos' para modo CSV.")
-        datos = obtener_datos("csv", archivo=archivo)
+    if instrumentar or medir_memoria or perfil:
+        with medir(memoria=medir_memoria, perfil=perfil, titulo="ejecutar_simulacion") as medicion:
+            resultados = ejecutar_simulacion(
+                T0=T0, k=k, t_total=t_total, modo_datos=modo_datos, archivo=archivo,
+                lista_manual=lista_manual, usar_sinusoidal=usar_sinusoidal, pasos=pasos,
+                metodo_interp=metodo_interp, Tam_const=Tam_const,
+                periodo_sinusoidal=periodo_sinusoidal, armonicos=armonicos,
+                usar_cache_ajustes=usar_cache_ajustes, filtro_atipicos=filtro_atipicos,
+                datos=datos, modelo=modelo, parametros_modelo=parametros_modelo
+            )
+        resultados.attrs["instrumentacion"] = medicion.resumen()
+        return resultados
 
-    elif modo_datos == "manual":
-        if obtener_datos is None:
-            raise RuntimeError("No se pudo acceder a 'obtener_datos' para modo manual.")
-        datos = obtener_datos("manual", lista_manual=lista_manual)
+    # La latencia y los pasos (app/metricas.py) los anota iterar_simulacion
+    progreso = None
+    for progreso in iterar_simulacion(
+        T0=T0, k=k, t_total=t_total, modo_datos=modo_datos, archivo=archivo,
+        lista_manual=lista_manual, usar_sinusoidal=usar_sinusoidal, pasos=pasos,
+        metodo_interp=metodo_interp, Tam_const=Tam_const,
+        periodo_sinusoidal=periodo_sinusoidal, armonicos=armonicos,
+        usar_cache_ajustes=usar_cache_ajustes, filtro_atipicos=filtro_atipicos,
+        datos=datos, pasos_por_bloque=max(10, int(pasos)),
+        modelo=modelo, parametros_modelo=parametros_modelo
+    ):
+        pass
 
-    elif modo_datos == "automatica":
-        if obtener_datos is not None:
-            datos = obtener_datos("automatica")
-        else:
-            # Generar modelo base si no hay cargador
-            tiempos = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23]
-            temperaturas = [12.2, 11.7, 11.7, 11.1, 10.6, 10.6, 10.0, 11.1, 13.3, 15.6, 17.8, 17.8, 17.8, 17.8, 17.2, 16.7, 16.1, 15.6, 14.4, 14.4, 13.9, 13.3, 12.2, 12.2]
-            datos = pd.DataFrame({"tiempo": tiempos, "Tam": temperaturas})
+    # 5 Resultado final
+    return resultado_parcial(progreso)
 
-    else:
-        raise ValueError("Modo de datos inválido. Usa: 'csv', 'manual' o 'automatica'.")
 
-    
-    # 2 Ajuste sinusoidal (opcional)
-    
-    Tam_func_ajustada = None
-    if usar_sinusoidal and _AJUSTE_DISPONIBLE:
-        try:
-            parametros, Tam_func_ajustada = ajustar_sinusoidal(datos)
-        except Exception as e:
-            print(f"⚠ No se pudo ajustar modelo sinusoidal: {e}")
-            Tam_func_ajustada = None
-    elif usar_sinusoidal:
-        print("⚠ Módulo de ajuste sinusoidal no disponible (falta scipy o ajuste_curvas).")
 
-    
-    # 3 Preparar arreglos de tiempo y temperatura
-    
-    pasos = max(10, int(pasos))
-    dt = t_total / pasos
-    tiempos = np.linspace(0.0, t_total, pasos + 1)
-    T = np.zeros(pasos + 1)
-    T[0] = float(T0)
-    Tam_usada = np.zeros(pasos + 1)
+# CONJUNTO: MUCHOS CUERPOS EN UNA SOLA PASADA VECTORIZADA
 
-    
-    # 4 Bucle RK4 principal
-    
-    for i in range(pasos):
-        t_i = float(tiempos[i])
-
-        # Determinar Tam actual (según modo o función ajustada)
-        if Tam_func_ajustada is not None:
-            Tam_i = float(Tam_func_ajustada(t_i))
-        elif temperatura_ambiente is not None:
-            Tam_i = float(temperatura_ambiente(t_i, datos, default=Tam_const, metodo=metodo_interp))
-        else:
-            Tam_i = float(Tam_const)
+def ejecutar_conjunto(
+    T0=90.0,
+    k=-0.13,
+    t_total: float = 5.0,
+    modo_datos: str = "automatica",
+    archivo=None,
+    lista_manual: Optional[List[Tuple[float, float]]] = None,
+    usar_sinusoidal: bool = False,
+    pasos: int = 200,
+    metodo_interp: str = "lineal",
+    Tam_const: float = 25.0,
+    periodo_sinusoidal: Optional[float] = None,
+    armonicos: int = 1,
+    usar_cache_ajustes: bool = True,
+    filtro_atipicos=None,
+    datos=None,
+    modelo: str = "newton",
+    parametros_modelo: Optional[dict] = None
+) -> pd.DataFrame:
+    """
+    Simula varios cuerpos (un conjunto) con el mismo ambiente en un solo bucle
+    RK4: el estado es un arreglo con un valor por miembro y cada etapa es una
+    operación de numpy sobre todo el arreglo.
 
-        Tam_usada[i] = Tam_i
+    Parámetros:
+    -----------
+    T0, k : float o secuencia
+        Temperatura inicial y constante de cada miembro (se difunden entre sí).
+    parametros_modelo : dict, opcional
+        Igual que en ejecutar_simulacion; cada valor puede ser una secuencia
+        con un valor por miembro.
+    El resto, igual que en ejecutar_simulacion.
 
-        def f(Ti, t):
-            if Tam_func_ajustada is not None:
-                Tam_t = float(Tam_func_ajustada(t))
-            elif temperatura_ambiente is not None:
-                Tam_t = float(temperatura_ambiente(t, datos, default=Tam_const, metodo=metodo_interp))
-            else:
-                Tam_t = float(Tam_const)
-            return k * (Ti - Tam_t)
-
-        # Método RK4
-        k1 = f(T[i], tiempos[i])
-        k2 = f(T[i] + 0.5 * dt * k1, tiempos[i] + 0.5 * dt)
-        k3 = f(T[i] + 0.5 * dt * k2, tiempos[i] + 0.5 * dt)
-        k4 = f(T[i] + dt * k3, tiempos[i] + dt)
-        T[i + 1] = T[i] + (dt / 6.0) * (k1 + 2*k2 + 2*k3 + k4)
-
-    # Último punto
-    t_last = float(tiempos[-1])
-    if Tam_func_ajustada is not None:
-        Tam_usada[-1] = float(Tam_func_ajustada(t_last))
-    elif temperatura_ambiente is not None:
-        Tam_usada[-1] = float(temperatura_ambiente(t_last, datos, default=Tam_const, metodo=metodo_interp))
-    else:
-        Tam_usada[-1] = float(Tam_const)
+    Retorna:
+    --------
+    pandas.DataFrame con columnas:
+        "Tiempo (h)" | "Tamiente (°C)" | "Temperatura 0 (°C)" | "Temperatura 1 (°C)" | ...
+    """
+    modelo_rhs = obtener_modelo(modelo)
+    parametros_modelo = preparar_parametros(parametros_modelo, modelo_rhs)
 
-    
-    # 5 Resultado final
-    
-    df = pd.DataFrame({
-        "Tiempo (h)": tiempos,
-        "Temperatura (°C)": T,
-        "Tamiente (°C)": Tam_usada
-    })
+    with cronometro("conjunto"):
+        datos = _cargar_datos(modo_datos, archivo, lista_manual, filtro_atipicos, datos)
+        Tam_func_ajustada = _ajustar_ambiente(
+            datos, usar_sinusoidal, armonicos, periodo_sinusoidal, usar_cache_ajustes
+        )
+
+        pasos = max(10, int(pasos))
+        dt = t_total / pasos
+        tiempos = np.linspace(0.0, t_total, pasos + 1)
+        malla = np.linspace(0.0, t_total, 2 * pasos + 1)
+        Tam_etapas = _Tam_en_malla(malla, Tam_func_ajustada, datos, Tam_const, metodo_interp)
+
+        # Todos los parámetros por miembro deben poder difundirse a una misma forma
+        T0, k = np.broadcast_arrays(np.asarray(T0, dtype=float), np.asarray(k, dtype=float))
+        forma = np.broadcast_shapes(T0.shape, *(np.shape(v) for v in parametros_modelo.values()
+                                                if isinstance(v, np.ndarray)))
+        T0 = np.broadcast_to(T0, forma)
+        k = np.broadcast_to(k, forma)
+        k_etapas = modelo_rhs.k_en_malla(malla, k, parametros_modelo)
+
+        T = np.empty((pasos + 1,) + forma)
+        T[0] = T0
+        integrar_rk4(modelo_rhs, T0, Tam_etapas, k_etapas, dt, parametros_modelo, salida=T)
+    REGISTRO.incrementar("pasos_rk4_total", cantidad=pasos * max(1, T0.size),
+                         ayuda="Pasos RK4 calculados por las simulaciones")
 
-    return df
+    columnas = {"Tiempo (h)": tiempos, "Tamiente (°C)": Tam_etapas[::2]}
+    for i, serie in enumerate(T.reshape(pasos + 1, -1).T):
+        columnas[f"Temperatura {i} (°C)"] = serie
+    return pd.DataFrame(columnas)
@@ -0,0 +1,199 @@
+import sys
+import json
+import argparse
+from pathlib import Path
+
+import pandas as pd
+
+# Cargo el ejecutor de lotes y la cola de trabajos (funciona tanto desde app/ como desde la raíz del proyecto)
+try:
+    from simulacion.lotes import cargar_trabajos, ejecutar_lote
+    from servicio.trabajos import GestorTrabajos, TrabajoNoEncontrado
+    from visualizacion.exportacion import formatos_disponibles, escribir_resultados
+except Exception:
+    from app.simulacion.lotes import cargar_trabajos, ejecutar_lote
+    from app.servicio.trabajos import GestorTrabajos, TrabajoNoEncontrado
+    from app.visualizacion.exportacion import formatos_disponibles, escribir_resultados
+
+
+# 1. SUBCOMANDO "lote": SIMULACIONES EN LOTE SIN INTERFAZ
+
+def _comando_lote(args):
+    """
+    Yo leo el archivo de trabajos, corro las simulaciones en paralelo y voy
+    mostrando cuánto tardó cada una. Al final muestro el rendimiento del lote.
+    """
+    try:
+        trabajos = cargar_trabajos(args.trabajos)
+    except (ValueError, OSError) as e:
+        # Archivo que no existe o no se puede leer, parámetros desconocidos o inválidos
+        print(f"✗ {e}")
+        return 1
+    print(f"Lote: {len(trabajos)} trabajos -> {args.salida} (formato {args.formato})")
+
+    def al_terminar(registro):
+        if registro["estado"] == "ok":
+            print(f"  ✓ {registro['nombre']}: {registro['segundos']:.3f} s "
+                  f"({registro['filas']} filas) -> {registro['archivo']}")
+        else:
+            print(f"  ✗ {registro['nombre']}: {registro['error']}")
+
+    resumen = ejecutar_lote(
+        trabajos, args.salida, formato=args.formato, trabajadores=args.workers,
+        decimales=args.decimales, float32=args.float32,
+        reanudar=not args.sin_reanudar, al_terminar=al_terminar
+    )
+
+    print(f"\nTerminados: {resumen['ok']}  Errores: {resumen['errores']}  "
+          f"Saltados (ya hechos): {resumen['saltados']}")
+    if resumen["segundos"] > 0:
+        print(f"Tiempo total: {resumen['segundos']:.2f} s  |  "
+              f"{resumen['trabajos_por_segundo']:.2f} trabajos/s  |  "
+              f"{resumen['pasos_por_segundo']:,.0f} pasos RK4/s")
+    return 1 if resumen["errores"] else 0
+
+
+# 2. SUBCOMANDO "trabajos": COLA DE TRABAJOS CON ESTADO GUARDADO EN DISCO
+
+def _mostrar_estado(estado):
+    print(f"  {estado['id']}  {estado['estado']:<12} {100 * estado['progreso']:5.1f}%  "
+          f"({estado['terminados']}/{estado['total']})  {estado['nombre']}")
+
+
+def _ejecutar_pendientes(gestor):
+    """
+    Yo arranco el pool, corro todo lo pendiente y muestro el avance hasta que termine
+    """
+    encoladas = gestor.iniciar()
+    print(f"Simulaciones en cola: {encoladas}")
+    ultimo = {}
+
+    def al_avanzar(estado):
+        # Solo imprimo cuando algo cambió, para no llenar la pantalla
+        resumen = (estado["estado"], round(estado["progreso"], 2))
+        if ultimo.get(estado["id"]) != resumen:
+            ultimo[estado["id"]] = resumen
+            _mostrar_estado(estado)
+
+    try:
+        gestor.esperar(al_avanzar=al_avanzar)
+    finally:
+        gestor.cerrar()
+
+
+def _comando_trabajos(args):
+    gestor = GestorTrabajos(ruta=args.base_datos, trabajadores=args.workers)
+    try:
+        return _accion_trabajos(gestor, args)
+    except (TrabajoNoEncontrado, ValueError) as e:
+        # Trabajo inexistente, resultado que aún no está listo o parámetros inválidos
+        print(f"✗ {e.args[0] if e.args else e}")
+        return 1
+
+
+def _accion_trabajos(gestor, args):
+    if args.accion == "enviar":
+        ruta = Path(args.archivo)
+        if ruta.suffix.lower() == ".csv":
+            contenido = pd.read_csv(ruta).to_dict(orient="records")
+        else:
+            contenido = json.loads(ruta.read_text(encoding="utf-8"))
+        id_trabajo = gestor.enviar(contenido, nombre=args.nombre)
+        print(f"Trabajo enviado: {id_trabajo}")
+        if args.ejecutar:
+            _ejecutar_pendientes(gestor)
+
+    elif args.accion == "ejecutar":
+        _ejecutar_pendientes(gestor)
+
+    elif args.accion == "listar":
+        for estado in gestor.listar(limite=args.limite):
+            _mostrar_estado(estado)
+
+    elif args.accion == "estado":
+        estado = gestor.estado(args.id)
+        _mostrar_estado(estado)
+        for sim in estado["simulaciones"]:
+            detalle = sim["error"] or (f"{sim['segundos']:.2f} s, {sim['filas']} filas"
+                                       if sim["segundos"] is not None else "")
+            print(f"    [{sim['indice']}] {sim['estado']:<11} {100 * sim['progreso']:5.1f}%  "
+                  f"{sim['nombre']}  {detalle}")
+
+    elif args.accion == "resultado":
+        resultados = gestor.resultado(args.id, indice=args.indice)
+        escribir_resultados(resultados, args.salida, formato=args.formato)
+        print(f"✓ {len(resultados)} filas guardadas en {args.salida}")
+
+    elif args.accion == "cancelar":
+        gestor.cancelar(args.id)
+        print(f"Trabajo {args.id} cancelado")
+
+    return 0
+
+
+# 3. ARGUMENTOS DE LA LÍNEA DE COMANDOS
+
+def crear_parser():
+    parser = argparse.ArgumentParser(
+        prog="python app/main.py",
+        description="Simulador de la ley de enfriamiento de Newton (modo terminal)."
+    )
+    subcomandos = parser.add_subparsers(dest="comando")
+
+    lote = subcomandos.add_parser("lote", help="Ejecutar un lote de simulaciones desde un archivo")
+    lote.add_argument("trabajos", help="Archivo de trabajos (.json con lista/rejilla o .csv)")
+    lote.add_argument("--salida", "-o", default="resultados_lote", help="Carpeta de salida")
+    lote.add_argument("--workers", "-w", type=int, default=None,
+                      help="Procesos en paralelo (por defecto, todos los núcleos)")
+    lote.add_argument("--formato", "-f", default="npz", choices=formatos_disponibles(),
+                      help="Formato de los resultados")
+    lote.add_argument("--decimales", type=int, default=None, help="Redondear a estos decimales")
+    lote.add_argument("--float32", action="store_true", help="Guardar los números en 32 bits")
+    lote.add_argument("--sin-reanudar", action="store_true",
+                      help="Volver a correr también los trabajos ya terminados")
+    lote.set_defaults(funcion=_comando_lote)
+
+    trabajos = subcomandos.add_parser("trabajos", help="Cola de trabajos con estado guardado en disco")
+    trabajos.add_argument("--base-datos", default=None,
+                          help="Archivo SQLite de la cola (por defecto, RUTA_TRABAJOS del .env)")
+    trabajos.add_argument("--workers", "-w", type=int, default=None,
+                          help="Procesos en paralelo al ejecutar (por defecto, todos los núcleos)")
+    acciones = trabajos.add_subparsers(dest="accion", required=True)
+
+    enviar = acciones.add_parser("enviar", help="Guardar una simulación o barrido (.json/.csv)")
+    enviar.add_argument("archivo", help="Parámetros de una simulación, o un barrido como en 'lote'")
+    enviar.add_argument("--nombre", default=None, help="Nombre del trabajo")
+    enviar.add_argument("--ejecutar", action="store_true", help="Ejecutar la cola enseguida")
+
+    acciones.add_parser("ejecutar", help="Ejecutar los trabajos pendientes o interrumpidos")
+
+    listar = acciones.add_parser("listar", help="Ver los últimos trabajos")
+    listar.add_argument("--limite", type=int, default=20)
+
+    estado = acciones.add_parser("estado", help="Ver el estado y progreso de un trabajo")
+    estado.add_argument("id")
+
+    resultado = acciones.add_parser("resultado", help="Guardar el resultado de una simulación terminada")
+    resultado.add_argument("id")
+    resultado.add_argument("--indice", type=int, default=0, help="Simulación del barrido (0 = la primera)")
+    resultado.add_argument("--salida", "-o", required=True, help="Archivo de salida")
+    resultado.add_argument("--formato", "-f", default="csv", choices=formatos_disponibles())
+
+    cancelar = acciones.add_parser("cancelar", help="Cancelar un trabajo")
+    cancelar.add_argument("id")
+    trabajos.set_defaults(funcion=_comando_trabajos)
+
+    return parser
+
+
+def main(argv=None):
+    parser = crear_parser()
+    args = parser.parse_args(argv)
+    if args.comando is None:
+        parser.print_help()
+        return 0
+    return args.funcion(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
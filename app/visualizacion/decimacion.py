@@ -0,0 +1,70 @@
+import numpy as np
+
+
+# 1. DECIMACIÓN LTTB (Largest-Triangle-Three-Buckets)
+
+def indices_lttb(x, y, max_puntos=3000):
+    """
+    Yo elijo como máximo max_puntos índices de la serie (x, y) que conservan su forma.
+
+    Divido la serie en cubetas y de cada una me quedo con el punto que forma el
+    triángulo más grande con el punto elegido antes y el promedio de la cubeta
+    siguiente. Siempre conservo el primer y el último punto.
+    Devuelvo los índices ordenados, así puedo aplicarlos a varias columnas.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    max_puntos = int(max_puntos)
+
+    if max_puntos >= n or n <= 2:
+        return np.arange(n)
+    if max_puntos < 3:
+        return np.array([0, n - 1])
+
+    # Límites de las cubetas intermedias (el primer y último punto van aparte)
+    bordes = np.linspace(1, n - 1, max_puntos - 1).astype(int)
+    indices = np.empty(max_puntos, dtype=int)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    # Promedio de cada cubeta (lo uso como tercer vértice del triángulo)
+    x_prom = np.add.reduceat(x[1:n - 1], bordes[:-1] - 1) / np.diff(bordes)
+    y_prom = np.add.reduceat(y[1:n - 1], bordes[:-1] - 1) / np.diff(bordes)
+
+    anterior = 0
+    for b in range(max_puntos - 2):
+        inicio, fin = bordes[b], bordes[b + 1]
+
+        if b + 1 < max_puntos - 2:
+            x_sig, y_sig = x_prom[b + 1], y_prom[b + 1]
+        else:
+            x_sig, y_sig = x[-1], y[-1]
+
+        xa, ya = x[anterior], y[anterior]
+        # Área (doble) del triángulo para todos los puntos de la cubeta a la vez
+        areas = np.abs(
+            (xa - x_sig) * (y[inicio:fin] - ya) - (xa - x[inicio:fin]) * (y_sig - ya)
+        )
+        anterior = inicio + int(np.argmax(areas))
+        indices[b + 1] = anterior
+
+    return indices
+
+
+def decimar(df, columna_x, columna_y, max_puntos=3000, rango=None):
+    """
+    Yo reduzco una tabla a como máximo max_puntos filas usando LTTB sobre
+    (columna_x, columna_y). Si me das un rango (x_min, x_max), primero recorto
+    la tabla a ese intervalo: así al acercar la vista vuelvo a tener detalle.
+    """
+    if rango is not None:
+        x = df[columna_x].to_numpy()
+        x_min, x_max = rango
+        # Los datos están ordenados por x: recorto con búsqueda binaria
+        i0 = max(0, int(np.searchsorted(x, x_min, side="left")) - 1)
+        i1 = min(len(x), int(np.searchsorted(x, x_max, side="right")) + 1)
+        df = df.iloc[i0:i1]
+
+    indices = indices_lttb(df[columna_x].to_numpy(), df[columna_y].to_numpy(), max_puntos)
+    return df.iloc[indices]
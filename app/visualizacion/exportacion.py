@@ -0,0 +1,148 @@
+import io
+import zlib
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+
+# 1. FORMATOS DE EXPORTACIÓN
+
+# Para cada formato guardo la extensión del archivo y el tipo MIME de la descarga
+FORMATOS = {
+    "csv": ("csv", "text/csv"),
+    "csv.gz": ("csv.gz", "application/gzip"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "feather": ("feather", "application/vnd.apache.arrow.file"),
+    "npz": ("npz", "application/octet-stream"),
+}
+
+# Parquet y Feather necesitan pyarrow; lo reviso sin importarlo
+_PYARROW_DISPONIBLE = importlib.util.find_spec("pyarrow") is not None
+
+
+def formatos_disponibles():
+    """
+    Yo digo qué formatos se pueden exportar con las librerías instaladas
+    """
+    return [f for f in FORMATOS if _PYARROW_DISPONIBLE or f not in ("parquet", "feather")]
+
+
+def nombre_archivo(base, formato):
+    # Armo el nombre del archivo con la extensión correcta
+    return f"{base}.{FORMATOS[formato][0]}"
+
+
+def tipo_mime(formato):
+    return FORMATOS[formato][1]
+
+
+
+# 2. PREPARACIÓN DE LA TABLA (PRECISIÓN DE LOS NÚMEROS)
+
+def _preparar(df, decimales=None, float32=False):
+    """
+    Yo ajusto la precisión de las columnas numéricas antes de exportar:
+    - decimales: redondeo a ese número de decimales (None = sin redondear)
+    - float32: guardo los números en 32 bits (la mitad de espacio en binario)
+    """
+    if decimales is None and not float32:
+        return df
+    salida = df.copy()
+    for col in salida.columns:
+        if pd.api.types.is_float_dtype(salida[col]):
+            valores = salida[col].to_numpy()
+            if decimales is not None:
+                valores = np.round(valores, int(decimales))
+            if float32:
+                valores = valores.astype(np.float32)
+            salida[col] = valores
+    return salida
+
+
+
+# 3. EXPORTACIÓN POR BLOQUES (SIN ARMAR TODO EL TEXTO EN MEMORIA)
+
+def iterar_csv(df, comprimir=False, decimales=None, tamano_bloque=200_000):
+    """
+    Yo voy produciendo el CSV en pedazos de bytes, bloque por bloque de filas.
+    Si comprimir=True, cada pedazo sale ya comprimido en formato gzip.
+    """
+    formato_float = f"%.{int(decimales)}f" if decimales is not None else None
+    compresor = zlib.compressobj(6, zlib.DEFLATED, 31) if comprimir else None  # 31 = cabecera gzip
+
+    for inicio in range(0, max(len(df), 1), int(tamano_bloque)):
+        bloque = df.iloc[inicio:inicio + int(tamano_bloque)]
+        texto = bloque.to_csv(index=False, header=(inicio == 0), float_format=formato_float)
+        datos = texto.encode("utf-8")
+        if compresor is None:
+            yield datos
+        else:
+            comprimido = compresor.compress(datos)
+            if comprimido:
+                yield comprimido
+
+    if compresor is not None:
+        yield compresor.flush()
+
+
+def escribir_resultados(df, destino, formato="csv", decimales=None, float32=False,
+                        tamano_bloque=200_000):
+    """
+    Yo escribo los resultados en `destino` (ruta o archivo binario abierto).
+    Los CSV se escriben por bloques; los formatos binarios van directo al archivo.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato desconocido: '{formato}'. Usa: {', '.join(FORMATOS)}")
+
+    if isinstance(destino, (str, bytes)) or hasattr(destino, "__fspath__"):
+        with open(destino, "wb") as archivo:
+            return escribir_resultados(df, archivo, formato, decimales, float32, tamano_bloque)
+
+    if formato in ("csv", "csv.gz"):
+        for pedazo in iterar_csv(df, comprimir=(formato == "csv.gz"), decimales=decimales,
+                                 tamano_bloque=tamano_bloque):
+            destino.write(pedazo)
+        return destino
+
+    if formato in ("parquet", "feather") and not _PYARROW_DISPONIBLE:
+        raise ImportError(
+            f"Necesito pyarrow para exportar en {formato}. Instálalo con: pip install pyarrow"
+        )
+
+    tabla = _preparar(df, decimales=decimales, float32=float32)
+    if formato == "parquet":
+        tabla.to_parquet(destino, index=False, compression="zstd")
+    elif formato == "feather":
+        tabla.reset_index(drop=True).to_feather(destino, compression="zstd")
+    else:
+        # En NPZ guardo cada columna como un arreglo, con los nombres originales
+        np.savez_compressed(
+            destino,
+            **{f"col{i}": tabla[col].to_numpy() for i, col in enumerate(tabla.columns)},
+            columnas=np.array(list(tabla.columns))
+        )
+    return destino
+
+
+def exportar_resultados(df, formato="csv", decimales=None, float32=False):
+    """
+    Yo devuelvo los resultados exportados como bytes (por ejemplo para una descarga).
+
+    Aquí el archivo completo queda en memoria: el botón de descarga de Streamlit
+    necesita todos los bytes de una vez y no acepta un flujo por pedazos. Para
+    resultados muy grandes conviene escribir_resultados directo a un archivo
+    (como hacen los lotes) o iterar_csv.
+    """
+    buffer = io.BytesIO()
+    escribir_resultados(df, buffer, formato=formato, decimales=decimales, float32=float32)
+    return buffer.getvalue()
+
+
+def leer_npz(origen):
+    """
+    Yo vuelvo a armar la tabla a partir de un archivo NPZ exportado aquí
+    """
+    with np.load(origen, allow_pickle=False) as datos:
+        columnas = [str(c) for c in datos["columnas"]]
+        return pd.DataFrame({col: datos[f"col{i}"] for i, col in enumerate(columnas)})
@@ -1,59 +1,121 @@
-'''
 import streamlit as st
-import matplotlib.pyplot as plt
-
-def graficar_resultados(df):
-    # Aquí creo una figura y un eje para la gráfica donde voy a mostrar los resultados
-    fig, ax = plt.subplots()
-    
-    # En esta línea dibujo la curva que representa cómo cambia la temperatura con el tiempo
-    # Uso los datos de las columnas "Tiempo (h)" y "Temperatura (°C)" del DataFrame que recibo
-    ax.plot(df["Tiempo (h)"], df["Temperatura (°C)"], marker='o', color="tab:blue")
-    
-    # En esta línea le pongo un título a la gráfica para indicar qué información estoy mostrando
-    ax.set_title("Evolución de la Temperatura")
-    
-    # Aquí asigno el nombre al eje X para indicar que representa el tiempo en horas
-    ax.set_xlabel("Tiempo (h)")
-    
-    # En esta línea nombro el eje Y para aclarar que muestra la temperatura en grados Celsius
-    ax.set_ylabel("Temperatura (°C)")
-    
-    # Aquí desactivo la cuadrícula para que la gráfica se vea más limpia
-    ax.grid(False)
-    
-    # Finalmente, en esta línea muestro la gráfica en la interfaz de Streamlit
-    st.pyplot(fig)'''
 
-import streamlit as st
-import plotly.graph_objects as go
+# Cargo la decimación (funciona tanto desde app/ como desde la raíz del proyecto)
+try:
+    from visualizacion.decimacion import decimar
+except Exception:
+    from app.visualizacion.decimacion import decimar
+
+
+# Nombres de columnas que produce ejecutar_simulacion
+COLUMNA_TIEMPO = "Tiempo (h)"
+COLUMNA_TEMPERATURA = "Temperatura (°C)"
+COLUMNA_AMBIENTE = "Tamiente (°C)"
+
+# Columnas opcionales con la banda de incertidumbre (si existen, las dibujo)
+BANDA_POR_DEFECTO = ("Temperatura inferior (°C)", "Temperatura superior (°C)")
+
+
+def _plotly():
+    # Importo Plotly solo cuando hay que dibujar (no al abrir la página)
+    import plotly.graph_objects as go
+    return go
 
-def graficar_resultados(df):
+
+def crear_figura(df, max_puntos=3000, rango=None, banda=BANDA_POR_DEFECTO,
+                 titulo="Evolución de la Temperatura del Cuerpo y del Ambiente"):
+    """
+    Aquí armo la figura interactiva con trazos WebGL (Scattergl), que el navegador
+    dibuja rápido aunque haya muchos puntos.
+
+    Antes de enviar nada reduzco la tabla a como máximo max_puntos filas con LTTB,
+    que conserva la forma de la curva. Si me dan un rango (t_min, t_max) solo
+    decimo esa ventana, así al acercarse se recupera el detalle.
+    """
+    go = _plotly()
     fig = go.Figure()
 
-    # Línea 1
-    fig.add_trace(go.Scatter(
-        x=df["Tiempo (h)"],
-        y=df["Temperatura (°C)"],
-        mode="lines+markers",
-        name="Temperatura real",   # 👈 Notación (nombre en la leyenda)
-        hovertemplate="<b>Tiempo:</b> %{x} h<br><b>Temp real:</b> %{y} °C<extra></extra>"
-    ))
+    # La curva del cuerpo manda la selección de puntos; el resto usa los mismos índices
+    vista = decimar(df, COLUMNA_TIEMPO, COLUMNA_TEMPERATURA, max_puntos=max_puntos, rango=rango)
+    x = vista[COLUMNA_TIEMPO]
 
-    # Línea 2
-    fig.add_trace(go.Scatter(
-        x=df["Tiempo (h)"],
-        y=df["Temperatura estimada (°C)"],
-        mode="lines+markers",
-        name="Temperatura estimada",   # 👈 Notación
-        hovertemplate="<b>Tiempo:</b> %{x} h<br><b>Temp estimada:</b> %{y} °C<extra></extra>"
+    # Banda de incertidumbre (se dibuja primero para que quede por debajo)
+    if banda is not None and all(col in vista.columns for col in banda):
+        col_inf, col_sup = banda
+        fig.add_trace(go.Scattergl(
+            x=x, y=vista[col_sup], mode="lines", line=dict(width=0),
+            name="Banda superior", showlegend=False, hoverinfo="skip"
+        ))
+        fig.add_trace(go.Scattergl(
+            x=x, y=vista[col_inf], mode="lines", line=dict(width=0),
+            fill="tonexty", fillcolor="rgba(31, 119, 180, 0.2)",
+            name="Incertidumbre", hoverinfo="skip"
+        ))
+
+    # Temperatura del cuerpo
+    fig.add_trace(go.Scattergl(
+        x=x,
+        y=vista[COLUMNA_TEMPERATURA],
+        mode="lines",
+        name="Temperatura del cuerpo",
+        line=dict(color="#1f77b4", width=2),
+        hovertemplate="<b>Tiempo:</b> %{x:.3f} h<br><b>Temp cuerpo:</b> %{y:.2f} °C<extra></extra>"
     ))
 
+    # Temperatura ambiente (con su propia decimación para no perder sus picos)
+    if COLUMNA_AMBIENTE in df.columns:
+        vista_amb = decimar(df, COLUMNA_TIEMPO, COLUMNA_AMBIENTE, max_puntos=max_puntos, rango=rango)
+        fig.add_trace(go.Scattergl(
+            x=vista_amb[COLUMNA_TIEMPO],
+            y=vista_amb[COLUMNA_AMBIENTE],
+            mode="lines",
+            name="Temperatura ambiente",
+            line=dict(color="#ff7f0e", dash="dash"),
+            hovertemplate="<b>Tiempo:</b> %{x:.3f} h<br><b>Temp ambiente:</b> %{y:.2f} °C<extra></extra>"
+        ))
+
     fig.update_layout(
-        title="Comparación de Temperaturas",
+        title=titulo,
         xaxis_title="Tiempo (h)",
         yaxis_title="Temperatura (°C)",
-        legend_title="Leyenda"  # 👈 Título del cuadro de notaciones
+        legend_title="Leyenda"
     )
+    return fig
 
-    st.plotly_chart(fig, use_container_width=True)
+
+def graficar_resultados(df, max_puntos=3000, rango=None, banda=BANDA_POR_DEFECTO, key=None):
+    # Finalmente, muestro la gráfica en la interfaz de Streamlit
+    fig = crear_figura(df, max_puntos=max_puntos, rango=rango, banda=banda)
+    st.plotly_chart(fig, use_container_width=True, key=key)
+
+
+def crear_figura_comparacion(resultados_por_escenario, max_puntos=2000, umbral=None):
+    """
+    Aquí superpongo la temperatura del cuerpo de varios escenarios en una sola
+    figura WebGL, cada uno decimado por separado con LTTB.
+    """
+    go = _plotly()
+    fig = go.Figure()
+
+    for nombre, df in resultados_por_escenario.items():
+        vista = decimar(df, COLUMNA_TIEMPO, COLUMNA_TEMPERATURA, max_puntos=max_puntos)
+        fig.add_trace(go.Scattergl(
+            x=vista[COLUMNA_TIEMPO],
+            y=vista[COLUMNA_TEMPERATURA],
+            mode="lines",
+            name=str(nombre),
+            hovertemplate=f"<b>{nombre}</b><br>Tiempo: %{{x:.3f}} h<br>Temp: %{{y:.2f}} °C<extra></extra>"
+        ))
+
+    # Línea horizontal del umbral para leer de un vistazo cuándo se cruza
+    if umbral is not None:
+        fig.add_hline(y=umbral, line_dash="dot", line_color="gray",
+                      annotation_text=f"Umbral {umbral:g} °C")
+
+    fig.update_layout(
+        title="Comparación de escenarios",
+        xaxis_title="Tiempo (h)",
+        yaxis_title="Temperatura (°C)",
+        legend_title="Escenario"
+    )
+    return fig
@@ -1,7 +1,7 @@
-import sys, os
+import sys, os, io, time, hashlib, threading
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
 
 # ------------------------------------------------------------
 # CONFIGURACIÓN DE RUTA BASE PARA RENDER O LOCAL
@@ -14,9 +14,114 @@ if RUTA_BASE not in sys.path:
 # IMPORTS (compatibles con Render y local)
 # ------------------------------------------------------------
 try:
-    from app.simulacion.solucion_rk4 import ejecutar_simulacion
+    from app.simulacion.solucion_rk4 import ejecutar_simulacion, iterar_simulacion, resultado_parcial
+    from app.simulacion.escenarios import ejecutar_escenarios, tabla_resumen
+    from app.visualizacion.graficador import graficar_resultados, crear_figura, crear_figura_comparacion
+    from app.visualizacion.exportacion import (
+        exportar_resultados, formatos_disponibles, nombre_archivo, tipo_mime
+    )
+    from app.metricas import registrar_cache
 except ModuleNotFoundError:
-    from simulacion.solucion_rk4 import ejecutar_simulacion
+    from simulacion.solucion_rk4 import ejecutar_simulacion, iterar_simulacion, resultado_parcial
+    from simulacion.escenarios import ejecutar_escenarios, tabla_resumen
+    from visualizacion.graficador import graficar_resultados, crear_figura, crear_figura_comparacion
+    from visualizacion.exportacion import (
+        exportar_resultados, formatos_disponibles, nombre_archivo, tipo_mime
+    )
+    from metricas import registrar_cache
+
+# ------------------------------------------------------------
+# CACHÉS DE DATOS Y RESULTADOS
+# ------------------------------------------------------------
+# Los resultados se guardan por valor de las entradas: un rerun sin cambios
+# (por ejemplo al pulsar "Descargar") no vuelve a cargar, ajustar ni simular.
+# Los límites de entradas y el ttl evitan que la caché crezca sin control
+# cuando hay muchas sesiones abiertas a la vez.
+
+@st.cache_data(show_spinner=False)
+def tabla_inicial():
+    return pd.DataFrame({
+        "tiempo": [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23],
+        "Tam": [12.2, 11.7, 11.7, 11.1, 10.6, 10.6, 10.0, 11.1, 13.3, 15.6, 17.8, 17.8, 17.8, 17.8, 17.2, 16.7, 16.1, 15.6, 14.4, 14.4, 13.9, 13.3, 12.2, 12.2]
+    })
+
+
+# Streamlit no dice si hubo acierto: la función guardada marca el fallo cuando
+# de verdad se ejecuta (en el mismo hilo) y así cuento aciertos y fallos
+_cache_local = threading.local()
+
+
+@st.cache_data(show_spinner=False, max_entries=16, ttl=3600)
+def _leer_csv_guardado(contenido: bytes):
+    _cache_local.fallo = True
+    return pd.read_csv(io.BytesIO(contenido))
+
+
+def leer_csv(contenido: bytes):
+    _cache_local.fallo = False
+    datos = _leer_csv_guardado(contenido)
+    registrar_cache("carga_datos", not _cache_local.fallo)
+    return datos
+
+
+def argumentos_simulacion(T0, k, t_total, modo_datos, lista_manual, contenido_csv,
+                          usar_sinusoidal, armonicos, pasos):
+    # El CSV llega como bytes para que la clave de la caché dependa de su contenido
+    archivo = io.BytesIO(contenido_csv) if contenido_csv is not None else None
+    return dict(
+        T0=T0,
+        k=k,
+        t_total=t_total,
+        modo_datos=modo_datos,
+        archivo=archivo,
+        lista_manual=list(lista_manual) if lista_manual is not None else None,
+        usar_sinusoidal=usar_sinusoidal,
+        armonicos=armonicos,
+        pasos=pasos
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=32, ttl=3600)
+def simular(**entradas):
+    return ejecutar_simulacion(**argumentos_simulacion(**entradas))
+
+
+def cancelar_simulacion():
+    st.session_state["cancelar_simulacion"] = True
+
+
+# Hasta este número de pasos la simulación es casi instantánea y se cachea;
+# por encima se ejecuta por bloques con progreso, gráfica en vivo y cancelación
+PASOS_SIN_PROGRESO = 20_000
+
+
+def preparar_descarga(resultados, formato, decimales):
+    # Devuelvo una función: Streamlit solo la ejecuta cuando alguien pulsa "Descargar",
+    # así los reruns normales no vuelven a exportar nada
+    return lambda: exportar_resultados(resultados, formato=formato, decimales=decimales)
+
+@st.cache_resource
+def pool_escenarios():
+    # Un solo pool de procesos por servidor, compartido por todas las sesiones:
+    # así el número de simulaciones simultáneas queda acotado
+    return ProcessPoolExecutor(max_workers=max(1, min(4, os.cpu_count() or 1)))
+
+
+@st.cache_resource
+def servidor_metricas():
+    # Streamlit corre en su propio proceso: las métricas se exponen desde aquí,
+    # una sola vez por servidor, si app/main.py dejó configurado PUERTO_METRICAS
+    puerto = os.getenv("PUERTO_METRICAS")
+    if not puerto:
+        return None
+    try:
+        from app.metricas import iniciar_servidor_metricas
+    except ModuleNotFoundError:
+        from metricas import iniciar_servidor_metricas
+    return iniciar_servidor_metricas(int(puerto), host=os.getenv("HOST_METRICAS", "127.0.0.1"))
+
+
+servidor_metricas()
 
 # ------------------------------------------------------------
 # CONFIGURACIÓN DE PÁGINA
@@ -56,12 +161,8 @@ if modo == "Manual":
     st.markdown("#### Ingreso de temperaturas ambientales (horas vs °C)")
     st.info("Agrega los valores de temperatura ambiente a lo largo del día.")
 
-    data_inicial = pd.DataFrame({
-        "tiempo": [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23],
-        "Tam": [12.2, 11.7, 11.7, 11.1, 10.6, 10.6, 10.0, 11.1, 13.3, 15.6, 17.8, 17.8, 17.8, 17.8, 17.2, 16.7, 16.1, 15.6, 14.4, 14.4, 13.9, 13.3, 12.2, 12.2]
-    })
-    tabla = st.data_editor(data_inicial, num_rows="dynamic", use_container_width=True)
-    lista_manual = list(zip(tabla["tiempo"], tabla["Tam"]))
+    tabla = st.data_editor(tabla_inicial(), num_rows="dynamic", use_container_width=True)
+    lista_manual = tuple(zip(tabla["tiempo"].tolist(), tabla["Tam"].tolist()))
 
 # ------------------------------------------------------------
 # 2 MODO CSV
@@ -72,7 +173,7 @@ elif modo == "Archivo CSV":
 
     archivo = st.file_uploader("Selecciona tu archivo CSV", type=["csv"])
     if archivo is not None:
-        datos_csv = pd.read_csv(archivo)
+        datos_csv = leer_csv(archivo.getvalue())
         st.success("Archivo cargado correctamente ")
         st.dataframe(datos_csv.head())
 
@@ -96,35 +197,135 @@ else:
 
 st.markdown("---")
 usar_sinusoidal = st.checkbox("Usar modelo sinusoidal ajustado a los datos", value=False)
+armonicos = 1
+if usar_sinusoidal:
+    armonicos = st.slider(
+        "Número de armónicos del modelo (1 = sinusoide simple)",
+        min_value=1, max_value=6, value=1,
+        help="Con más armónicos el modelo sigue mejor la meseta del mediodía."
+    )
+pasos = int(st.number_input(
+    "Número de pasos RK4:", min_value=10, max_value=5_000_000, value=250, step=50,
+    help="Con muchos pasos la simulación se ejecuta por bloques y se puede cancelar."
+))
 st.markdown("---")
 
 
 # BOTÓN PARA EJECUTAR LA SIMULACIÓN
 
-if st.button(" Ejecutar simulación"):
-    st.info("Ejecutando simulación...")
+modo_datos = (
+    "manual" if modo == "Manual" else
+    "csv" if modo == "Archivo CSV" else
+    "automatica"
+)
+entradas = dict(
+    T0=T0,
+    k=k,
+    t_total=t_total,
+    modo_datos=modo_datos,
+    lista_manual=lista_manual,
+    contenido_csv=archivo.getvalue() if archivo is not None else None,
+    usar_sinusoidal=usar_sinusoidal,
+    armonicos=armonicos,
+    pasos=pasos
+)
+# Resumo las entradas en una clave corta para saber si el resultado guardado sigue vigente
+clave_entradas = hashlib.sha256(repr(sorted(entradas.items())).encode("utf-8")).hexdigest()
 
+if st.button(" Ejecutar simulación"):
     try:
-        resultados = ejecutar_simulacion(
-            T0=T0,
-            k=k,
-            t_total=t_total,
-            modo_datos=(
-                "manual" if modo == "Manual" else
-                "csv" if modo == "Archivo CSV" else
-                "automatica"
-            ),
-            archivo=archivo,
-            lista_manual=lista_manual,
-            usar_sinusoidal=usar_sinusoidal,
-            pasos=250
-        )
+        if pasos <= PASOS_SIN_PROGRESO:
+            with st.spinner("Ejecutando simulación..."):
+                resultados = simular(**entradas)
+            # Guardo solo el último resultado de esta sesión (no crece con los reruns)
+            st.session_state["simulacion"] = {"clave": clave_entradas, "resultados": resultados}
+
+        else:
+            # Simulación larga: avanzo por bloques y guardo el avance en la sesión en
+            # cada bloque. Si el usuario pulsa "Cancelar", Streamlit detiene este
+            # script en el siguiente bloque y lo ya calculado queda disponible.
+            st.session_state["cancelar_simulacion"] = False
+            st.button(" Cancelar simulación", on_click=cancelar_simulacion)
+            barra = st.progress(0.0, text="Ejecutando simulación...")
+            grafica_en_vivo = st.empty()
+            ultima_grafica = 0.0
+
+            for progreso in iterar_simulacion(
+                **argumentos_simulacion(**entradas),
+                pasos_por_bloque=max(1000, pasos // 100)
+            ):
+                st.session_state["simulacion"] = {
+                    "clave": clave_entradas, "resultados": None, "progreso": progreso
+                }
+                barra.progress(
+                    progreso["paso"] / progreso["pasos"],
+                    text=f"Paso {progreso['paso']:,} de {progreso['pasos']:,}"
+                )
+                # Redibujo la gráfica como mucho dos veces por segundo
+                if time.monotonic() - ultima_grafica > 0.5 or progreso["terminado"]:
+                    grafica_en_vivo.plotly_chart(
+                        crear_figura(resultado_parcial(progreso), max_puntos=1500),
+                        use_container_width=True
+                    )
+                    ultima_grafica = time.monotonic()
+                if st.session_state.get("cancelar_simulacion"):
+                    break
 
-        st.success(" Simulación completada correctamente")
+            if progreso["terminado"]:
+                st.session_state["simulacion"] = {
+                    "clave": clave_entradas, "resultados": resultado_parcial(progreso)
+                }
+            grafica_en_vivo.empty()
+
+        if st.session_state["simulacion"]["resultados"] is not None:
+            st.success(" Simulación completada correctamente")
+
+    except Exception as e:
+        st.session_state.pop("simulacion", None)
+        st.error(f" Error durante la simulación: {e}")
+
+guardada = st.session_state.get("simulacion")
+if guardada is not None and guardada["resultados"] is None:
+    # La simulación se canceló (o se interrumpió): convierto el avance en resultados parciales
+    progreso = guardada["progreso"]
+    guardada["resultados"] = resultado_parcial(progreso)
+    guardada["parcial"] = (progreso["paso"], progreso["pasos"])
+
+if guardada is not None and guardada["clave"] != clave_entradas:
+    st.info("Cambiaste los parámetros: vuelve a ejecutar la simulación para actualizar los resultados.")
+
+elif guardada is not None:
+    resultados = guardada["resultados"]
+    if "parcial" in guardada:
+        paso, total = guardada["parcial"]
+        st.warning(f" Simulación cancelada en el paso {paso:,} de {total:,}: se muestran los resultados parciales.")
+
+    
+    # GRÁFICA
+    
+    tipo_grafica = st.radio(
+        "Tipo de gráfica:",
+        ["Interactiva (WebGL)", "Estática (matplotlib)"],
+        horizontal=True
+    )
+
+    if tipo_grafica == "Interactiva (WebGL)":
+        # Al navegador solo le envío unos miles de puntos elegidos con LTTB;
+        # con la ventana de tiempo se vuelve a decimar solo el tramo elegido
+        t_inicio = float(resultados["Tiempo (h)"].iloc[0])
+        t_fin = float(resultados["Tiempo (h)"].iloc[-1])
+        rango = None
+        if t_fin > t_inicio:
+            rango = st.slider(
+                "Ventana de tiempo (h)",
+                min_value=t_inicio, max_value=t_fin, value=(t_inicio, t_fin)
+            )
+        graficar_resultados(resultados, max_puntos=3000, rango=rango)
+
+    else:
+        # Matplotlib solo se importa si alguien elige la gráfica estática
+        import matplotlib.pyplot as plt
 
-        
-        # GRÁFICA
-        
         fig, ax = plt.subplots(figsize=(8, 4))
         ax.plot(resultados["Tiempo (h)"], resultados["Temperatura (°C)"],
                 label="Temperatura del cuerpo", color="tab:blue", linewidth=2)
@@ -136,20 +337,117 @@ if st.button(" Ejecutar simulación"):
         ax.legend()
         ax.grid(True)
         st.pyplot(fig)
+        # Cierro la figura: pyplot guarda referencias a todas las figuras abiertas
+        plt.close(fig)
 
-        
-        # TABLA Y DESCARGA
-        
-        st.subheader(" Resultados de la simulación")
-        st.dataframe(resultados, use_container_width=True)
-
-        csv = resultados.to_csv(index=False).encode("utf-8")
-        st.download_button(
-            label=" Descargar resultados (CSV)",
-            data=csv,
-            file_name="resultados_simulacion.csv",
-            mime="text/csv"
+    
+    # TABLA Y DESCARGA
+    
+    st.subheader(" Resultados de la simulación")
+    st.dataframe(resultados, use_container_width=True)
+
+    col_formato, col_decimales = st.columns(2)
+    with col_formato:
+        formato = st.selectbox(
+            "Formato de descarga:", formatos_disponibles(),
+            help="csv.gz, Parquet, Feather y NPZ ocupan varias veces menos que el CSV."
+        )
+    with col_decimales:
+        # None = sin redondear; con la casilla marcada se puede pedir incluso 0 decimales
+        redondear = st.checkbox("Redondear", value=False)
+        decimales = st.number_input(
+            "Decimales:", min_value=0, max_value=15, value=3, step=1, disabled=not redondear
         )
 
-    except Exception as e:
-        st.error(f" Error durante la simulación: {e}")
+    st.download_button(
+        label=f" Descargar resultados ({formato})",
+        data=preparar_descarga(resultados, formato, int(decimales) if redondear else None),
+        file_name=nombre_archivo("resultados_simulacion", formato),
+        mime=tipo_mime(formato),
+        on_click="ignore"
+    )
+
+
+# ------------------------------------------------------------
+# COMPARACIÓN DE ESCENARIOS
+# ------------------------------------------------------------
+st.markdown("---")
+st.subheader(" Comparación de escenarios")
+st.info("Define varios escenarios; se ejecutan a la vez y se muestran superpuestos.")
+
+escenarios_iniciales = pd.DataFrame({
+    "nombre": ["Base", "Enfriamiento rápido", "Ambiente sinusoidal"],
+    "T0": [90.0, 90.0, 90.0],
+    "k": [-0.12, -0.25, -0.12],
+    "modo": ["automatica", "automatica", "automatica"],
+    "sinusoidal": [False, False, True],
+})
+tabla_escenarios = st.data_editor(
+    escenarios_iniciales,
+    num_rows="dynamic",
+    use_container_width=True,
+    column_config={
+        "modo": st.column_config.SelectboxColumn("modo", options=["automatica", "manual"]),
+        "sinusoidal": st.column_config.CheckboxColumn("sinusoidal"),
+    },
+    key="tabla_escenarios"
+)
+
+col_a, col_b = st.columns(2)
+with col_a:
+    t_total_comp = st.number_input("Duración de cada escenario (horas):", value=24.0, key="t_total_comp")
+with col_b:
+    umbral = st.number_input("Umbral de temperatura (°C):", value=40.0, key="umbral_comp")
+
+if st.button(" Comparar escenarios"):
+    # Para el modo manual uso la tabla del modo manual (o la curva por defecto)
+    puntos_manual = lista_manual if lista_manual is not None else tuple(
+        zip(tabla_inicial()["tiempo"].tolist(), tabla_inicial()["Tam"].tolist())
+    )
+    escenarios = []
+    for _, fila in tabla_escenarios.dropna(subset=["T0", "k"]).iterrows():
+        modo_fila = fila["modo"] if fila["modo"] in ("automatica", "manual") else "automatica"
+        escenarios.append({
+            "nombre": str(fila["nombre"]) if pd.notna(fila["nombre"]) else f"Escenario {len(escenarios) + 1}",
+            "T0": float(fila["T0"]),
+            "k": float(fila["k"]),
+            "t_total": float(t_total_comp),
+            "modo_datos": modo_fila,
+            "lista_manual": list(puntos_manual) if modo_fila == "manual" else None,
+            "usar_sinusoidal": bool(fila["sinusoidal"]),
+            "pasos": 250,
+        })
+
+    # El progreso y la gráfica identifican cada escenario por su nombre
+    nombres = [e["nombre"] for e in escenarios]
+    repetidos = sorted({n for n in nombres if nombres.count(n) > 1})
+
+    if not escenarios:
+        st.warning("Agrega al menos un escenario con T0 y k.")
+    elif repetidos:
+        st.error(f"Cada escenario necesita un nombre distinto. Repetidos: {', '.join(repetidos)}")
+    else:
+        barra = st.progress(0.0, text="Ejecutando escenarios...")
+        estados = {e["nombre"]: "pendiente" for e in escenarios}
+        tabla_estados = st.empty()
+        tabla_estados.dataframe(pd.DataFrame({"Escenario": list(estados), "Estado": list(estados.values())}))
+
+        def al_avanzar(nombre, estado, info):
+            estados[nombre] = estado
+            terminados = sum(1 for v in estados.values() if v in ("listo", "error"))
+            barra.progress(terminados / len(estados), text=f"{terminados}/{len(estados)} escenarios terminados")
+            tabla_estados.dataframe(pd.DataFrame({"Escenario": list(estados), "Estado": list(estados.values())}))
+
+        salida = ejecutar_escenarios(escenarios, al_avanzar=al_avanzar, executor=pool_escenarios())
+        st.session_state["comparacion"] = {"salida": salida, "umbral": umbral}
+
+comparacion = st.session_state.get("comparacion")
+if comparacion is not None:
+    salida = comparacion["salida"]
+    correctos = {item["nombre"]: item["resultados"] for item in salida if item["resultados"] is not None}
+    if correctos:
+        st.plotly_chart(
+            crear_figura_comparacion(correctos, umbral=comparacion["umbral"]),
+            use_container_width=True
+        )
+    st.dataframe(tabla_resumen(salida, comparacion["umbral"]), use_container_width=True)
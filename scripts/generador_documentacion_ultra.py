@@ -14,11 +14,14 @@ import ast
 import argparse
 import logging
 import json
+import time
 import shutil
+import bisect
+import hashlib
 import subprocess
-from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
 # ---------------------------
 # CONFIG & UTIL
@@ -48,29 +51,79 @@ def safe_read_text(path: Path):
 # MERMAID TO IMAGE CONVERTER
 # ---------------------------
 
-def check_mermaid_cli():
-    """Verifica si mermaid-cli (mmdc) está instalado"""
-    # Intentar con diferentes rutas posibles
-    possible_paths = [
-        "mmdc",  # PATH global
-        r"C:\Users\Terramar\AppData\Roaming\npm\mmdc.cmd",  # Windows npm global
-        shutil.which("mmdc"),  # Búsqueda automática
-    ]
-    
-    for mmdc_path in possible_paths:
-        if mmdc_path is None:
-            continue
+# Rutas donde buscar mmdc además del PATH
+MMDC_EXTRA_PATHS = [
+    r"C:\Users\Terramar\AppData\Roaming\npm\mmdc.cmd",  # Windows npm global
+]
+MERMAID_JS_URL = "https://cdn.jsdelivr.net/npm/mermaid/dist/mermaid.min.js"
+# Cambiar si cambia la forma de renderizar: invalida las imágenes guardadas
+RENDER_VERSION = 1
+RENDER_CACHE_DIR = ".render_cache"
+RENDER_CACHE_MAX = 64
+
+# Resultados de detección de herramientas en este proceso
+_TOOL_PROBES = {}
+
+def _probe_tool(name, signature, probe, cache=None):
+    """
+    Ejecuta `probe()` (que lanza un subproceso) solo si no hay un resultado
+    guardado para la misma herramienta y firma (ruta, mtime, tamaño...). El
+    resultado queda en memoria; en disco solo guardo los positivos, porque
+    instalar la herramienta después (npm install) no cambia la firma.
+    """
+    key = (name, tuple(signature))
+    if key in _TOOL_PROBES:
+        return _TOOL_PROBES[key]
+    saved = cache.tools.get(name) if cache is not None else None
+    if saved and saved.get("ok") and saved.get("signature") == list(signature):
+        result = (saved["ok"], saved["info"])
+    else:
         try:
-            result = subprocess.run([mmdc_path, "--version"], capture_output=True, text=True, shell=True)
-            if result.returncode == 0:
-                logging.info(f"Mermaid CLI encontrado: {result.stdout.strip()}")
-                return mmdc_path
-        except (FileNotFoundError, Exception):
+            result = probe()
+        except Exception as e:
+            result = (False, str(e))
+        if cache is not None and result[0]:
+            cache.tools[name] = {"signature": list(signature), "ok": True, "info": result[1]}
+            cache._dirty = True
+        elif cache is not None and cache.tools.pop(name, None) is not None:
+            cache._dirty = True
+    _TOOL_PROBES[key] = result
+    return result
+
+def _file_signature(path):
+    st = os.stat(path)
+    return [str(path), st.st_mtime_ns, st.st_size]
+
+def check_mermaid_cli(cache=None):
+    """Verifica si mermaid-cli (mmdc) está instalado. Devuelve su ruta o None."""
+    candidates = [shutil.which("mmdc")] + [p for p in MMDC_EXTRA_PATHS if os.path.exists(p)]
+    for mmdc_path in candidates:
+        if mmdc_path is None:
             continue
+        def probe():
+            result = subprocess.run([mmdc_path, "--version"], capture_output=True, text=True, timeout=60)
+            return result.returncode == 0, result.stdout.strip()
+        ok, info = _probe_tool("mmdc", _file_signature(mmdc_path), probe, cache)
+        if ok:
+            logging.info(f"Mermaid CLI encontrado: {info}")
+            return mmdc_path
     
     logging.warning("Mermaid CLI (mmdc) no está instalado.")
     return None
 
+def check_puppeteer(cache=None):
+    """Verifica si node puede cargar puppeteer. Devuelve la ruta de node o None."""
+    node = shutil.which("node")
+    if node is None:
+        return None
+    def probe():
+        result = subprocess.run([node, "-e", "require.resolve('puppeteer')"],
+                                capture_output=True, text=True, timeout=60)
+        return result.returncode == 0, result.stderr.strip()[:200]
+    signature = _file_signature(node) + [os.getcwd(), os.environ.get("NODE_PATH", "")]
+    ok, _ = _probe_tool("puppeteer", signature, probe, cache)
+    return node if ok else None
+
 def check_playwright():
     """Verifica si Playwright está instalado (necesario para mmdc)"""
     try:
@@ -79,7 +132,7 @@ def check_playwright():
     except ImportError:
         return False
 
-def render_mermaid_to_image(mermaid_file: Path, output_format="png", mmdc_path="mmdc"):
+def render_mermaid_to_image(mermaid_file: Path, output_format="png", mmdc_path="mmdc", output_file=None):
     """
     Renderiza un archivo .mmd a PNG/SVG usando mermaid-cli
     
@@ -87,11 +140,12 @@ def render_mermaid_to_image(mermaid_file: Path, output_format="png", mmdc_path="
         mermaid_file: Path al archivo .mmd
         output_format: 'png' o 'svg'
         mmdc_path: Ruta al ejecutable mmdc
+        output_file: Path de salida (por defecto, junto al .mmd)
     
     Returns:
         Path al archivo generado o None si falla
     """
-    output_file = mermaid_file.with_suffix(f".{output_format}")
+    output_file = output_file or mermaid_file.with_suffix(f".{output_format}")
     
     try:
         cmd = [
@@ -102,7 +156,7 @@ def render_mermaid_to_image(mermaid_file: Path, output_format="png", mmdc_path="
             "-b", "white",    # background
         ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30, shell=True)
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
         
         if result.returncode == 0 and output_file.exists():
             logging.info(f"✓ Imagen generada: {output_file}")
@@ -118,196 +172,766 @@ def render_mermaid_to_image(mermaid_file: Path, output_format="png", mmdc_path="
         logging.error(f"Excepción al renderizar {mermaid_file}: {e}")
         return None
 
-def render_mermaid_with_puppeteer(mermaid_content: str, output_file: Path):
-    """
-    Alternativa: renderizar con un script Node.js/Puppeteer personalizado
-    (requiere tener node.js instalado)
-    """
-    script = """
+# Un solo navegador y una sola página para todos los diagramas del lote
+PUPPETEER_BATCH_SCRIPT = """
 const puppeteer = require('puppeteer');
 const fs = require('fs');
 
 (async () => {
+  const items = JSON.parse(fs.readFileSync(process.argv[2], 'utf8'));
   const browser = await puppeteer.launch();
   const page = await browser.newPage();
-  
-  const html = `
-    <!DOCTYPE html>
-    <html>
-    <head>
-      <script src="https://cdn.jsdelivr.net/npm/mermaid/dist/mermaid.min.js"></script>
-      <script>mermaid.initialize({startOnLoad:true});</script>
-    </head>
-    <body>
-      <div class="mermaid">
-${process.argv[2]}
-      </div>
-    </body>
-    </html>
-  `;
-  
-  await page.setContent(html);
-  await page.waitForSelector('.mermaid svg');
-  
-  const element = await page.$('.mermaid');
-  await element.screenshot({path: process.argv[3]});
-  
+  await page.setContent(`<!DOCTYPE html><html><head>
+    <style>body { background: white; margin: 0; }</style>
+    <script src="%s"></script></head><body><div id="out"></div></body></html>`);
+  await page.waitForFunction('window.mermaid !== undefined');
+  await page.evaluate(() => mermaid.initialize({startOnLoad: false, theme: 'default'}));
+
+  let failed = 0;
+  for (let i = 0; i < items.length; i++) {
+    const item = items[i];
+    try {
+      const svg = await page.evaluate(async (code, id) => {
+        const result = await mermaid.render(id, code);
+        document.getElementById('out').innerHTML = result.svg;
+        return result.svg;
+      }, item.code, 'diagrama' + i);
+      if (item.format === 'svg') {
+        fs.writeFileSync(item.output, svg);
+      } else {
+        const element = await page.$('#out svg');
+        await element.screenshot({path: item.output});
+      }
+    } catch (e) {
+      failed++;
+      console.error(item.output + ': ' + e.message);
+    }
+  }
+
   await browser.close();
+  process.exit(failed ? 1 : 0);
 })();
-"""
+""" % MERMAID_JS_URL
+
+def render_mermaid_batch(items, work_dir: Path, node="node"):
+    """
+    Renderiza varios diagramas con UN solo proceso de Node y UN solo navegador
+    (Puppeteer). `items` es una lista de (código mermaid, Path de salida, formato).
+    
+    Returns:
+        Lista de los Path generados
+    """
+    if not items:
+        return []
+    script_file = work_dir / "render_mermaid_batch.js"
+    manifest = work_dir / "render_manifest.json"
     try:
-        script_file = output_file.parent / "render_mermaid.js"
-        script_file.write_text(script)
-        
-        subprocess.run(
-            ["node", str(script_file), mermaid_content, str(output_file)],
-            check=True,
-            timeout=30
-        )
-        
-        if output_file.exists():
-            logging.info(f"✓ Imagen generada con Puppeteer: {output_file}")
-            script_file.unlink()  # limpiar
-            return output_file
+        script_file.write_text(PUPPETEER_BATCH_SCRIPT, encoding="utf8")
+        manifest.write_text(json.dumps([
+            {"code": code, "output": str(output), "format": fmt} for code, output, fmt in items
+        ]), encoding="utf8")
+        result = subprocess.run([node, str(script_file), str(manifest)], capture_output=True,
+                                text=True, timeout=60 + 15 * len(items))
+        if result.returncode != 0:
+            logging.error(f"Error con Puppeteer: {result.stderr.strip()}")
     except Exception as e:
         logging.error(f"Error con Puppeteer: {e}")
+    finally:
+        for f in (script_file, manifest):
+            if f.exists():
+                f.unlink()
     
-    return None
+    generated = [output for _, output, _ in items if output.exists()]
+    logging.info(f"✓ {len(generated)}/{len(items)} imágenes generadas con Puppeteer (un navegador)")
+    return generated
+
+def render_mermaid_with_puppeteer(mermaid_content: str, output_file: Path):
+    """
+    Alternativa: renderizar con un script Node.js/Puppeteer personalizado
+    (requiere tener node.js instalado)
+    """
+    fmt = output_file.suffix.lstrip(".") or "png"
+    generated = render_mermaid_batch([(mermaid_content, output_file, fmt)], output_file.parent)
+    return output_file if generated else None
+
+def render_diagrams(diagrams, mermaid_dir: Path, image_format="png", cache=None, use_store=True):
+    """
+    Genera mermaid_dir/<nombre>.<formato> para cada diagrama de `diagrams`
+    ({nombre: código mermaid}).
+
+    Las imágenes se guardan por contenido (hash del código, formato y versión
+    del renderizador) en mermaid_dir/.render_cache: un diagrama que ya se
+    renderizó alguna vez no vuelve a abrir el navegador. Los que faltan se
+    renderizan juntos en una sola sesión de Puppeteer; si no está, con mmdc.
+    Con use_store=False (--no-cache) se vuelven a renderizar todos.
+    
+    Returns:
+        (dict nombre -> Path de la imagen o None, cuántos se renderizaron)
+    """
+    store = mermaid_dir / RENDER_CACHE_DIR
+    store.mkdir(exist_ok=True)
+    stored = {}
+    missing = []
+    for name, code in diagrams.items():
+        key = content_hash(f"{RENDER_VERSION}\n{image_format}\n{code}")
+        stored[name] = store / f"{key}.{image_format}"
+        if use_store and stored[name].exists():
+            os.utime(stored[name])  # marca de uso para la limpieza
+        else:
+            # Sin la caché no dejo la imagen vieja: si el render falla, no hay imagen
+            stored[name].unlink(missing_ok=True)
+            missing.append(name)
+    
+    if missing:
+        # Solo busco herramientas si de verdad hay algo que renderizar
+        node = check_puppeteer(cache)
+        if node is not None:
+            render_mermaid_batch([(diagrams[n], stored[n], image_format) for n in missing], store, node)
+        else:
+            mmdc_path = check_mermaid_cli(cache)
+            if mmdc_path is not None:
+                for name in missing:
+                    render_mermaid_to_image(mermaid_dir / f"{name}.mmd", image_format, mmdc_path,
+                                            output_file=stored[name])
+    
+    images = {}
+    for name, image in stored.items():
+        target = mermaid_dir / f"{name}.{image_format}"
+        if image.exists():
+            data = image.read_bytes()
+            if not target.exists() or target.read_bytes() != data:
+                target.write_bytes(data)
+            images[name] = target
+        else:
+            images[name] = None
+    
+    _prune_render_cache(store, keep=set(stored.values()))
+    return images, len(missing)
+
+def _prune_render_cache(store: Path, keep, limit=RENDER_CACHE_MAX):
+    # Borro las imágenes guardadas más viejas (por último uso) por encima del límite
+    files = sorted(store.glob("*.*"), key=lambda f: f.stat().st_mtime, reverse=True)
+    for f in files[limit:]:
+        if f not in keep:
+            f.unlink()
 
 # ---------------------------
 # AST ANALYZER
 # ---------------------------
 
-class ModuleInfo:
-    def __init__(self, path: Path):
-        self.path = path
-        self.module_name = str(path)
-        self.source = safe_read_text(path)
-        self.tree = None
+# Nombres que delatan un framework aunque se use sin importarlo explícitamente
+ENTRY_NAMES = {"st": "streamlit", "Flask": "flask", "FastAPI": "fastapi"}
+ENTRY_MODULES = ("streamlit", "flask", "fastapi")
+
+class FactsVisitor(ast.NodeVisitor):
+    """
+    Extrae en UNA sola pasada por el árbol todo lo que usa el generador:
+    funciones, clases, imports, llamadas y entry points. Los entry points
+    salen de los nodos (imports, nombres, `if __name__ == "__main__"`), no
+    de buscar texto en el código fuente.
+    """
+
+    def __init__(self):
         self.functions = {}
         self.classes = {}
         self.imports = set()
         self.from_imports = set()
         self.calls = []
-        self.entry_points = []
-        self.parse()
+        self.entry_kinds = set()
+        self.spans = []          # (nombre calificado, línea inicial, línea final) de TODAS las funciones
+        self.class_names = []    # nombres calificados de las clases
+        self.bindings = {}       # nombre local -> lo importado ("np" -> "numpy")
+        self._scope = []
+        self._order = {}
 
-    def parse(self):
-        if not self.source:
-            return
+    def _visit_def(self, node, table, value):
+        table[node.name] = value
+        self._order[(id(table), node.name)] = (len(self._scope), len(self._order))
+        self._scope.append(node.name)
+        self.generic_visit(node)
+        self._scope.pop()
+
+    def visit_FunctionDef(self, node):
+        end = node.end_lineno or node.lineno
+        self.spans.append((".".join(self._scope + [node.name]), node.lineno, end))
+        self._visit_def(node, self.functions, (node.lineno, end))
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_ClassDef(self, node):
+        self.class_names.append(".".join(self._scope + [node.name]))
+        self._visit_def(node, self.classes, node.lineno)
+
+    def ordered(self, table):
+        """
+        Definiciones de menos a más anidadas (como las daba ast.walk): así las
+        "funciones principales" de cada módulo siguen siendo las de primer nivel.
+        """
+        return dict(sorted(table.items(), key=lambda item: self._order[(id(table), item[0])]))
+
+    def visit_Import(self, node):
+        for n in node.names:
+            self.imports.add(n.name)
+            self._check_entry_module(n.name)
+            if n.asname:
+                self.bindings[n.asname] = n.name
+            else:
+                head = n.name.split(".", 1)[0]
+                self.bindings[head] = head
+
+    def visit_ImportFrom(self, node):
+        module = node.module or ""
+        self.from_imports.add(module)
+        self._check_entry_module(module)
+        # Los imports relativos conservan sus puntos: se resuelven con la ruta del módulo
+        prefix = "." * (node.level or 0) + module
+        for n in node.names:
+            if n.name != "*":
+                self.bindings[n.asname or n.name] = f"{prefix}.{n.name}" if module else prefix + n.name
+
+    def _check_entry_module(self, module):
+        root = module.split(".", 1)[0]
+        if root in ENTRY_MODULES:
+            self.entry_kinds.add(root)
+
+    def visit_Call(self, node):
+        name = _call_name(node.func)
+        if name:
+            self.calls.append((name, node.lineno))
+        self.generic_visit(node)
+
+    def visit_Name(self, node):
+        kind = ENTRY_NAMES.get(node.id)
+        if kind:
+            self.entry_kinds.add(kind)
+
+    def visit_If(self, node):
+        test = node.test
+        if (isinstance(test, ast.Compare) and isinstance(test.left, ast.Name)
+                and test.left.id == "__name__" and len(test.comparators) == 1
+                and isinstance(test.comparators[0], ast.Constant)
+                and test.comparators[0].value == "__main__"):
+            self.entry_kinds.add("if_main")
+        self.generic_visit(node)
+
+    def entry_points(self):
+        # Mismo orden que antes: streamlit, if_main, flask, fastapi
+        order = ("streamlit", "if_main", "flask", "fastapi")
+        return [(kind, None) for kind in order if kind in self.entry_kinds]
+
+def extract_facts(source, filename="<desconocido>"):
+    """
+    Hechos de un módulo como dict simple (serializable a JSON y barato de
+    pasar entre procesos). Si el código no se puede parsear, devuelve hechos vacíos.
+    """
+    visitor = FactsVisitor()
+    if source:
         try:
-            self.tree = ast.parse(self.source, filename=str(self.path))
+            visitor.visit(ast.parse(source, filename=filename))
         except Exception as e:
-            logging.warning(f"AST parse error en {self.path}: {e}")
-            return
+            logging.warning(f"AST parse error en {filename}: {e}")
+            visitor = FactsVisitor()
+    return {
+        "functions": {k: list(v) for k, v in visitor.ordered(visitor.functions).items()},
+        "classes": visitor.ordered(visitor.classes),
+        "imports": sorted(visitor.imports),
+        "from_imports": sorted(visitor.from_imports),
+        "calls": [list(c) for c in visitor.calls],
+        "entry_points": [list(e) for e in visitor.entry_points()],
+        "spans": [list(sp) for sp in visitor.spans],
+        "class_names": visitor.class_names,
+        "bindings": visitor.bindings,
+    }
+
+class ModuleInfo:
+    """
+    Hechos extraídos de un módulo. Solo guarda datos simples (nombres, líneas),
+    no el árbol AST, para poder guardarlos en la caché y reconstruirlos sin
+    volver a leer ni parsear el archivo.
+    """
+
+    def __init__(self, path: Path, source=None, parse=True):
+        self.path = path
+        self.module_name = str(path)
+        self.functions = {}     # nombre -> (línea inicial, línea final)
+        self.classes = {}       # nombre -> línea
+        self.imports = set()
+        self.from_imports = set()
+        self.calls = []         # (nombre llamado, línea)
+        self.entry_points = []
+        self.spans = []         # (nombre calificado, inicio, fin) de cada función, en orden de inicio
+        self.class_names = set()
+        self.bindings = {}      # nombre local -> nombre importado
+        self._index = None
+        if parse:
+            self.parse(safe_read_text(path) if source is None else source)
+
+    def parse(self, source):
+        self._load(extract_facts(source, str(self.path)))
+
+    def _load(self, facts):
+        self.functions = {k: tuple(v) for k, v in facts["functions"].items()}
+        self.classes = dict(facts["classes"])
+        self.imports = set(facts["imports"])
+        self.from_imports = set(facts["from_imports"])
+        self.calls = [tuple(c) for c in facts["calls"]]
+        self.entry_points = [tuple(e) for e in facts["entry_points"]]
+        self.spans = [tuple(sp) for sp in facts["spans"]]
+        self.class_names = set(facts["class_names"])
+        self.bindings = dict(facts["bindings"])
+        self._index = None
+
+    def to_facts(self):
+        """Hechos del módulo como dict serializable a JSON (para la caché)."""
+        return {
+            "functions": {k: list(v) for k, v in self.functions.items()},
+            "classes": self.classes,
+            "imports": sorted(self.imports),
+            "from_imports": sorted(self.from_imports),
+            "calls": [list(c) for c in self.calls],
+            "entry_points": [list(e) for e in self.entry_points],
+            "spans": [list(sp) for sp in self.spans],
+            "class_names": sorted(self.class_names),
+            "bindings": self.bindings,
+        }
 
-        for node in ast.walk(self.tree):
-            if isinstance(node, ast.FunctionDef):
-                self.functions[node.name] = node
-            elif isinstance(node, ast.AsyncFunctionDef):
-                self.functions[node.name] = node
-            elif isinstance(node, ast.ClassDef):
-                self.classes[node.name] = node
-            elif isinstance(node, ast.Import):
-                for n in node.names:
-                    self.imports.add(n.name)
-            elif isinstance(node, ast.ImportFrom):
-                module = node.module or ""
-                self.from_imports.add(module)
-
-        # heuristics para entry points
-        if "streamlit" in self.source or "st." in self.source:
-            self.entry_points.append(("streamlit", None))
-        if "__name__" in self.source and "__main__" in self.source:
-            self.entry_points.append(("if_main", None))
-        if "Flask" in self.source or "flask" in self.imports:
-            self.entry_points.append(("flask", None))
-        if "FastAPI" in self.source or "fastapi" in self.imports:
-            self.entry_points.append(("fastapi", None))
-
-    def _enclosing_function(self, node):
-        if not self.tree:
+    @classmethod
+    def from_facts(cls, path: Path, facts):
+        """Reconstruye el módulo desde la caché sin leer el archivo."""
+        info = cls(path, parse=False)
+        info._load(facts)
+        return info
+
+    def _build_index(self):
+        """
+        Índice de intervalos: inicios ordenados y, para cada función, la que la
+        contiene (las funciones están anidadas, nunca se cruzan).
+        """
+        starts, ends, parents, stack = [], [], [], []
+        for i, (_, start, end) in enumerate(self.spans):
+            while stack and ends[stack[-1]] < start:
+                stack.pop()
+            starts.append(start)
+            ends.append(end)
+            parents.append(stack[-1] if stack else -1)
+            stack.append(i)
+        self._index = (starts, ends, parents)
+
+    def _enclosing_function(self, lineno):
+        """
+        Función más interna que contiene la línea (nombre calificado), o None
+        si la línea está a nivel de módulo. O(log n) más la profundidad de anidamiento.
+        """
+        if self._index is None:
+            self._build_index()
+        starts, ends, parents = self._index
+        i = bisect.bisect_right(starts, lineno) - 1
+        while i >= 0 and ends[i] < lineno:
+            i = parents[i]
+        return self.spans[i][0] if i >= 0 else None
+
+def _call_name(func):
+    """Nombre con puntos de lo llamado: f, modulo.f, obj.metodo (None si no es simple)."""
+    parts = []
+    while isinstance(func, ast.Attribute):
+        parts.append(func.attr)
+        func = func.value
+    if not isinstance(func, ast.Name):
+        return None
+    parts.append(func.id)
+    return ".".join(reversed(parts))
+
+def analyze_file(task):
+    """
+    Trabajo de un proceso del pool: lee, hashea y (si hace falta) parsea un
+    archivo. Recibe (ruta, hash conocido o None) y devuelve
+    (ruta, mtime_ns, tamaño, hash, hechos). Los hechos son None si el hash
+    coincide con el conocido: el archivo se tocó pero su contenido no cambió.
+    """
+    path, known_hash = task
+    st = os.stat(path)
+    with open(path, "rb") as f:
+        raw = f.read()
+    digest = content_hash(raw)
+    if digest == known_hash:
+        return path, st.st_mtime_ns, st.st_size, digest, None
+    try:
+        source = raw.decode("utf8")
+    except UnicodeDecodeError as e:
+        logging.debug(f"No se pudo leer {path}: {e}")
+        source = ""
+    return path, st.st_mtime_ns, st.st_size, digest, extract_facts(source, path)
+
+# ---------------------------
+# AST CACHE
+# ---------------------------
+
+# Cambiar si cambia lo que se extrae de cada módulo: invalida las cachés viejas
+CACHE_VERSION = 3
+CACHE_FILENAME = ".cache_generador.json"
+
+def content_hash(data):
+    """Hash estable (no cambia entre ejecuciones, a diferencia de hash())."""
+    if isinstance(data, str):
+        data = data.encode("utf8")
+    return hashlib.sha256(data).hexdigest()
+
+class ASTCache:
+    """
+    Caché persistente de los hechos de cada módulo, por ruta.
+
+    Un archivo se considera sin cambios si coinciden su mtime y su tamaño (no
+    hace falta ni leerlo). Si cambiaron pero el hash del contenido es el mismo
+    (por ejemplo, tras un checkout), tampoco se vuelve a parsear.
+    También guarda qué herramientas de renderizado se detectaron (ver _probe_tool).
+    """
+
+    def __init__(self, path: Path = None):
+        self.path = path
+        self.entries = {}
+        self.tools = {}
+        self.hits = 0
+        self.misses = 0
+        self._seen = set()
+        self._dirty = False
+        if path is not None and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf8"))
+                if data.get("version") == CACHE_VERSION and data.get("python") == list(sys.version_info[:2]):
+                    self.entries = data.get("entries", {})
+                    self.tools = data.get("tools", {})
+            except Exception as e:
+                logging.warning(f"Caché ilegible, se reconstruye: {e}")
+
+    def begin_scan(self):
+        """Reinicia los contadores antes de un nuevo escaneo (modo --watch)."""
+        self.hits = 0
+        self.misses = 0
+        self._seen = set()
+
+    def lookup(self, path: str):
+        """
+        Hechos del archivo si su mtime y tamaño no cambiaron; si no, None.
+        """
+        self._seen.add(path)
+        entry = self.entries.get(path)
+        if entry is None:
             return None
-        lineno = getattr(node, "lineno", None)
-        if lineno is None:
+        try:
+            st = os.stat(path)
+        except OSError:
             return None
-        candidate = None
-        for name, func in self.functions.items():
-            start = getattr(func, "lineno", 0)
-            end = self._infer_end_lineno(func)
-            if start <= lineno <= end:
-                candidate = name
-                break
-        return candidate
+        if entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+            self.hits += 1
+            return entry["facts"]
+        return None
+
+    def known_hash(self, path: str):
+        entry = self.entries.get(path)
+        return entry["hash"] if entry else None
+
+    def store(self, path, mtime_ns, size, digest, facts):
+        """Guarda el resultado de analyze_file y devuelve los hechos del archivo."""
+        if facts is None:
+            self.hits += 1
+            facts = self.entries[path]["facts"]
+        else:
+            self.misses += 1
+        self.entries[path] = {"mtime_ns": mtime_ns, "size": size, "hash": digest, "facts": facts}
+        self._dirty = True
+        return facts
 
-    def _infer_end_lineno(self, node):
-        max_ln = getattr(node, "lineno", 0)
-        for n in ast.walk(node):
-            if hasattr(n, "lineno"):
-                max_ln = max(max_ln, n.lineno)
-        return max_ln
+    def save(self):
+        # Olvido los archivos que ya no existen (o quedaron excluidos)
+        stale = set(self.entries) - self._seen
+        for key in stale:
+            del self.entries[key]
+        if self.path is None or not (self._dirty or stale):
+            return
+        data = {"version": CACHE_VERSION, "python": list(sys.version_info[:2]),
+                "entries": self.entries, "tools": self.tools}
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data), encoding="utf8")
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+def node_id(prefix, text):
+    """Id de nodo Mermaid estable entre ejecuciones."""
+    return f"{prefix}_{content_hash(text)[:10]}"
+
+# Archivos de salida escritos en la generación actual (para el resumen de --watch)
+WRITTEN_FILES = []
+
+def write_if_changed(path: Path, text: str):
+    """Escribe el archivo solo si su contenido cambia. Devuelve True si lo escribió."""
+    try:
+        if path.read_text(encoding="utf8") == text:
+            logging.debug(f"Sin cambios: {path}")
+            return False
+    except (OSError, UnicodeDecodeError):
+        pass
+    path.write_text(text, encoding="utf8")
+    WRITTEN_FILES.append(path)
+    return True
 
 # ---------------------------
 # PROJECT SCANNER
 # ---------------------------
 
-def scan_project(root_dir=".", exclude_dirs=None, max_depth=None):
-    if exclude_dirs is None:
-        exclude_dirs = set()
+# Con menos archivos por analizar que esto, arrancar procesos cuesta más de lo que ahorra
+MIN_FILES_FOR_POOL = 32
 
+def find_python_files(root_dir=".", exclude_dirs=None, max_depth=None):
+    """
+    Lista los .py del proyecto en orden estable. Las carpetas excluidas (por
+    nombre o por ruta relativa, p. ej. "docs/diagramas") y las que pasan de
+    max_depth se podan de os.walk: nunca se recorren.
+    """
+    exclude_dirs = set(exclude_dirs or ())
     root = Path(root_dir)
-    modules = {}
-    logging.info(f"Escaneando proyecto en {root.resolve()} ...")
-    
+    files = []
     for dirpath, dirnames, filenames in os.walk(root):
-        parts = Path(dirpath).parts
-        if any(p in exclude_dirs for p in parts):
-            logging.debug(f"Omitiendo carpeta: {dirpath}")
-            continue
-            
-        if max_depth is not None:
-            depth = len(Path(dirpath).relative_to(root).parts)
-            if depth > max_depth:
-                continue
-                
-        for filename in filenames:
-            if filename.endswith(".py"):
-                path = Path(dirpath) / filename
-                try:
-                    info = ModuleInfo(path)
-                    modules[str(path)] = info
-                    logging.debug(f"Analizado: {path}")
-                except Exception as e:
-                    logging.warning(f"No se pudo analizar {path}: {e}")
+        rel = Path(dirpath).relative_to(root)
+        depth = len(rel.parts)
+        if max_depth is not None and depth >= max_depth:
+            dirnames[:] = []
+        else:
+            kept = []
+            for d in sorted(dirnames):  # orden estable: los diagramas no cambian si el código no cambia
+                if d in exclude_dirs or (rel / d).as_posix() in exclude_dirs:
+                    logging.debug(f"Omitiendo carpeta: {Path(dirpath) / d}")
+                else:
+                    kept.append(d)
+            dirnames[:] = kept
+        files.extend(os.path.join(dirpath, f) for f in sorted(filenames) if f.endswith(".py"))
+    return files
+
+def scan_project(root_dir=".", exclude_dirs=None, max_depth=None, cache=None, jobs=None):
+    """
+    Analiza los módulos del proyecto. Los archivos sin cambios salen de la
+    caché; el resto se analiza en un pool de `jobs` procesos (por defecto,
+    todos los núcleos) que devuelven solo los hechos, no árboles AST.
+    """
+    root = Path(root_dir)
+    cache = cache if cache is not None else ASTCache(None)
+    cache.begin_scan()
+    logging.info(f"Escaneando proyecto en {root.resolve()} ...")
+
+    files = find_python_files(root, exclude_dirs, max_depth)
+    facts = {}
+    pending = []
+    for path in files:
+        cached = cache.lookup(path)
+        if cached is not None:
+            facts[path] = cached
+        else:
+            pending.append((path, cache.known_hash(path)))
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(pending) >= MIN_FILES_FOR_POOL:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            chunksize = max(1, len(pending) // (jobs * 4))
+            results = pool.map(_analyze_safely, pending, chunksize=chunksize)
+            results = list(results)
+    else:
+        results = [_analyze_safely(task) for task in pending]
+
+    for result in results:
+        if result is not None:
+            facts[result[0]] = cache.store(*result)
+
+    modules = {}
+    for path in files:
+        if path in facts:
+            modules[path] = ModuleInfo.from_facts(Path(path), facts[path])
                     
+    logging.info(f"Caché AST: {cache.hits} sin cambios, {cache.misses} analizados")
     logging.info(f"Escaneo finalizado: {len(modules)} módulos")
     return modules
 
+def _analyze_safely(task):
+    try:
+        return analyze_file(task)
+    except Exception as e:
+        logging.warning(f"No se pudo analizar {task[0]}: {e}")
+        return None
+
 # ---------------------------
 # CALLGRAPH
 # ---------------------------
 
+def module_parts(mpath):
+    """Partes del nombre con puntos de un módulo según su ruta (sin .py ni __init__)."""
+    parts = list(Path(os.path.relpath(mpath)).with_suffix("").parts)
+    if parts and parts[-1] == "__init__":
+        parts.pop()
+    return [p for p in parts if p not in ("", ".", "..")]
+
+class ModuleIndex:
+    """
+    Índice de los módulos locales por nombre con puntos. Cada módulo se indexa
+    por todos los sufijos de su ruta ("app.procesos_datos.x", "procesos_datos.x",
+    "x"), así se encuentran tanto `from app.procesos_datos import x` como
+    `from procesos_datos import x` (este proyecto usa ambos).
+    """
+
+    def __init__(self, modules):
+        self.modules = modules
+        self.by_name = defaultdict(list)
+        self.parts = {}
+        self.qualnames = {}
+        for mpath, minfo in modules.items():
+            parts = module_parts(mpath)
+            self.parts[mpath] = parts
+            self.qualnames[mpath] = {sp[0] for sp in minfo.spans}
+            for i in range(len(parts)):
+                self.by_name[".".join(parts[i:])].append(mpath)
+
+    def find_module(self, dotted, near=None):
+        """Módulo local con ese nombre; si hay varios, el más cercano a `near`."""
+        candidates = self.by_name.get(dotted)
+        if not candidates:
+            return None
+        if len(candidates) == 1 or near is None:
+            return candidates[0]
+        near_parts = self.parts[near]
+        def shared(c):
+            n = 0
+            for a, b in zip(self.parts[c], near_parts):
+                if a != b:
+                    break
+                n += 1
+            return n
+        return max(candidates, key=shared)
+
+    def _absolute(self, mpath, target):
+        # "..x.f" desde a/b/c.py -> "a.x.f"
+        level = len(target) - len(target.lstrip("."))
+        if not level:
+            return target
+        package = self.parts[mpath][:-1] if not str(mpath).endswith("__init__.py") else self.parts[mpath]
+        base = package[:len(package) - (level - 1)] if level > 1 else package
+        return ".".join(base + [target[level:]]) if target[level:] else ".".join(base)
+
+    def _function_in(self, mpath, qual):
+        names = self.qualnames[mpath]
+        if qual in names:
+            return qual
+        # Llamar a una clase es llamar a su __init__
+        if f"{qual}.__init__" in names:
+            return f"{qual}.__init__"
+        return None
+
+    def resolve_qualified(self, dotted, near=None):
+        """`paquete.modulo.funcion` -> (ruta del módulo, nombre calificado) o None."""
+        parts = dotted.split(".")
+        for i in range(len(parts) - 1, 0, -1):
+            mpath = self.find_module(".".join(parts[:i]), near)
+            if mpath is not None:
+                qual = self._function_in(mpath, ".".join(parts[i:]))
+                return (mpath, qual) if qual else None
+        return None
+
+    def resolve_call(self, mpath, caller, name):
+        """
+        A qué función local llama `name` desde `caller` (en mpath), o None si
+        es externa (numpy, builtins...) o no se puede saber estáticamente.
+        """
+        minfo = self.modules[mpath]
+        head, _, rest = name.partition(".")
+
+        # self.metodo() / cls.metodo(): el método de la clase que contiene al llamador
+        if head in ("self", "cls") and rest and caller:
+            scope = caller.split(".")
+            for i in range(len(scope) - 1, 0, -1):
+                cls_name = ".".join(scope[:i])
+                if cls_name in minfo.class_names:
+                    qual = self._function_in(mpath, f"{cls_name}.{rest}")
+                    return (mpath, qual) if qual else None
+            return None
+
+        # Funciones anidadas: primero los ámbitos que encierran al llamador, del
+        # más interno al más externo (el cuerpo de una clase no es un ámbito
+        # visible desde sus métodos, así que lo salto)
+        if not rest and caller:
+            scope = caller.split(".")
+            for i in range(len(scope), 0, -1):
+                enclosing = ".".join(scope[:i])
+                if enclosing in minfo.class_names:
+                    continue
+                qual = self._function_in(mpath, f"{enclosing}.{name}")
+                if qual:
+                    return mpath, qual
+
+        # Funciones (o clases) del propio módulo
+        qual = self._function_in(mpath, name)
+        if qual and (not rest or head in minfo.class_names):
+            return mpath, qual
+
+        # Nombres importados: se expande el primer componente
+        target = minfo.bindings.get(head)
+        if target:
+            target = self._absolute(mpath, target)
+            return self.resolve_qualified(f"{target}.{rest}" if rest else target, near=mpath)
+        return None
+
 def build_call_graph(modules):
+    """
+    Grafo de llamadas entre funciones del proyecto. Los nodos son
+    "ruta:Clase.funcion"; hay una arista por cada par llamador -> llamada
+    que se pudo resolver (funciones del mismo módulo, métodos vía self/cls,
+    y nombres importados, con o sin el módulo delante).
+    """
     nodes = set()
     edges = set()
     func_map = defaultdict(list)
+    index = ModuleIndex(modules)
+    labels = {mpath: os.path.relpath(mpath) for mpath in modules}
     
     for mpath, minfo in modules.items():
-        module_label = os.path.relpath(mpath)
-        for fname in minfo.functions:
-            identifier = f"{module_label}:{fname}"
-            func_map[fname].append(identifier)
+        module_label = labels[mpath]
+        for qual, _, _ in minfo.spans:
+            identifier = f"{module_label}:{qual}"
+            func_map[qual.rsplit(".", 1)[-1]].append(identifier)
             nodes.add(identifier)
+    
+    unresolved = 0
+    for mpath, minfo in modules.items():
+        module_label = labels[mpath]
+        for name, lineno in minfo.calls:
+            caller = minfo._enclosing_function(lineno)
+            if caller is None:
+                continue  # llamadas a nivel de módulo: no hay función que las haga
+            target = index.resolve_call(mpath, caller, name)
+            if target is None:
+                unresolved += 1
+                continue
+            edges.add((f"{module_label}:{caller}", f"{labels[target[0]]}:{target[1]}"))
             
-    logging.info(f"Call graph: {len(nodes)} nodos")
-    return {"nodes": nodes, "edges": edges, "func_map": func_map}
+    logging.info(f"Call graph: {len(nodes)} nodos, {len(edges)} aristas "
+                 f"({unresolved} llamadas externas o sin resolver)")
+    return {"nodes": nodes, "edges": edges, "func_map": func_map, "index": index}
 
 # ---------------------------
 # MERMAID GENERATORS
 # ---------------------------
 
+def local_modules_by_name(modules):
+    """Módulos locales por nombre de archivo (sin .py), en el orden del escaneo."""
+    by_name = defaultdict(list)
+    for mpath in modules:
+        by_name[os.path.basename(mpath).replace(".py", "")].append(mpath)
+    return by_name
+
+def import_candidates(imp, by_name):
+    """Módulos locales que puede ser `imp` (por su último componente): O(1) por import."""
+    return by_name.get(imp.rsplit(".", 1)[-1], [])
+
+# Máximo de llamadas que se dibujan en el diagrama de flujo
+MAX_FLOW_CALLS = 30
+
 def mermaid_architecture(modules, callgraph=None):
-    lines = ["flowchart TD", f'    %% Arquitectura generada {datetime.now().isoformat()}']
+    lines = ["flowchart TD", '    %% Arquitectura generada']
     
     # Agrupar módulos por carpeta
     folders = defaultdict(list)
@@ -327,30 +951,29 @@ def mermaid_architecture(modules, callgraph=None):
         for mpath in mpaths:
             minfo = modules[mpath]
             label = os.path.basename(mpath)
-            node = f"mod_{abs(hash(mpath))}"
+            node = node_id("mod", os.path.relpath(mpath))
             lines.append(f'        {node}(["{label}"]):::module')
             
             # Agregar funciones principales (máximo 3)
             for fname in list(minfo.functions.keys())[:3]:
                 # SOLUCIÓN: Escapar caracteres especiales en nombres de función
                 safe_fname = fname.replace('(', '').replace(')', '').replace('"', '')
-                fid = f'{node}_fn_{abs(hash(fname))}'
+                fid = f'{node}_fn_{content_hash(fname)[:10]}'
                 lines.append(f'        {fid}[{safe_fname}]:::function')
                 lines.append(f'        {node} --> {fid}')
         
         lines.append('    end')
     
     # Agregar conexiones entre módulos (imports)
+    by_name = local_modules_by_name(modules)
     for mpath, minfo in modules.items():
-        src_node = f"mod_{abs(hash(mpath))}"
-        for imp in minfo.imports | minfo.from_imports:
+        src_node = node_id("mod", os.path.relpath(mpath))
+        for imp in sorted(minfo.imports | minfo.from_imports):
             # Buscar si el import corresponde a algún módulo local
-            for candidate_path in modules.keys():
-                candidate_name = os.path.basename(candidate_path).replace(".py", "")
-                if imp == candidate_name or imp.endswith(candidate_name):
-                    tgt_node = f"mod_{abs(hash(candidate_path))}"
-                    lines.append(f'    {src_node} -.->|imports| {tgt_node}')
-                    break
+            candidates = import_candidates(imp, by_name)
+            if candidates:
+                tgt_node = node_id("mod", os.path.relpath(candidates[0]))
+                lines.append(f'    {src_node} -.->|imports| {tgt_node}')
 
     styles = """
     classDef module fill:#0b2545,stroke:#fff,color:#fff;
@@ -360,7 +983,7 @@ def mermaid_architecture(modules, callgraph=None):
     return "\n".join(lines)
 
 def mermaid_flowchart(modules, callgraph):
-    lines = ["flowchart TD", f'    %% Flujo generado {datetime.now().isoformat()}']
+    lines = ["flowchart TD", '    %% Flujo generado']
     lines.append('    Start((INICIO)):::start')
     
     # Buscar entry points más inteligentemente
@@ -383,6 +1006,8 @@ def mermaid_flowchart(modules, callgraph):
     prev = "Start"
     node_counter = 1
     processed = set()
+    by_name = local_modules_by_name(modules)
+    shown = {}  # nodo del callgraph -> id en este diagrama
     
     # Procesar módulos prioritarios
     for entry in priority_modules[:5]:
@@ -407,23 +1032,39 @@ def mermaid_flowchart(modules, callgraph):
             safe_fname = fname.replace('(', '').replace(')', '').replace('"', '')
             lines.append(f'    {fid}[{safe_fname}]:::function')
             lines.append(f'    {nid} --> {fid}')
+            shown[f"{os.path.relpath(entry)}:{fname}"] = fid
         
         prev = nid
         
         # Conectar a módulos importados locales
-        for imp in list(minfo.imports | minfo.from_imports)[:2]:
-            for candidate in modules.keys():
+        for imp in sorted(minfo.imports | minfo.from_imports)[:2]:
+            for candidate in import_candidates(imp, by_name):
                 if candidate in processed:
                     continue
-                candidate_name = os.path.basename(candidate).replace(".py", "")
-                if imp == candidate_name or imp.endswith(candidate_name):
-                    imp_label = os.path.relpath(candidate).replace("\\", "/")
-                    imp_nid = f"N{node_counter}"
-                    node_counter += 1
-                    lines.append(f'    {imp_nid}["{imp_label}"]:::imported')
-                    lines.append(f'    {nid} -.->|usa| {imp_nid}')
-                    processed.add(candidate)
-                    break
+                imp_label = os.path.relpath(candidate).replace("\\", "/")
+                imp_nid = f"N{node_counter}"
+                node_counter += 1
+                lines.append(f'    {imp_nid}["{imp_label}"]:::imported')
+                lines.append(f'    {nid} -.->|usa| {imp_nid}')
+                processed.add(candidate)
+                break
+    
+    # Llamadas reales (del callgraph) que hacen las funciones mostradas
+    if callgraph:
+        drawn = 0
+        callers = set(shown)
+        for caller, callee in sorted(callgraph["edges"]):
+            if caller not in callers or drawn >= MAX_FLOW_CALLS:
+                continue
+            if callee not in shown:
+                cid = f"C{node_counter}"
+                node_counter += 1
+                module, _, qual = callee.partition(":")
+                safe = f"{qual} · {os.path.basename(module)}".replace('"', '')
+                lines.append(f'    {cid}["{safe}"]:::called')
+                shown[callee] = cid
+            lines.append(f'    {shown[caller]} -->|llama| {shown[callee]}')
+            drawn += 1
     
     lines.append('    EndNode((FIN)):::endstyle')
     lines.append(f'    {prev} --> EndNode')
@@ -434,6 +1075,7 @@ def mermaid_flowchart(modules, callgraph):
     classDef process fill:#2b7a78,color:#fff;
     classDef function fill:#0174a8,color:#fff;
     classDef imported fill:#f0ad4e,color:#000;
+    classDef called fill:#5bc0de,color:#000;
     """
     lines.append(styles)
     return "\n".join(lines)
@@ -442,23 +1084,38 @@ def mermaid_flowchart(modules, callgraph):
 # GRAPHVIZ DOT
 # ---------------------------
 
-def generate_dot_from_callgraph(callgraph, out_path):
+def generate_dot_from_callgraph(callgraph, out_path, max_nodes=50):
     dot_lines = ["digraph callgraph {", "rankdir=LR;", "node [shape=box, style=filled, color=lightblue];"]
     
-    for n in sorted(list(callgraph["nodes"])[:50]):  # limitar a 50 nodos
-        safe_n = n.replace('"', '\\"')
-        dot_lines.append(f'"{safe_n}";')
+    # Limitar a max_nodes: primero las funciones con más llamadas (entrantes + salientes)
+    degree = defaultdict(int)
+    for a, b in callgraph["edges"]:
+        degree[a] += 1
+        degree[b] += 1
+    ranked = sorted(callgraph["nodes"], key=lambda n: (-degree[n], n))
+    kept = set(ranked[:max_nodes])
+    
+    def quote(n):
+        return '"' + n.replace('"', '\\"') + '"'
+    
+    for n in sorted(kept):
+        dot_lines.append(f'{quote(n)};')
+    for a, b in sorted(callgraph["edges"]):
+        if a in kept and b in kept:
+            dot_lines.append(f'{quote(a)} -> {quote(b)};')
         
     dot_lines.append("}")
     dot_text = "\n".join(dot_lines)
     
     dot_file = out_path / "callgraph.dot"
-    dot_file.write_text(dot_text, encoding="utf8")
+    png_file = out_path / "callgraph.png"
+    if not write_if_changed(dot_file, dot_text) and png_file.exists():
+        logging.info(f"Callgraph sin cambios: {dot_file}")
+        return True
     logging.info(f"DOT generado: {dot_file}")
     
     try:
         subprocess.run(["dot", "-V"], capture_output=True, check=True)
-        png_file = out_path / "callgraph.png"
         subprocess.run(["dot", "-Tpng", str(dot_file), "-o", str(png_file)], check=True)
         logging.info(f"✓ PNG de callgraph: {png_file}")
         return True
@@ -472,10 +1129,10 @@ def generate_dot_from_callgraph(callgraph, out_path):
 
 def render_markdown(output_dir: Path, modules, mermaid_arch, mermaid_flow, has_images=False):
     md_file = output_dir / "DOCUMENTACION_ULTRA.md"
-    now = datetime.now().isoformat()
     
+    # Sin fecha en el contenido: así un código sin cambios produce el mismo archivo
     lines = [
-        f"# Documentación ULTRA - {now}\n",
+        "# Documentación ULTRA\n",
         "## Contenido\n",
         "- Diagrama de arquitectura",
         "- Diagrama de flujo",
@@ -499,8 +1156,8 @@ def render_markdown(output_dir: Path, modules, mermaid_arch, mermaid_flow, has_i
         lines.append(f"- **Clases**: {len(info.classes)}")
         lines.append(f"- **Entry points**: {', '.join(str(x[0]) for x in info.entry_points) or 'ninguno'}\n")
     
-    md_file.write_text("\n".join(lines), encoding="utf8")
-    logging.info(f"✓ Markdown: {md_file}")
+    if write_if_changed(md_file, "\n".join(lines)):
+        logging.info(f"✓ Markdown: {md_file}")
     return md_file
 
 def render_html(output_dir: Path, md_path: Path):
@@ -527,8 +1184,8 @@ img {{ max-width: 100%; border: 1px solid #ddd; border-radius: 5px; }}
 {md_text.replace('```mermaid', '<div class="mermaid">').replace('```', '</div>')}
 </body></html>
 """
-    html_file.write_text(html, encoding="utf8")
-    logging.info(f"✓ HTML: {html_file}")
+    if write_if_changed(html_file, html):
+        logging.info(f"✓ HTML: {html_file}")
     return html_file
 
 # ---------------------------
@@ -545,34 +1202,35 @@ def parse_args():
     p.add_argument("--verbose", "-v", action="count", default=0, help="Verbosidad (-v, -vv)")
     p.add_argument("--generate-dot", action="store_true", help="Generar callgraph con Graphviz")
     p.add_argument("--image-format", default="png", choices=["png","svg"], help="Formato de imágenes Mermaid")
+    p.add_argument("--no-cache", action="store_true", help="Ignorar la caché: volver a analizar y renderizar todo")
+    p.add_argument("--watch", "-w", action="store_true", help="Quedarse vigilando el proyecto y regenerar al guardar")
+    p.add_argument("--interval", type=float, default=0.5, help="Segundos entre revisiones en --watch")
+    p.add_argument("--debounce", type=float, default=0.3, help="Segundos sin cambios antes de regenerar en --watch")
+    p.add_argument("--jobs", "-j", type=int, default=None, help="Procesos para analizar (por defecto, todos los núcleos)")
     return p.parse_args()
 
-def main():
-    args = parse_args()
-    setup_logging(args.verbose)
-    
-    print("\n" + "="*60)
-    print("  GENERADOR ULTRA DE DOCUMENTACIÓN")
-    print("="*60 + "\n")
+def generate_docs(args, cache, out=print):
+    """
+    Escanea, analiza y escribe toda la documentación. Solo se vuelven a
+    analizar los archivos que cambiaron (caché) y solo se escriben o
+    renderizan las salidas cuyo contenido cambió.
     
+    Returns:
+        dict con el resumen de la generación (módulos, analizados, escritos, segundos)
+    """
+    start = time.perf_counter()
+    WRITTEN_FILES.clear()
     out_dir = Path(args.output)
     out_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Verificar herramientas
-    mmdc_path = check_mermaid_cli()
-    has_mmdc = mmdc_path is not None
-    
-    if not has_mmdc and ("png" in args.formats or "svg" in args.formats):
-        print("\n⚠️  IMPORTANTE: Para generar imágenes de diagramas, instala Mermaid CLI:")
-        print("   npm install -g @mermaid-js/mermaid-cli")
-        print("   (Requiere Node.js instalado)\n")
+    wants_images = "png" in args.formats or "svg" in args.formats
     
     exclude = set(IGNORED_DIRS_DEFAULT) | set(args.exclude)
-    modules = scan_project(root_dir=args.root, exclude_dirs=exclude, max_depth=args.max_depth)
-    
+    modules = scan_project(root_dir=args.root, exclude_dirs=exclude, max_depth=args.max_depth,
+                           cache=cache, jobs=args.jobs)
+    stats = {"modules": len(modules), "analyzed": cache.misses, "written": 0, "rendered": 0,
+             "missing_tools": False, "seconds": 0.0}
     if not modules:
-        logging.error("❌ No se encontraron módulos Python")
-        sys.exit(1)
+        return stats
     
     callgraph = build_call_graph(modules)
     
@@ -583,25 +1241,28 @@ def main():
     mermaid_dir = out_dir / "mermaid"
     mermaid_dir.mkdir(exist_ok=True)
     
-    arch_file = mermaid_dir / "architecture.mmd"
-    flow_file = mermaid_dir / "flowchart.mmd"
+    diagrams = {"architecture": mermaid_arch, "flowchart": mermaid_flow}
+    changed = [name for name, text in diagrams.items()
+               if write_if_changed(mermaid_dir / f"{name}.mmd", text)]
     
-    arch_file.write_text(mermaid_arch, encoding="utf8")
-    flow_file.write_text(mermaid_flow, encoding="utf8")
+    out(f"✓ Archivos Mermaid en {mermaid_dir} ({len(changed)} actualizados)")
     
-    print(f"✓ Archivos Mermaid generados en {mermaid_dir}")
+    # Generar imágenes: las ya renderizadas alguna vez salen de la caché por contenido
+    if wants_images:
+        images, stats["rendered"] = render_diagrams(diagrams, mermaid_dir, args.image_format, cache,
+                                                    use_store=not args.no_cache)
+        stats["missing_tools"] = any(image is None for image in images.values())
+        if stats["missing_tools"]:
+            out("\n⚠️  IMPORTANTE: Para generar imágenes de diagramas, instala Mermaid CLI:")
+            out("   npm install -g @mermaid-js/mermaid-cli")
+            out("   (Requiere Node.js instalado; con puppeteer instalado se usa un solo navegador)\n")
+        elif stats["rendered"]:
+            out(f"✓ {stats['rendered']} imágenes de diagramas generadas")
+        else:
+            out("✓ Imágenes de diagramas sin cambios (caché)")
     
-    # Generar imágenes
-    images_generated = False
-    if has_mmdc and (args.image_format in args.formats or "png" in args.formats or "svg" in args.formats):
-        print("\nGenerando imágenes de diagramas...")
-        
-        arch_img = render_mermaid_to_image(arch_file, args.image_format, mmdc_path)
-        flow_img = render_mermaid_to_image(flow_file, args.image_format, mmdc_path)
-        
-        if arch_img and flow_img:
-            images_generated = True
-            print(f"✓ Imágenes generadas exitosamente")
+    images_generated = wants_images and all(
+        (mermaid_dir / f"{name}.{args.image_format}").exists() for name in diagrams)
     
     # Graphviz
     if args.generate_dot:
@@ -615,13 +1276,96 @@ def main():
     if "html" in args.formats:
         render_html(out_dir, md_path)
     
+    cache.save()
+    stats["written"] = len(WRITTEN_FILES)
+    stats["seconds"] = time.perf_counter() - start
+    return stats
+
+# ---------------------------
+# WATCH MODE
+# ---------------------------
+
+def snapshot_tree(args):
+    """Estado (mtime, tamaño) de cada .py del proyecto: solo os.stat, sin leer archivos."""
+    exclude = set(IGNORED_DIRS_DEFAULT) | set(args.exclude)
+    state = {}
+    for path in find_python_files(args.root, exclude, args.max_depth):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue  # se borró entre el listado y el stat
+        state[path] = (st.st_mtime_ns, st.st_size)
+    return state
+
+def diff_snapshots(before, after):
+    """Rutas agregadas, borradas o modificadas entre dos estados."""
+    changed = {p for p in after.keys() & before.keys() if after[p] != before[p]}
+    return sorted(changed | (after.keys() ^ before.keys()))
+
+def watch(args, cache, interval=0.5, debounce=0.3):
+    """
+    Vigila el proyecto revisando cada `interval` segundos el mtime y tamaño de
+    los .py. Cuando algo cambia, espera a que pasen `debounce` segundos sin
+    cambios nuevos (guardar varios archivos, un checkout...) y regenera solo
+    lo afectado. Imprime el tiempo de cada ciclo.
+    """
+    print(f"👀 Vigilando {Path(args.root).resolve()} (cada {interval} s). Ctrl+C para salir.")
+    state = snapshot_tree(args)
+    try:
+        while True:
+            time.sleep(interval)
+            current = snapshot_tree(args)
+            changed = diff_snapshots(state, current)
+            if not changed:
+                continue
+            
+            # Debounce: sigo esperando mientras sigan llegando cambios
+            while True:
+                time.sleep(debounce)
+                latest = snapshot_tree(args)
+                more = diff_snapshots(current, latest)
+                if not more:
+                    break
+                changed = sorted(set(changed) | set(more))
+                current = latest
+            state = current
+            
+            stats = generate_docs(args, cache, out=logging.info)
+            names = ", ".join(os.path.relpath(p) for p in changed[:3]) + (" ..." if len(changed) > 3 else "")
+            print(f"[{time.strftime('%H:%M:%S')}] {len(changed)} cambiados ({names}) -> "
+                  f"{stats['analyzed']} analizados, {stats['written']} salidas actualizadas, "
+                  f"{stats['rendered']} imágenes en {stats['seconds']:.3f} s")
+    except KeyboardInterrupt:
+        print("\nFin del modo --watch")
+
+def main():
+    args = parse_args()
+    setup_logging(args.verbose)
+    
+    print("\n" + "="*60)
+    print("  GENERADOR ULTRA DE DOCUMENTACIÓN")
+    print("="*60 + "\n")
+    
+    # Caché de análisis y de herramientas de renderizado (en la carpeta de salida)
+    out_dir = Path(args.output)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    cache = ASTCache(None if args.no_cache else out_dir / CACHE_FILENAME)
+    
+    stats = generate_docs(args, cache)
+    if not stats["modules"]:
+        logging.error("❌ No se encontraron módulos Python")
+        sys.exit(1)
+    
     print("\n" + "="*60)
-    print(f"✓ Documentación completa en: {out_dir.resolve()}")
+    print(f"✓ Documentación completa en: {out_dir.resolve()} ({stats['seconds']:.3f} s)")
     print("="*60 + "\n")
     
-    if not has_mmdc and ("png" in args.formats or "svg" in args.formats):
+    if stats["missing_tools"]:
         print("💡 Tip: Instala Mermaid CLI para generar imágenes automáticamente:")
         print("   npm install -g @mermaid-js/mermaid-cli\n")
+    
+    if args.watch:
+        watch(args, cache, interval=args.interval, debounce=args.debounce)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Perfil de tiempo de arranque (importaciones) del simulador
+- Ejecuta `python -X importtime -c "import <módulo>"` en un proceso limpio
+- Reporta el tiempo de arranque en frío de cada módulo y las importaciones más pesadas
+- Avisa si se cargan librerías pesadas (scipy, matplotlib, plotly) sin necesidad
+- Guarda el reporte en JSON y lo compara con uno anterior
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+
+# ---------------------------
+# CONFIG
+# ---------------------------
+
+RAIZ_PROYECTO = Path(__file__).resolve().parent.parent
+
+MODULOS_POR_DEFECTO = [
+    "app.procesos_datos.cargador_datos",
+    "app.procesos_datos.interpolacion",
+    "app.procesos_datos.ajuste_curvas",
+    "app.simulacion.solucion_rk4",
+    "app.visualizacion.graficador",
+]
+
+# Librerías que no deberían cargarse al arrancar (solo al usarlas)
+LIBRERIAS_PESADAS = ["scipy", "scipy.optimize", "scipy.interpolate", "matplotlib", "plotly"]
+
+LINEA_IMPORTTIME = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+# ---------------------------
+# MEDICIÓN
+# ---------------------------
+
+def medir_modulo(modulo: str, python: str = sys.executable):
+    """
+    Importa el módulo en un intérprete nuevo con -X importtime y devuelve
+    una lista de (nombre, propio_us, acumulado_us, profundidad).
+    """
+    entorno = dict(os.environ)
+    entorno["PYTHONPATH"] = os.pathsep.join(
+        [str(RAIZ_PROYECTO)] + ([entorno["PYTHONPATH"]] if entorno.get("PYTHONPATH") else [])
+    )
+    resultado = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {modulo}"],
+        capture_output=True, text=True, cwd=str(RAIZ_PROYECTO), env=entorno
+    )
+    if resultado.returncode != 0:
+        raise RuntimeError(f"No se pudo importar {modulo}:\n{resultado.stderr[-2000:]}")
+
+    registros = []
+    for linea in resultado.stderr.splitlines():
+        m = LINEA_IMPORTTIME.match(linea)
+        if m:
+            propio, acumulado, sangria, nombre = m.groups()
+            registros.append((nombre, int(propio), int(acumulado), len(sangria) // 2))
+    return registros
+
+
+def perfilar(modulos, repeticiones: int = 3, top: int = 10):
+    """
+    Mide cada módulo varias veces y se queda con la medición más rápida
+    (la menos afectada por ruido del sistema).
+    """
+    reporte = {}
+    for modulo in modulos:
+        mejor = None
+        for _ in range(max(1, repeticiones)):
+            registros = medir_modulo(modulo)
+            total = next((r[2] for r in registros if r[0] == modulo), 0)
+            if mejor is None or total < mejor[0]:
+                mejor = (total, registros)
+
+        total, registros = mejor
+        cargados = {r[0] for r in registros}
+        pesados = sorted(registros, key=lambda r: r[2], reverse=True)
+        reporte[modulo] = {
+            "arranque_ms": total / 1000.0,
+            "modulos_importados": len(registros),
+            "pesadas_cargadas": [lib for lib in LIBRERIAS_PESADAS if lib in cargados],
+            "top": [
+                {"modulo": r[0], "acumulado_ms": r[2] / 1000.0, "propio_ms": r[1] / 1000.0}
+                for r in pesados[1:top + 1]
+            ],
+        }
+    return reporte
+
+# ---------------------------
+# REPORTE
+# ---------------------------
+
+def imprimir_reporte(reporte, anterior=None):
+    print("\n" + "=" * 60)
+    print("  TIEMPO DE ARRANQUE POR MÓDULO (importación en frío)")
+    print("=" * 60)
+
+    for modulo, datos in reporte.items():
+        linea = f"\n{modulo}: {datos['arranque_ms']:.1f} ms ({datos['modulos_importados']} módulos)"
+        if anterior and modulo in anterior:
+            antes = anterior[modulo]["arranque_ms"]
+            if antes > 0:
+                cambio = 100.0 * (datos["arranque_ms"] - antes) / antes
+                linea += f"  [{cambio:+.1f}% vs anterior: {antes:.1f} ms]"
+        print(linea)
+
+        if datos["pesadas_cargadas"]:
+            print(f"  ⚠ Librerías pesadas cargadas: {', '.join(datos['pesadas_cargadas'])}")
+        for item in datos["top"]:
+            print(f"    {item['acumulado_ms']:8.1f} ms  {item['modulo']}")
+    print()
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Perfil del tiempo de importación (arranque en frío) por módulo.")
+    p.add_argument("modulos", nargs="*", default=MODULOS_POR_DEFECTO, help="Módulos a medir")
+    p.add_argument("--repeticiones", "-n", type=int, default=3, help="Mediciones por módulo (se usa la mínima)")
+    p.add_argument("--top", type=int, default=10, help="Importaciones más pesadas a mostrar por módulo")
+    p.add_argument("--json", dest="salida_json", default=None, help="Guardar el reporte en este archivo JSON")
+    p.add_argument("--comparar", default=None, help="Reporte JSON anterior para comparar")
+    p.add_argument("--sin-pesadas", action="store_true",
+                   help="Terminar con error si algún módulo carga librerías pesadas")
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    anterior = None
+    if args.comparar and Path(args.comparar).exists():
+        anterior = json.loads(Path(args.comparar).read_text(encoding="utf8"))
+
+    reporte = perfilar(args.modulos, repeticiones=args.repeticiones, top=args.top)
+    imprimir_reporte(reporte, anterior)
+
+    if args.salida_json:
+        Path(args.salida_json).write_text(json.dumps(reporte, indent=2, ensure_ascii=False), encoding="utf8")
+        print(f"✓ Reporte guardado en {args.salida_json}")
+
+    if args.sin_pesadas and any(d["pesadas_cargadas"] for d in reporte.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()